@@ -0,0 +1,761 @@
+import aiomysql
+from aiomysql import Error
+from typing import Optional, List, Dict, Tuple
+from config import Config
+from db_backend import source_name
+from models import User, BookingResult
+from reference_cache import get_reference_cache
+from route_cache import get_route_cache, routes_key, trains_key
+import queries
+from seat_layouts import generate_seats, layout_key
+from seat_map import SeatMap, all_free, taken_slots, with_slots
+
+# Общие схемы мест рейсов с битовой картой не меняются после создания:
+# (источник данных, id схемы) -> SeatMap со всеми местами свободными
+_layout_maps: Dict[Tuple[str, int], SeatMap] = {}
+
+
+class AsyncDatabase:
+    """Асинхронный доступ к базе данных для сервисов без GUI.
+
+    Повторяет методы Database в виде корутин поверх aiomysql со своим пулом
+    соединений: каждый вызов берет соединение из пула только на время запроса,
+    поэтому сотни конкурентных корутин обслуживаются одним процессом.
+    Для Qt-интерфейса подходит цикл событий в стиле qasync.
+    """
+
+    def __init__(self):
+        self.pool = None
+
+    async def connect(self) -> bool:
+        """Создание пула соединений"""
+        if self.pool is not None:
+            return True
+
+        try:
+            self.pool = await aiomysql.create_pool(
+                host=Config.DB_CONFIG['host'],
+                db=Config.DB_CONFIG['database'],
+                user=Config.DB_CONFIG['user'],
+                password=Config.DB_CONFIG['password'],
+                port=Config.DB_CONFIG['port'],
+                minsize=Config.ASYNC_DB_POOL['minsize'],
+                maxsize=Config.ASYNC_DB_POOL['maxsize'],
+                pool_recycle=Config.ASYNC_DB_POOL['pool_recycle'],
+                autocommit=True
+            )
+            return True
+
+        except Error as e:
+            print(f"Ошибка подключения к БД: {e}")
+            return False
+
+    async def disconnect(self):
+        """Закрытие пула соединений"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError('Не удалось подключиться к базе данных')
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    async def _fetchall(self, query: str, params=None) -> List[Dict]:
+        """Выполнение запроса с получением всех строк"""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+    async def _fetchone(self, query: str, params=None) -> Optional[Dict]:
+        """Выполнение запроса с получением одной строки"""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchone()
+
+    async def _execute(self, query: str, params=None) -> int:
+        """Выполнение изменяющего запроса; возвращает число затронутых строк"""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(query, params)
+                return cursor.rowcount
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Аутентификация пользователя"""
+        try:
+            result = await self._fetchone(queries.AUTHENTICATE_USER, (username, password))
+
+            if result:
+                return User(
+                    id=result['id'],
+                    username=result['username'],
+                    full_name=result['full_name'],
+                    role=result['role']
+                )
+            return None
+
+        except Error as e:
+            print(f"Ошибка аутентификации: {e}")
+            return None
+
+    async def register_user(self, username: str, password: str, full_name: str) -> bool:
+        """Регистрация нового пользователя"""
+        try:
+            await self._execute(queries.REGISTER_USER, (username, password, full_name))
+            return True
+
+        except Error as e:
+            print(f"Ошибка регистрации: {e}")
+            return False
+
+    async def check_username_exists(self, username: str) -> bool:
+        """Проверка существования username"""
+        try:
+            return await self._fetchone(queries.CHECK_USERNAME_EXISTS, (username,)) is not None
+        except Error as e:
+            print(f"Ошибка проверки username: {e}")
+            return False
+
+    # ========== ПОЕЗДА И МАРШРУТЫ ==========
+
+    async def get_all_trains(self) -> List[Dict]:
+        """Получение списка всех поездов"""
+        cache = get_reference_cache()
+        trains = cache.get('trains')
+        if trains is not None:
+            return trains
+
+        try:
+            trains = await self._fetchall(queries.GET_ALL_TRAINS)
+            cache.put('trains', trains)
+            return trains
+        except Error as e:
+            print(f"Ошибка получения поездов: {e}")
+            return []
+
+    async def get_train_types(self) -> List[str]:
+        """Получение списка типов поездов"""
+        cache = get_reference_cache()
+        train_types = cache.get('train_types')
+        if train_types is not None:
+            return train_types
+
+        try:
+            rows = await self._fetchall(queries.GET_TRAIN_TYPES)
+            train_types = [row['train_type'] for row in rows if row['train_type']]
+            cache.put('train_types', train_types)
+            return train_types
+        except Error as e:
+            print(f"Ошибка получения типов поездов: {e}")
+            return []
+
+    async def add_train(self, train_number: str, train_name: str, train_type: str) -> bool:
+        """Добавление нового поезда"""
+        try:
+            await self._execute(queries.ADD_TRAIN, (train_number, train_name, train_type))
+            get_reference_cache().invalidate('trains', 'train_types')
+            return True
+        except Error as e:
+            print(f"Ошибка добавления поезда: {e}")
+            return False
+
+    async def add_route(self, train_id: int, departure_station: str, arrival_station: str,
+                        departure_time: str, arrival_time: str, base_price: float,
+                        num_seats: int = 0, train_type: Optional[str] = None) -> Optional[int]:
+        """Добавление нового маршрута вместе с местами; возвращает ID маршрута"""
+        try:
+            async with self.pool.acquire() as connection:
+                await connection.begin()
+                try:
+                    async with connection.cursor(aiomysql.DictCursor) as cursor:
+                        seats = []
+                        if num_seats > 0:
+                            if train_type is None:
+                                await cursor.execute(queries.GET_TRAIN_TYPE, (train_id,))
+                                result = await cursor.fetchone()
+                                train_type = result['train_type'] if result else None
+                            seats = generate_seats(num_seats, train_type)
+
+                        counters = queries.free_seat_deltas([seat_type for _, _, seat_type in seats])
+                        route = (train_id, departure_station, arrival_station,
+                                 departure_time, arrival_time, base_price) + counters
+                        if seats and Config.SEAT_INVENTORY['mode'] == 'bitmap':
+                            # Строки мест не вставляются (см. Database.add_route)
+                            layout_id = await self._seat_layout_id(cursor, train_type, num_seats)
+                            await cursor.execute(queries.ADD_BITMAP_ROUTE, route + (layout_id, all_free(num_seats)))
+                            route_id = cursor.lastrowid
+                        else:
+                            await cursor.execute(queries.ADD_ROUTE, route)
+                            route_id = cursor.lastrowid
+                            await self._insert_seats(cursor, route_id, seats)
+
+                    await connection.commit()
+                    # Новый маршрут может добавить станции в списки фильтров и попасть в выдачи поиска
+                    get_reference_cache().invalidate('stations')
+                    get_route_cache().invalidate_route(route_id, {'departure_station': departure_station,
+                                                                 'arrival_station': arrival_station,
+                                                                 'departure_time': departure_time})
+                    return route_id
+
+                except Error:
+                    await connection.rollback()
+                    raise
+
+        except Error as e:
+            print(f"Ошибка добавления маршрута: {e}")
+            return None
+
+    async def add_seats_for_route(self, route_id: int, num_seats: int, train_type: Optional[str] = None) -> bool:
+        """Добавление мест для маршрута"""
+        try:
+            inventory = await self._fetchone(queries.GET_ROUTE_INVENTORY, (route_id,))
+            if inventory and inventory['seat_layout_id'] is not None:
+                print("Ошибка добавления мест: места рейса с битовой картой задаются схемой мест")
+                return False
+
+            async with self.pool.acquire() as connection:
+                await connection.begin()
+                try:
+                    seats = generate_seats(num_seats, train_type)
+                    async with connection.cursor() as cursor:
+                        await self._insert_seats(cursor, route_id, seats)
+                        deltas = queries.free_seat_deltas([seat_type for _, _, seat_type in seats])
+                        await cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
+                    await connection.commit()
+                    await self._invalidate_route_searches(connection, route_id)
+                except Error:
+                    await connection.rollback()
+                    raise
+            return len(seats) > 0
+
+        except Error as e:
+            print(f"Ошибка добавления мест: {e}")
+            return False
+
+    @staticmethod
+    async def _insert_seats(cursor, route_id: int, seats: List[Tuple[int, int, str]]):
+        """Вставка мест маршрута многострочным INSERT (без фиксации транзакции)"""
+        if seats:
+            await cursor.executemany(queries.ADD_SEAT, [seat + (route_id,) for seat in seats])
+
+    @staticmethod
+    async def _invalidate_route_searches(connection, route_id: int):
+        """Сброс выдач поиска с рейсом и тех, куда он может попасть (см. Database)"""
+        try:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(queries.GET_ROUTE_SEARCH_FIELDS, (route_id,))
+                get_route_cache().invalidate_route(route_id, await cursor.fetchone())
+        except Error:
+            get_route_cache().clear()
+
+    @staticmethod
+    async def _seat_layout_id(cursor, train_type: Optional[str], num_seats: int) -> int:
+        """Общая схема мест поезда (создается при первом обращении, без фиксации транзакции)"""
+        key = layout_key(train_type)
+        await cursor.execute(queries.FIND_SEAT_LAYOUT, (key, num_seats))
+        layout = await cursor.fetchone()
+        if layout:
+            return layout['id']
+
+        await cursor.execute(queries.ADD_SEAT_LAYOUT, (key, num_seats))
+        layout_id = cursor.lastrowid
+        await cursor.executemany(queries.ADD_LAYOUT_SEAT, [
+            (layout_id, slot) + seat for slot, seat in enumerate(generate_seats(num_seats, key))
+        ])
+        return layout_id
+
+    async def _bitmap_seat_map(self, route_id: int) -> Optional[SeatMap]:
+        """Схема рейса с битовой картой (None - места рейса хранятся строками seats)"""
+        inventory = await self._fetchone(queries.GET_ROUTE_INVENTORY, (route_id,))
+        if not inventory or inventory['seat_layout_id'] is None:
+            return None
+
+        key = (source_name(), inventory['seat_layout_id'])
+        layout = _layout_maps.get(key)
+        if layout is None:
+            rows = await self._fetchall(queries.GET_LAYOUT_SEATS, (inventory['seat_layout_id'],))
+            layout = _layout_maps[key] = SeatMap.from_rows(rows)
+        return layout.with_free(route_id, inventory['seat_bitmap'])
+
+    async def reconcile_free_seats(self) -> int:
+        """Пересчет счетчиков свободных мест по таблице seats; возвращает число исправленных маршрутов"""
+        try:
+            fixed = await self._execute(queries.RECONCILE_ROW_FREE_SEATS)
+            get_route_cache().clear()
+            return fixed
+
+        except Error as e:
+            print(f"Ошибка пересчета свободных мест: {e}")
+            return -1
+
+    async def get_all_available_routes(self, filters=None) -> List[Dict]:
+        """Получение всех доступных рейсов с фильтрами"""
+        cache = get_route_cache()
+        try:
+            key = routes_key(filters)
+            routes = cache.get(key)
+            if routes is not None:
+                return routes
+
+            query, params = queries.build_available_routes_query(filters)
+            routes = await self._fetchall(query, params)
+            cache.put(key, routes)
+            return routes
+
+        except Error as e:
+            print(f"Ошибка получения рейсов: {e}")
+            return []
+        except ValueError as e:
+            print(f"Ошибка получения рейсов: неверная дата в фильтрах: {e}")
+            return []
+
+    async def search_trains(self, from_station: str, to_station: str, date: str) -> List[Dict]:
+        """Поиск поездов по маршруту"""
+        cache = get_route_cache()
+        try:
+            # Ключ с границами суток строится внутри try: неверная дата - пустая выдача, а не исключение
+            key = trains_key(from_station, to_station, date)
+            routes = cache.get(key)
+            if routes is not None:
+                return routes
+
+            start, end = queries.day_bounds(date)
+            routes = await self._fetchall(queries.SEARCH_TRAINS,
+                                          (f"%{from_station}%", f"%{to_station}%", start, end))
+            cache.put(key, routes)
+            return routes
+
+        except Error as e:
+            print(f"Ошибка поиска поездов: {e}")
+            return []
+        except ValueError as e:
+            print(f"Ошибка поиска поездов: неверная дата {date!r}: {e}")
+            return []
+
+    async def get_stations(self) -> Dict[str, List[str]]:
+        """Получение списков станций отправления и назначения"""
+        cache = get_reference_cache()
+        stations = cache.get('stations')
+        if stations is not None:
+            return stations
+
+        try:
+            departure = await self._fetchall(queries.GET_DEPARTURE_STATIONS)
+            arrival = await self._fetchall(queries.GET_ARRIVAL_STATIONS)
+            stations = {'departure': [row['departure_station'] for row in departure],
+                        'arrival': [row['arrival_station'] for row in arrival]}
+            cache.put('stations', stations)
+            return stations
+
+        except Error as e:
+            print(f"Ошибка получения станций: {e}")
+            return {'departure': [], 'arrival': []}
+
+    async def get_routes_overview(self, limit: int = 100) -> List[Dict]:
+        """Получение последних рейсов с количеством свободных мест (для админа)"""
+        try:
+            return await self._fetchall(queries.GET_ROUTES_OVERVIEW, (limit,))
+
+        except Error as e:
+            print(f"Ошибка получения списка рейсов: {e}")
+            return []
+
+    async def get_available_seats(self, route_id: int) -> List[Dict]:
+        """Получение свободных мест для рейса"""
+        try:
+            seat_map = await self._bitmap_seat_map(route_id)
+            if seat_map is not None:
+                return list(seat_map.free_seats())
+            return await self._fetchall(queries.GET_AVAILABLE_SEATS, (route_id,))
+
+        except Error as e:
+            print(f"Ошибка получения мест: {e}")
+            return []
+
+    async def get_seat_map(self, route_id: int) -> Optional[SeatMap]:
+        """Схема занятости мест рейса (одним запросом)"""
+        try:
+            seat_map = await self._bitmap_seat_map(route_id)
+            if seat_map is not None:
+                return seat_map
+            return SeatMap.from_rows(await self._fetchall(queries.GET_ROUTE_SEATS, (route_id,)), route_id)
+
+        except Error as e:
+            print(f"Ошибка получения схемы мест: {e}")
+            return None
+
+    # ========== БРОНИРОВАНИЯ ==========
+
+    async def create_booking(self, passenger_data: Dict, seat_id: int, route_id: int,
+                             user_id: int) -> BookingResult:
+        """Создание бронирования"""
+        try:
+            layout_seats = await self._layout_seats(route_id, [seat_id])
+            if layout_seats:
+                return await self._book_layout_seats([passenger_data], layout_seats, route_id, user_id)
+
+            async with self.pool.acquire() as connection:
+                # Начинаем транзакцию
+                await connection.begin()
+                try:
+                    async with connection.cursor(aiomysql.DictCursor) as cursor:
+                        # 1. Захватываем место - до любых вставок
+                        await cursor.execute(queries.CLAIM_SEAT, (seat_id, route_id))
+                        if cursor.rowcount == 0:
+                            await connection.rollback()
+                            return BookingResult(seat_taken=True)
+
+                        # 2. Цена и класс места, счетчики свободных мест (до вставки бронирования,
+                        # см. Database.create_booking)
+                        await cursor.execute(queries.GET_PRICE_AND_SEAT_TYPE, (seat_id, route_id))
+                        price_result = await cursor.fetchone()
+                        deltas = queries.free_seat_deltas([price_result['seat_type']], -1)
+                        await cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
+
+                        # 3. Находим или создаем пассажира по номеру документа
+                        await cursor.execute(queries.UPSERT_PASSENGER, (
+                            passenger_data['full_name'],
+                            passenger_data['document_number'],
+                            passenger_data['phone']
+                        ))
+                        passenger_id = cursor.lastrowid
+
+                        # 4. Создаем бронирование
+                        await cursor.execute(queries.ADD_BOOKING, (passenger_id, seat_id, route_id,
+                                                                   price_result['base_price'], user_id))
+                        booking_id = cursor.lastrowid
+
+                    # Фиксируем транзакцию
+                    await connection.commit()
+                    get_route_cache().invalidate_route(route_id)
+                    return BookingResult(booking_id=booking_id, booking_ids=[booking_id])
+
+                except Error:
+                    await connection.rollback()
+                    raise
+
+        except Error as e:
+            print(f"Ошибка создания бронирования: {e}")
+            return BookingResult()
+
+    async def create_group_booking(self, passengers: List[Dict], seat_ids: List[int], route_id: int,
+                                   user_id: int) -> BookingResult:
+        """Групповое бронирование: passengers[i] едет на месте seat_ids[i], все или ничего"""
+        if not seat_ids or len(passengers) != len(seat_ids):
+            return BookingResult()
+
+        placeholders = queries.in_placeholders(seat_ids)
+        try:
+            layout_seats = await self._layout_seats(route_id, seat_ids)
+            if layout_seats:
+                return await self._book_layout_seats(passengers, layout_seats, route_id, user_id)
+
+            async with self.pool.acquire() as connection:
+                await connection.begin()
+                try:
+                    async with connection.cursor(aiomysql.DictCursor) as cursor:
+                        # 1. Захватываем все места одним условным обновлением
+                        await cursor.execute(queries.CLAIM_SEATS.format(placeholders), [route_id] + list(seat_ids))
+                        if cursor.rowcount != len(seat_ids):
+                            await connection.rollback()
+                            await cursor.execute(queries.GET_TAKEN_SEATS.format(placeholders), list(seat_ids))
+                            taken = [row['id'] for row in await cursor.fetchall()]
+                            return BookingResult(seat_taken=True, taken_seat_ids=taken)
+
+                        # 2. Классы мест и цена, счетчики свободных мест
+                        await cursor.execute(queries.GET_SEATS_WITH_PRICE.format(placeholders),
+                                             [route_id] + list(seat_ids))
+                        seats = await cursor.fetchall()
+                        deltas = queries.free_seat_deltas([seat['seat_type'] for seat in seats], -1)
+                        await cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
+                        price = seats[0]['base_price']
+
+                        # 3. Пассажиры (по документам) и бронирования многострочными вставками
+                        documents = [passenger['document_number'] for passenger in passengers]
+                        await cursor.executemany(queries.UPSERT_PASSENGER, [
+                            (passenger['full_name'], passenger['document_number'], passenger['phone'])
+                            for passenger in passengers
+                        ])
+                        await cursor.execute(queries.GET_PASSENGER_IDS.format(queries.in_placeholders(documents)),
+                                             documents)
+                        passenger_ids = {row['document_number']: row['id'] for row in await cursor.fetchall()}
+
+                        await cursor.executemany(queries.ADD_BOOKING, [
+                            (passenger_ids[document], seat_id, route_id, price, user_id)
+                            for document, seat_id in zip(documents, seat_ids)
+                        ])
+                        # id вставки читаются по местам: MySQL не обещает, что они идут подряд
+                        booking_ids = await self._new_booking_ids(cursor, queries.GET_NEW_BOOKING_IDS,
+                                                                  route_id, seat_ids)
+
+                    await connection.commit()
+                    get_route_cache().invalidate_route(route_id)
+                    return BookingResult(booking_id=booking_ids[0], booking_ids=booking_ids)
+
+                except Error:
+                    await connection.rollback()
+                    raise
+
+        except Error as e:
+            print(f"Ошибка группового бронирования: {e}")
+            return BookingResult()
+
+    async def _layout_seats(self, route_id: int, seat_ids: List[int]) -> List[Dict]:
+        """Места рейса с битовой картой в порядке seat_ids (пусто для рейса со строками seats)"""
+        rows = await self._fetchall(queries.GET_LAYOUT_SEATS_WITH_PRICE.format(queries.in_placeholders(seat_ids)),
+                                    [route_id] + list(seat_ids))
+        seats = {seat['id']: seat for seat in rows}
+        return [seats[seat_id] for seat_id in seat_ids] if len(seats) == len(set(seat_ids)) else []
+
+    @staticmethod
+    async def _swap_seat_bitmap(connection, cursor, route_id: int, seats: List[Dict],
+                                free: bool) -> Tuple[bool, List[Dict]]:
+        """Сравнение с обменом карты рейса (см. Database._swap_seat_bitmap)"""
+        for _ in range(Config.SEAT_INVENTORY['cas_attempts']):
+            await cursor.execute(queries.GET_ROUTE_INVENTORY, (route_id,))
+            inventory = await cursor.fetchone()
+            taken = set(taken_slots(inventory['seat_bitmap'], [seat['slot'] for seat in seats]))
+            if free:
+                changed = [seat for seat in seats if seat['slot'] in taken]
+            elif taken:
+                return False, [seat for seat in seats if seat['slot'] in taken]
+            else:
+                changed = seats
+
+            await connection.begin()
+            if not changed:
+                return True, []
+
+            bitmap = with_slots(inventory['seat_bitmap'], [seat['slot'] for seat in changed], free)
+            deltas = queries.free_seat_deltas([seat['seat_type'] for seat in changed], 1 if free else -1)
+            await cursor.execute(queries.SWAP_SEAT_BITMAP, (bitmap,) + deltas + (route_id, inventory['seat_version']))
+            if cursor.rowcount == 1:
+                return True, changed
+            await connection.rollback()
+
+        return False, []
+
+    async def _book_layout_seats(self, passengers: List[Dict], seats: List[Dict], route_id: int,
+                                 user_id: int) -> BookingResult:
+        """Бронирование мест рейса с битовой картой: passengers[i] едет на месте seats[i]"""
+        async with self.pool.acquire() as connection:
+            try:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    swapped, taken = await self._swap_seat_bitmap(connection, cursor, route_id, seats, free=False)
+                    if not swapped:
+                        await connection.rollback()
+                        if taken:
+                            return BookingResult(seat_taken=True, taken_seat_ids=[seat['id'] for seat in taken])
+                        print("Ошибка бронирования: карта мест рейса меняется другими кассами, повторите попытку")
+                        return BookingResult()
+
+                    documents = [passenger['document_number'] for passenger in passengers]
+                    await cursor.executemany(queries.UPSERT_PASSENGER, [
+                        (passenger['full_name'], passenger['document_number'], passenger['phone'])
+                        for passenger in passengers
+                    ])
+                    await cursor.execute(queries.GET_PASSENGER_IDS.format(queries.in_placeholders(documents)),
+                                         documents)
+                    passenger_ids = {row['document_number']: row['id'] for row in await cursor.fetchall()}
+
+                    await cursor.executemany(queries.ADD_LAYOUT_BOOKING, [
+                        (passenger_ids[document], seat['id'], route_id, seat['base_price'], user_id)
+                        for document, seat in zip(documents, seats)
+                    ])
+                    booking_ids = await self._new_booking_ids(cursor, queries.GET_NEW_LAYOUT_BOOKING_IDS,
+                                                              route_id, [seat['id'] for seat in seats])
+
+                await connection.commit()
+                get_route_cache().invalidate_route(route_id)
+                return BookingResult(booking_id=booking_ids[0], booking_ids=booking_ids)
+
+            except Error:
+                await connection.rollback()
+                raise
+
+    @staticmethod
+    async def _new_booking_ids(cursor, query: str, route_id: int, seat_ids: List[int]) -> List[int]:
+        """id только что вставленных бронирований в порядке seat_ids"""
+        await cursor.execute(query.format(queries.in_placeholders(seat_ids)), [route_id] + list(seat_ids))
+        booking_ids = {row['seat_id']: row['id'] for row in await cursor.fetchall()}
+        return [booking_ids[seat_id] for seat_id in seat_ids]
+
+    async def find_passenger_by_document(self, document_number: str) -> Optional[Dict]:
+        """Поиск пассажира по номеру документа"""
+        try:
+            return await self._fetchone(queries.FIND_PASSENGER_BY_DOCUMENT, (document_number,))
+
+        except Error as e:
+            print(f"Ошибка поиска пассажира: {e}")
+            return None
+
+    async def search_passengers(self, name_prefix: str, limit: int = 10) -> List[Dict]:
+        """Поиск пассажиров по началу ФИО"""
+        try:
+            return await self._fetchall(queries.SEARCH_PASSENGERS_BY_NAME, (queries.like_prefix(name_prefix), limit))
+
+        except Error as e:
+            print(f"Ошибка поиска пассажиров: {e}")
+            return []
+
+    async def get_user_bookings(self, user_id: int, filters: Optional[Dict] = None, after: Optional[Tuple] = None,
+                                page_size: int = Config.BOOKINGS_PAGE_SIZE) -> List[Dict]:
+        """Получение страницы бронирований пользователя (after - ключ из queries.page_cursor)"""
+        return await self._get_bookings_page(queries.USER_BOOKINGS_SELECT, dict(filters or {}, user_id=user_id),
+                                             after, page_size)
+
+    async def get_all_bookings(self, filters: Optional[Dict] = None, after: Optional[Tuple] = None,
+                               page_size: int = Config.BOOKINGS_PAGE_SIZE) -> List[Dict]:
+        """Получение страницы всех бронирований с фильтрами (для админа)"""
+        return await self._get_bookings_page(queries.BOOKING_DETAILS_SELECT, filters, after, page_size)
+
+    async def get_user_bookings_with_counts(self, user_id: int, filters: Optional[Dict] = None,
+                                            page_size: int = Config.BOOKINGS_PAGE_SIZE) -> Tuple[List[Dict], Dict]:
+        """Первая страница бронирований пользователя и счетчики по статусам за один запрос"""
+        return await self._get_bookings_with_counts(queries.USER_BOOKINGS_SELECT,
+                                                    dict(filters or {}, user_id=user_id), page_size)
+
+    async def get_all_bookings_with_counts(self, filters: Optional[Dict] = None,
+                                           page_size: int = Config.BOOKINGS_PAGE_SIZE) -> Tuple[List[Dict], Dict]:
+        """Первая страница всех бронирований и счетчики по статусам за один запрос (для админа)"""
+        return await self._get_bookings_with_counts(queries.BOOKING_DETAILS_SELECT, filters, page_size)
+
+    async def _get_bookings_page(self, select: str, filters: Optional[Dict], after: Optional[Tuple],
+                                 page_size: int) -> List[Dict]:
+        """Страница бронирований по фильтрам queries.build_bookings_filter"""
+        try:
+            conditions, params = queries.build_bookings_filter(filters)
+            query, params = queries.build_bookings_page_query(select, conditions, params, after, page_size)
+            return await self._fetchall(query, params)
+
+        except Error as e:
+            print(f"Ошибка получения бронирований: {e}")
+            return []
+
+    async def _get_bookings_with_counts(self, select: str, filters: Optional[Dict],
+                                        page_size: int) -> Tuple[List[Dict], Dict]:
+        """Первая страница бронирований вместе со счетчиками по статусам"""
+        try:
+            query, params = queries.build_bookings_with_counts_query(select, filters, page_size)
+            return queries.split_bookings_with_counts(await self._fetchall(query, params))
+
+        except Error as e:
+            print(f"Ошибка получения бронирований: {e}")
+            return [], {}
+
+    async def get_booking_details(self, booking_id: int) -> Optional[Dict]:
+        """Получение детальной информации о бронировании"""
+        try:
+            return await self._fetchone(queries.GET_BOOKING_DETAILS, (booking_id,))
+
+        except Error as e:
+            print(f"Ошибка получения деталей бронирования: {e}")
+            return None
+
+    async def cancel_booking(self, booking_id: int) -> bool:
+        """Отмена бронирования"""
+        try:
+            async with self.pool.acquire() as connection:
+                # Начинаем транзакцию
+                await connection.begin()
+                try:
+                    async with connection.cursor(aiomysql.DictCursor) as cursor:
+                        # 1. Получаем seat_id для освобождения места
+                        await cursor.execute(queries.GET_BOOKING_SEAT, (booking_id,))
+                        seat_result = await cursor.fetchone()
+
+                        # Повторная отмена не должна освободить место, уже проданное заново:
+                        # для строк мест и для карты рейса место и счетчики не меняются
+                        if not seat_result or seat_result['status'] == 'отменено':
+                            await connection.rollback()
+                            return True
+
+                        released = False
+                        if seat_result['layout_seat_id'] is not None:
+                            # Рейс с битовой картой: место возвращается обменом карты
+                            await connection.rollback()
+                            seat = {'id': seat_result['layout_seat_id'], 'slot': seat_result['slot'],
+                                    'seat_type': seat_result['seat_type']}
+                            swapped, _ = await self._swap_seat_bitmap(connection, cursor, seat_result['route_id'],
+                                                                      [seat], free=True)
+                            if not swapped:
+                                await connection.rollback()
+                                print("Ошибка отмены бронирования: карта мест рейса меняется другими кассами")
+                                return False
+                            await cursor.execute(queries.CANCEL_ACTIVE_BOOKING, (booking_id,))
+                            if cursor.rowcount == 0:
+                                # Бронирование отменила другая касса после проверки: карта не меняется
+                                await connection.rollback()
+                                return True
+                            released = True
+
+                        else:
+                            # 2. Обновляем статус только активного бронирования (его могла отменить другая касса)
+                            await cursor.execute(queries.CANCEL_ACTIVE_BOOKING, (booking_id,))
+                            if cursor.rowcount == 0:
+                                await connection.rollback()
+                                return True
+
+                            # 3. Освобождаем место и возвращаем его в счетчики маршрута
+                            await cursor.execute(queries.RELEASE_SEAT, (seat_result['seat_id'],))
+                            released = cursor.rowcount > 0
+                            if released:
+                                deltas = queries.free_seat_deltas([seat_result['seat_type']])
+                                await cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (seat_result['route_id'],))
+
+                    await connection.commit()
+                    if released:
+                        await self._invalidate_route_searches(connection, seat_result['route_id'])
+                    return True
+
+                except Error:
+                    await connection.rollback()
+                    raise
+
+        except Error as e:
+            print(f"Ошибка отмены бронирования: {e}")
+            return False
+
+    async def confirm_booking(self, booking_id: int) -> bool:
+        """Подтверждение бронирования администратором"""
+        try:
+            return await self._execute(queries.CONFIRM_BOOKING, (booking_id,)) > 0
+
+        except Error as e:
+            print(f"Ошибка подтверждения бронирования: {e}")
+            return False
+
+    async def update_booking_status(self, booking_id: int, status: str) -> bool:
+        """Обновление статуса бронирования"""
+        # Отмена освобождает место и меняет счетчики рейса
+        if status == 'отменено':
+            return await self.cancel_booking(booking_id)
+
+        try:
+            return await self._execute(queries.UPDATE_BOOKING_STATUS, (status, booking_id)) > 0
+
+        except Error as e:
+            print(f"Ошибка обновления статуса бронирования: {e}")
+            return False
+
+    async def get_all_users(self) -> List[Dict]:
+        """Получение списка всех пользователей"""
+        try:
+            return await self._fetchall(queries.GET_ALL_USERS)
+        except Error as e:
+            print(f"Ошибка получения пользователей: {e}")
+            return []
+
+    async def update_user_role(self, user_id: int, new_role: str) -> bool:
+        """Обновление роли пользователя"""
+        try:
+            return await self._execute(queries.UPDATE_USER_ROLE, (new_role, user_id)) > 0
+        except Error as e:
+            print(f"Ошибка обновления роли пользователя: {e}")
+            return False
@@ -3,6 +3,7 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
 from config import Config
+from ui.theme import themed
 from auth.register_window import RegisterWindow
 
 
@@ -20,7 +21,7 @@ class LoginWindow(QWidget):
         self.setFixedSize(1100, 900)
 
         # Основной layout
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(110, 110, 110, 110)
         layout.setSpacing(20)
 
@@ -31,32 +32,20 @@ class LoginWindow(QWidget):
         title_font.setBold(True)
         title.setFont(title_font)
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet(f'color: {Config.COLORS["primary"]}; margin-bottom: 30px;')
+        themed(title, 'loginTitle')
         layout.addWidget(title)
 
         # Иконка
         icon = QLabel('🚆')
         icon.setAlignment(Qt.AlignCenter)
-        icon.setStyleSheet('font-size: 60px; margin-bottom: 20px;')
+        themed(icon, role='icon')
         layout.addWidget(icon)
 
         # Форма входа
         form_group = QGroupBox('Данные для входа')
-        form_group.setStyleSheet(f'''
-            QGroupBox {{
-                font-size: {Config.FONT_SIZES["large"]}px;
-                font-weight: bold;
-                border: 2px solid {Config.COLORS["primary"]};
-                border-radius: 8px;
-                padding-top: 15px;
-            }}
-            QGroupBox::title {{
-                color: {Config.COLORS["primary"]};
-                padding: 0 10px;
-            }}
-        ''')
-
-        form_layout = QVBoxLayout()
+        themed(form_group, 'loginForm')
+
+        form_layout = QVBoxLayout(form_group)
         form_layout.setSpacing(15)
 
         # Поле логина
@@ -66,8 +55,6 @@ class LoginWindow(QWidget):
         # Поле пароля
         self.password_input = self.create_input_field('Пароль:', 'admin123', is_password=True)
         form_layout.addWidget(self.password_input)
-
-        form_group.setLayout(form_layout)
         layout.addWidget(form_group)
 
         # Кнопки
@@ -77,19 +64,7 @@ class LoginWindow(QWidget):
 
         register_btn = QPushButton('📝 Регистрация')
         register_btn.setMinimumHeight(50)
-        register_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #1976D2;
-            }}
-        ''')
+        themed(register_btn, variant='secondary')
         register_btn.clicked.connect(self.show_register_window)
 
         buttons_layout.addWidget(self.login_btn)
@@ -102,18 +77,10 @@ class LoginWindow(QWidget):
                       'Логин: admin / Пароль: admin123 (Администратор)\n'
                       'Логин: test_user / Пароль: test123 (Пользователь)')
         info.setAlignment(Qt.AlignCenter)
-        info.setStyleSheet(f'''
-            color: #666;
-            font-size: {Config.FONT_SIZES["small"]}px;
-            margin-top: 20px;
-            padding: 15px;
-            background-color: #f9f9f9;
-            border-radius: 8px;
-        ''')
+        themed(info, 'loginInfo')
         layout.addWidget(info)
 
         layout.addStretch()
-        self.setLayout(layout)
 
         # Фокус
         self.username_input.findChild(QLineEdit).setFocus()
@@ -121,12 +88,12 @@ class LoginWindow(QWidget):
     def create_input_field(self, label_text, placeholder, is_password=False):
         """Создание поля ввода"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(5)
 
         label = QLabel(label_text)
-        label.setStyleSheet(f'font-weight: bold; font-size: {Config.FONT_SIZES["normal"]}px;')
+        themed(label, role='field')
         layout.addWidget(label)
 
         field = QLineEdit()
@@ -138,39 +105,15 @@ class LoginWindow(QWidget):
         else:
             field.setText(placeholder)
 
-        field.setStyleSheet(f'''
-            QLineEdit {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 12px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {Config.COLORS["primary"]};
-            }}
-        ''')
+        themed(field, 'loginField')
         layout.addWidget(field)
-
-        widget.setLayout(layout)
         return widget
 
     def create_button(self, text, handler):
         """Создание кнопки"""
         btn = QPushButton(text)
         btn.setMinimumHeight(55)
-        btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["primary"]};
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: {Config.FONT_SIZES["xlarge"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #b71c1c;
-            }}
-        ''')
+        themed(btn, variant='primary', size='xlarge')
         btn.clicked.connect(handler)
         return btn
 
@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
-from config import Config
+from ui.theme import themed
 
 
 class RegisterWindow(QDialog):
@@ -17,17 +17,13 @@ class RegisterWindow(QDialog):
         self.setWindowTitle('Регистрация')
         self.setFixedSize(500, 450)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('РЕГИСТРАЦИЯ')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["xlarge"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='window-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
@@ -51,7 +47,7 @@ class RegisterWindow(QDialog):
 
         # Сообщение об ошибке
         self.error_label = QLabel('')
-        self.error_label.setStyleSheet(f'color: {Config.COLORS["danger"]}; font-size: {Config.FONT_SIZES["small"]}px;')
+        themed(self.error_label, role='error')
         self.error_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.error_label)
 
@@ -60,43 +56,18 @@ class RegisterWindow(QDialog):
 
         register_btn = QPushButton('Зарегистрироваться')
         register_btn.setMinimumHeight(45)
-        register_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-        ''')
+        themed(register_btn, variant='success')
         register_btn.clicked.connect(self.register)
 
         cancel_btn = QPushButton('Отмена')
         cancel_btn.setMinimumHeight(45)
-        cancel_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #1976D2;
-            }}
-        ''')
+        themed(cancel_btn, variant='secondary')
         cancel_btn.clicked.connect(self.reject)
 
         buttons_layout.addWidget(register_btn)
         buttons_layout.addWidget(cancel_btn)
 
         layout.addLayout(buttons_layout)
-        self.setLayout(layout)
 
     def create_input_field(self, placeholder, is_password=False):
         """Создание поля ввода"""
@@ -106,17 +77,6 @@ class RegisterWindow(QDialog):
         if is_password:
             field.setEchoMode(QLineEdit.Password)
 
-        field.setStyleSheet(f'''
-            QLineEdit {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 10px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {Config.COLORS["primary"]};
-            }}
-        ''')
         return field
 
     def register(self):
@@ -0,0 +1 @@
+# Нагрузочные замеры запросов к базе данных (запуск: python -m benchmarks.<имя>)
@@ -0,0 +1,215 @@
+# Конкурентное бронирование: много касс одновременно продают места одного рейса
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from config import Config
+from database import Database
+from db_backend import backend_name
+
+TRAIN_NUMBER = 'BENCH-001'
+BENCH_USER = 'bench_cashier'
+
+LOCK_STATUS = """
+SHOW GLOBAL STATUS
+WHERE Variable_name IN ('Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_deadlocks')
+"""
+
+DOUBLE_SALES = """
+SELECT seat_id, COUNT(*) AS sold
+FROM bookings
+WHERE route_id = %s AND status != 'отменено'
+GROUP BY seat_id
+HAVING COUNT(*) > 1
+"""
+
+ROUTE_STATE = """
+SELECT r.free_seats,
+       (SELECT COUNT(*) FROM seats s WHERE s.route_id = r.id AND s.status = 'свободно') AS actual_free,
+       (SELECT COUNT(*) FROM bookings b WHERE b.route_id = r.id) AS bookings
+FROM routes r
+WHERE r.id = %s
+"""
+
+
+def lock_status(db) -> dict:
+    """Счетчики ожиданий блокировок InnoDB (в SQLite их нет)"""
+    if backend_name() == 'sqlite':
+        return {}
+    db.cursor.execute(LOCK_STATUS)
+    return {row['Variable_name']: int(row['Value']) for row in db.cursor.fetchall()}
+
+
+def prepare_user(db) -> Optional[int]:
+    """Отдельный пользователь замера (в новой базе других пользователей может не быть)"""
+    users = [user for user in db.get_all_users() if user['username'] == BENCH_USER]
+    if not users:
+        db.register_user(BENCH_USER, BENCH_USER, 'Замер конкурентной продажи')
+        users = [user for user in db.get_all_users() if user['username'] == BENCH_USER]
+    return users[0]['id'] if users else None
+
+
+def prepare_route(db, seats: int) -> int:
+    """Отдельный рейс для замера"""
+    trains = [train for train in db.get_all_trains() if train['train_number'] == TRAIN_NUMBER]
+    if not trains:
+        db.add_train(TRAIN_NUMBER, 'Замер конкурентной продажи', 'default')
+        trains = [train for train in db.get_all_trains() if train['train_number'] == TRAIN_NUMBER]
+
+    departure = datetime.now() + timedelta(days=30)
+    return db.add_route(trains[0]['id'], 'Замер-А', 'Замер-Б',
+                        departure.strftime('%Y-%m-%d %H:%M:00'),
+                        (departure + timedelta(hours=5)).strftime('%Y-%m-%d %H:%M:00'),
+                        1000, num_seats=seats, train_type='default')
+
+
+def cleanup(db, route_id: int):
+    """Удаление данных замера"""
+    db.cursor.execute("SELECT passenger_id FROM bookings WHERE route_id = %s", (route_id,))
+    passenger_ids = [row['passenger_id'] for row in db.cursor.fetchall()]
+
+    db.cursor.execute("DELETE FROM bookings WHERE route_id = %s", (route_id,))
+    if passenger_ids:
+        placeholders = ', '.join(['%s'] * len(passenger_ids))
+        # Пассажиры общие для всех рейсов: удаляются только те, у кого не осталось бронирований
+        db.cursor.execute(f"DELETE FROM passengers WHERE id IN ({placeholders}) "
+                          f"AND id NOT IN (SELECT passenger_id FROM bookings)", passenger_ids)
+    db.cursor.execute("DELETE FROM seats WHERE route_id = %s", (route_id,))
+    db.cursor.execute("DELETE FROM routes WHERE id = %s", (route_id,))
+    db.connection.commit()
+
+
+def cashier(number: int, route_id: int, user_id: int, max_errors: int, stats: dict, lock: threading.Lock):
+    """Касса: берет случайное свободное место из своего (устаревающего) списка, пока места есть.
+
+    После max_errors ошибок подряд (не занятых мест) касса останавливается.
+    """
+    db = Database()
+    if not db.connect():
+        with lock:
+            stats['errors'] += 1
+        return
+
+    try:
+        sale = errors = 0
+        while errors < max_errors:
+            free = db.get_available_seats(route_id)
+            if not free:
+                break
+
+            seat = random.choice(free)
+            sale += 1
+            passenger = {'full_name': f'Пассажир {number}-{sale}',
+                         'document_number': f'{number:04d}{sale:06d}',
+                         'phone': ''}
+
+            started = time.perf_counter()
+            result = db.create_booking(passenger, seat['seat_id'], route_id, user_id)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            with lock:
+                stats['latencies_ms'].append(elapsed)
+                if result.success:
+                    stats['sold'] += 1
+                elif result.seat_taken:
+                    stats['seat_taken'] += 1
+                else:
+                    stats['errors'] += 1
+            # Постоянная ошибка (внешний ключ, неверный пользователь) не должна повторяться бесконечно
+            errors = errors + 1 if not result.success and not result.seat_taken else 0
+
+        if errors >= max_errors:
+            with lock:
+                stats['stopped_cashiers'] += 1
+    finally:
+        db.disconnect()
+
+
+def percentile(values, share: float) -> float:
+    """Перцентиль по отсортированной выборке"""
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * share))], 2) if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер конкурентной продажи мест одного рейса")
+    parser.add_argument('--clients', type=int, default=50, help="число одновременных касс")
+    parser.add_argument('--seats', type=int, default=500, help="мест на рейсе")
+    parser.add_argument('--user-id', type=int,
+                        help="пользователь, от имени которого продаются билеты (по умолчанию - пользователь замера)")
+    parser.add_argument('--max-errors', type=int, default=5,
+                        help="ошибок подряд, после которых касса останавливается")
+    parser.add_argument('--keep', action='store_true', help="не удалять рейс и бронирования после замера")
+    args = parser.parse_args()
+
+    # Каждой кассе - свое соединение; размер пула задается до первого обращения к нему
+    Config.DB_POOL = dict(Config.DB_POOL, size=args.clients + 1)
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    user_id = args.user_id or prepare_user(db)
+    route_id = prepare_route(db, args.seats) if user_id else None
+    if not route_id:
+        db.disconnect()
+        raise SystemExit(1)
+
+    stats = {'sold': 0, 'seat_taken': 0, 'errors': 0, 'stopped_cashiers': 0, 'latencies_ms': []}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=cashier, args=(number, route_id, user_id, args.max_errors, stats, lock))
+               for number in range(args.clients)]
+
+    try:
+        locks_before = lock_status(db)
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        locks_after = lock_status(db)
+
+        # Новая транзакция, чтобы читать данные после всех продаж, а не старый снимок
+        db.connection.commit()
+        db.cursor.execute(DOUBLE_SALES, (route_id,))
+        double_sales = db.cursor.fetchall()
+        db.cursor.execute(ROUTE_STATE, (route_id,))
+        state = db.cursor.fetchone()
+        db.connection.commit()
+
+        latencies = stats['latencies_ms']
+        print(json.dumps({
+            'backend': backend_name(),
+            'clients': args.clients,
+            'seats': args.seats,
+            'sold': stats['sold'],
+            'seat_taken': stats['seat_taken'],
+            'errors': stats['errors'],
+            'stopped_cashiers': stats['stopped_cashiers'],
+            'bookings_per_sec': round(stats['sold'] / elapsed, 1) if elapsed else 0,
+            'latency_ms': {'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95),
+                           'p99': percentile(latencies, 0.99),
+                           'mean': round(statistics.mean(latencies), 2) if latencies else 0},
+            'double_sales': len(double_sales),
+            'bookings_in_db': state['bookings'],
+            'free_seats_counter': state['free_seats'],
+            'free_seats_actual': state['actual_free'],
+            'lock_waits': {name: locks_after[name] - locks_before.get(name, 0) for name in locks_after}
+        }, ensure_ascii=False, indent=2))
+
+        # Замер, в котором продажи не прошли из-за ошибок, не считается результатом
+        if not stats['sold'] and stats['errors']:
+            raise SystemExit("Ни одно место не продано: все бронирования завершились ошибкой")
+    finally:
+        if not args.keep:
+            cleanup(db, route_id)
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# Синтетические данные для замеров: поезда, рейсы, места, пассажиры и бронирования
+# с неравномерной популярностью станций. Загрузчик запускается один на базу:
+# id многострочной вставки берутся подряд от lastrowid. Места хранятся строками seats
+# или битовыми картами рейсов (--inventory, см. Config.SEAT_INVENTORY)
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from config import Config
+from database import Database
+from reference_cache import get_reference_cache
+from seat_layouts import generate_seats
+from seat_map import all_free, with_slots
+import queries
+
+# Станции в порядке убывания популярности
+STATIONS = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород',
+            'Самара', 'Ростов-на-Дону', 'Краснодар', 'Уфа', 'Пермь', 'Воронеж', 'Волгоград', 'Красноярск',
+            'Омск', 'Челябинск', 'Саратов', 'Тюмень', 'Иркутск', 'Хабаровск', 'Владивосток', 'Ярославль',
+            'Томск', 'Барнаул', 'Киров', 'Пенза', 'Улан-Удэ', 'Чита', 'Мурманск', 'Архангельск']
+
+TRAIN_PREFIX = 'SYN-'
+USER_PREFIX = 'syn_cashier_'
+DOCUMENT_PREFIX = 'SYN'
+
+# Доли статусов проданных мест: (статус, подтверждено администратором, доля)
+SOLD_STATUSES = [('забронирован', False, 0.5), ('оплачен', False, 0.35), ('подтвержден', True, 0.15)]
+
+INSERT_SEAT = """
+INSERT INTO seats (route_id, carriage_number, seat_number, seat_type, status)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+INSERT_BOOKING = """
+INSERT INTO bookings (passenger_id, seat_id, route_id, user_id, status, final_price,
+                      confirmed_by_admin, booking_date)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_LAYOUT_BOOKING = """
+INSERT INTO bookings (passenger_id, layout_seat_id, route_id, user_id, status, final_price,
+                      confirmed_by_admin, booking_date)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_PASSENGER = "INSERT INTO passengers (full_name, document_number, phone) VALUES (%s, %s, %s)"
+
+SYNTHETIC_ROUTES = f"""
+SELECT r.id FROM routes r JOIN trains t ON t.id = r.train_id WHERE t.train_number LIKE '{TRAIN_PREFIX}%'
+"""
+
+CLEANUP = [
+    f"DELETE FROM bookings WHERE route_id IN ({SYNTHETIC_ROUTES})",
+    f"DELETE FROM seats WHERE route_id IN ({SYNTHETIC_ROUTES})",
+    f"DELETE FROM routes WHERE id IN ({SYNTHETIC_ROUTES})",
+    f"DELETE FROM trains WHERE train_number LIKE '{TRAIN_PREFIX}%'",
+    f"DELETE FROM passengers WHERE document_number LIKE '{DOCUMENT_PREFIX}%' "
+    f"AND id NOT IN (SELECT passenger_id FROM bookings)"
+]
+
+FIRST_NAMES = ['Иван', 'Петр', 'Анна', 'Мария', 'Сергей', 'Елена', 'Алексей', 'Ольга', 'Дмитрий', 'Наталья']
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов',
+              'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов']
+
+
+def station_weights(skew: float):
+    """Популярность станций по закону Ципфа: вес i-й станции 1 / (i + 1)^skew"""
+    return [1 / (rank + 1) ** skew for rank in range(len(STATIONS))]
+
+
+def insert_batch(db: Database, query: str, rows) -> range:
+    """Многострочная вставка; id вставленных строк"""
+    if not rows:
+        return range(0)
+    db.cursor.executemany(query, rows)
+    first_id = db.cursor.lastrowid
+    return range(first_id, first_id + len(rows))
+
+
+def add_users(db: Database, count: int):
+    """Кассиры, от имени которых оформлены бронирования (пароль совпадает с логином)"""
+    select = "SELECT id, username FROM users WHERE username LIKE %s"
+    db.cursor.execute(select, (queries.like_prefix(USER_PREFIX),))
+    existing = {row['username'] for row in db.cursor.fetchall()}
+
+    rows = [(f'{USER_PREFIX}{number}', f'{USER_PREFIX}{number}', f'Кассир {number}')
+            for number in range(1, count + 1) if f'{USER_PREFIX}{number}' not in existing]
+    if rows:
+        db.cursor.executemany(queries.REGISTER_USER, rows)
+        db.connection.commit()
+
+    db.cursor.execute(select, (queries.like_prefix(USER_PREFIX),))
+    return [row['id'] for row in db.cursor.fetchall()][:count]
+
+
+def add_passengers(db: Database, count: int, rng: random.Random, batch: int):
+    """Пассажиры с уникальными номерами документов"""
+    ids = []
+    for offset in range(0, count, batch):
+        rows = [(f'{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}', f'{DOCUMENT_PREFIX}{number:09d}',
+                 f'+7{rng.randint(9000000000, 9999999999)}')
+                for number in range(offset, min(count, offset + batch))]
+        ids.extend(insert_batch(db, INSERT_PASSENGER, rows))
+        db.connection.commit()
+    return ids
+
+
+def add_trains(db: Database, count: int, rng: random.Random):
+    """Поезда со случайными типами из схем вагонов"""
+    train_types = list(Config.CARRIAGE_LAYOUTS)
+    rows = [(f'{TRAIN_PREFIX}{number:05d}', f'Синтетический {number}', rng.choice(train_types))
+            for number in range(1, count + 1)]
+    ids = insert_batch(db, queries.ADD_TRAIN, rows)
+    db.connection.commit()
+    return [(train_id, row[2]) for train_id, row in zip(ids, rows)]
+
+
+def generate(db: Database, args) -> dict:
+    """Загрузка набора данных заданного масштаба; возвращает число строк по таблицам"""
+    rng = random.Random(args.seed)
+    weights = station_weights(args.skew)
+    counts = {'users': 0, 'passengers': 0, 'trains': 0, 'routes': 0, 'seats': 0, 'bookings': 0}
+
+    user_ids = add_users(db, args.users)
+    passenger_ids = add_passengers(db, args.passengers, rng, args.batch)
+    trains = add_trains(db, args.trains, rng)
+    counts.update(users=len(user_ids), passengers=len(passenger_ids), trains=len(trains))
+    train_types = dict(trains)
+    layout_ids = {}
+
+    # Популярность рейса - произведение весов станций; среднее оценивается по выборке
+    popularity = [weights[a] * weights[b] for a, b in
+                  (rng.sample(range(len(STATIONS)), 2) for _ in range(10000))]
+    mean_popularity = sum(popularity) / len(popularity)
+
+    now = datetime.now().replace(second=0, microsecond=0)
+    routes_per_batch = max(1, args.batch // max(1, args.seats_per_route))
+    for offset in range(0, args.routes, routes_per_batch):
+        planned = []
+        for _ in range(min(routes_per_batch, args.routes - offset)):
+            train_id, train_type = rng.choice(trains)
+            departure, arrival = rng.choices(range(len(STATIONS)), weights=weights, k=2)
+            while arrival == departure:
+                arrival = rng.choices(range(len(STATIONS)), weights=weights)[0]
+
+            per_carriage = Config.CARRIAGE_LAYOUTS[train_type]['seats_per_carriage']
+            num_seats = per_carriage * max(1, round(args.seats_per_route / per_carriage))
+            seats = generate_seats(num_seats, train_type)
+
+            # Загрузка рейса растет с популярностью направления
+            share = weights[departure] * weights[arrival] / mean_popularity
+            sold_count = min(num_seats, round(num_seats * min(0.98, args.fill * share)))
+            sold = set(rng.sample(range(num_seats), sold_count))
+
+            departure_time = now + timedelta(minutes=rng.randint(-args.days * 1440, args.days * 1440))
+            arrival_time = departure_time + timedelta(hours=rng.randint(2, 96))
+            free_types = [seat_type for index, (_, _, seat_type) in enumerate(seats) if index not in sold]
+            planned.append((train_id, STATIONS[departure], STATIONS[arrival], departure_time, arrival_time,
+                            rng.randrange(500, 15000, 50), seats, sold, free_types))
+
+        if args.inventory == 'bitmap':
+            # Места - общая схема поезда (id мест подряд по позициям), занятость - карта рейса
+            for route in planned:
+                key = (train_types[route[0]], len(route[6]))
+                if key not in layout_ids:
+                    layout_ids[key] = db.get_seat_layout(*key)
+            layouts = [layout_ids[(train_types[route[0]], len(route[6]))] for route in planned]
+            route_rows = []
+            for route, layout_id in zip(planned, layouts):
+                bitmap = with_slots(all_free(len(route[6])), route[7], False)
+                route_rows.append(route[:6] + queries.free_seat_deltas(route[8]) + (layout_id, bitmap))
+            route_ids = insert_batch(db, queries.ADD_BITMAP_ROUTE, route_rows)
+            seat_rows = []
+            seat_ids = iter([db.get_layout_map(layout_id).seat_id(carriage, number)
+                             for layout_id, route in zip(layouts, planned) for carriage, number, _ in route[6]])
+        else:
+            route_ids = insert_batch(db, queries.ADD_ROUTE, [
+                (train_id, departure, arrival, departure_time, arrival_time, price,
+                 *queries.free_seat_deltas(free_types))
+                for train_id, departure, arrival, departure_time, arrival_time, price, _, _, free_types in planned
+            ])
+
+            seat_rows = [(route_id, carriage, number, seat_type,
+                          'забронировано' if index in route[7] else 'свободно')
+                         for route_id, route in zip(route_ids, planned)
+                         for index, (carriage, number, seat_type) in enumerate(route[6])]
+            seat_ids = iter(insert_batch(db, INSERT_SEAT, seat_rows))
+
+        booking_rows = []
+        for route_id, route in zip(route_ids, planned):
+            departure_time, price, seats, sold = route[3], route[5], route[6], route[7]
+            for index in range(len(seats)):
+                seat_id = next(seat_ids)
+                if index in sold:
+                    status, confirmed = rng.choices([(s, c) for s, c, _ in SOLD_STATUSES],
+                                                    weights=[w for _, _, w in SOLD_STATUSES])[0]
+                elif rng.random() < args.cancelled:
+                    status, confirmed = 'отменено', False
+                else:
+                    continue
+                booked_at = min(now, departure_time - timedelta(minutes=rng.randint(60, 60 * 24 * 60)))
+                booking_rows.append((rng.choice(passenger_ids), seat_id, route_id, rng.choice(user_ids),
+                                     status, price, confirmed, booked_at))
+
+        insert_booking = INSERT_LAYOUT_BOOKING if args.inventory == 'bitmap' else INSERT_BOOKING
+        for start in range(0, len(booking_rows), args.batch):
+            insert_batch(db, insert_booking, booking_rows[start:start + args.batch])
+        db.connection.commit()
+
+        counts['routes'] += len(planned)
+        counts['seats'] += len(seat_rows)
+        counts['bookings'] += len(booking_rows)
+
+    get_reference_cache().invalidate('stations', 'trains', 'train_types')
+    return counts
+
+
+def synthetic_exists(db: Database) -> bool:
+    db.cursor.execute(f"SELECT 1 FROM trains WHERE train_number LIKE '{TRAIN_PREFIX}%' LIMIT 1")
+    return db.cursor.fetchone() is not None
+
+
+def drop(db: Database):
+    """Удаление синтетических данных (кассиры остаются, если на них есть бронирования)"""
+    for statement in CLEANUP:
+        db.cursor.execute(statement)
+    db.cursor.execute("DELETE FROM users WHERE username LIKE %s AND id NOT IN (SELECT user_id FROM bookings)",
+                      (queries.like_prefix(USER_PREFIX),))
+    db.connection.commit()
+    get_reference_cache().invalidate('stations', 'trains', 'train_types')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация синтетических данных для замеров")
+    parser.add_argument('--trains', type=int, default=1000)
+    parser.add_argument('--routes', type=int, default=20000)
+    parser.add_argument('--seats-per-route', type=int, default=100, help="мест на рейсе (в среднем)")
+    parser.add_argument('--fill', type=float, default=0.5, help="средняя доля проданных мест")
+    parser.add_argument('--cancelled', type=float, default=0.05, help="доля свободных мест с отмененной продажей")
+    parser.add_argument('--passengers', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=50, help="число кассиров")
+    parser.add_argument('--skew', type=float, default=1.1, help="степень неравномерности популярности станций")
+    parser.add_argument('--days', type=int, default=180, help="рейсы в пределах +-days дней от сегодня")
+    parser.add_argument('--batch', type=int, default=5000, help="строк в одной вставке")
+    parser.add_argument('--inventory', choices=['rows', 'bitmap'], default='rows',
+                        help="хранение мест: строки seats или битовые карты рейсов")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--drop', action='store_true', help="удалить синтетические данные и выйти")
+    args = parser.parse_args()
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    try:
+        if args.drop:
+            drop(db)
+            return
+        if synthetic_exists(db):
+            print("Синтетические данные уже загружены (удаление: --drop)")
+            raise SystemExit(1)
+
+        started = time.perf_counter()
+        counts = generate(db, args)
+        print(json.dumps({'rows': counts, 'seconds': round(time.perf_counter() - started, 1)},
+                         ensure_ascii=False, indent=2))
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
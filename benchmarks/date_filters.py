@@ -0,0 +1,121 @@
+# Сравнение фильтров по дате: функция над колонкой против полуинтервала по индексу
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from database import Database
+import queries
+
+BENCH_TABLE = 'bench_routes'
+
+CREATE_BENCH_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    departure_station VARCHAR(100) NOT NULL,
+    arrival_station VARCHAR(100) NOT NULL,
+    departure_time DATETIME NOT NULL,
+    free_seats INT NOT NULL,
+    INDEX idx_bench_departure (departure_time)
+)
+"""
+
+INSERT_BENCH_ROUTE = f"""
+INSERT INTO {BENCH_TABLE} (departure_station, arrival_station, departure_time, free_seats)
+VALUES (%s, %s, %s, %s)
+"""
+
+BENCH_SELECT = f"SELECT r.* FROM {BENCH_TABLE} r WHERE r.free_seats > 0"
+
+# Прежние условия фильтра: колонка внутри функции, индекс не используется
+LEGACY_DATE_FILTERS = {
+    'today': "DATE(r.departure_time) = CURDATE()",
+    'tomorrow': "DATE(r.departure_time) = DATE_ADD(CURDATE(), INTERVAL 1 DAY)",
+    'this_week': "YEARWEEK(r.departure_time, 1) = YEARWEEK(CURDATE(), 1)",
+    'next_week': "YEARWEEK(r.departure_time, 1) = YEARWEEK(DATE_ADD(CURDATE(), INTERVAL 7 DAY), 1)"
+}
+
+STATIONS = ['Москва', 'Санкт-Петербург', 'Иркутск', 'Новосибирск', 'Екатеринбург',
+            'Красноярск', 'Казань', 'Омск', 'Улан-Удэ', 'Чита']
+
+
+def fill_table(db: Database, rows: int, days: int = 365, batch: int = 10000):
+    """Заполнение таблицы замера рейсами, равномерно распределенными по +-days дней"""
+    db.cursor.execute(f"SELECT COUNT(*) AS total FROM {BENCH_TABLE}")
+    existing = db.cursor.fetchone()['total']
+    if existing >= rows:
+        return
+
+    now = datetime.now()
+    for offset in range(existing, rows, batch):
+        chunk = []
+        for _ in range(min(batch, rows - offset)):
+            departure, arrival = random.sample(STATIONS, 2)
+            departure_time = now + timedelta(minutes=random.randint(-days * 1440, days * 1440))
+            chunk.append((departure, arrival, departure_time.replace(microsecond=0), random.randint(0, 36)))
+        db.cursor.executemany(INSERT_BENCH_ROUTE, chunk)
+        db.connection.commit()
+
+
+def explain(db: Database, query: str, params) -> dict:
+    """Тип доступа, индекс и оценка числа строк из EXPLAIN"""
+    db.cursor.execute("EXPLAIN " + query, params)
+    plan = db.cursor.fetchone()
+    return {'type': plan['type'], 'key': plan['key'], 'rows': plan['rows']}
+
+
+def measure(db: Database, query: str, params, repeat: int) -> dict:
+    """Медиана и минимум времени выполнения запроса с получением всех строк"""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.cursor.execute(query, params)
+        rows = len(db.cursor.fetchall())
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {'rows': rows, 'median_ms': round(statistics.median(timings), 2), 'min_ms': round(min(timings), 2)}
+
+
+def run(db: Database, repeat: int) -> dict:
+    """Замеры прежнего и нового условия для каждого периода"""
+    results = {}
+    today = date.today()
+    for period, legacy_condition in LEGACY_DATE_FILTERS.items():
+        legacy_query = f"{BENCH_SELECT} AND {legacy_condition} ORDER BY r.departure_time"
+        range_query = BENCH_SELECT + queries.DEPARTURE_RANGE + " ORDER BY r.departure_time"
+        bounds = queries.period_bounds(period, today)
+
+        results[period] = {
+            'legacy': {**explain(db, legacy_query, ()), **measure(db, legacy_query, (), repeat)},
+            'half_open': {**explain(db, range_query, bounds), **measure(db, range_query, bounds, repeat)}
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер фильтров по дате отправления")
+    parser.add_argument('--rows', type=int, default=1000000, help="число рейсов в таблице замера")
+    parser.add_argument('--repeat', type=int, default=5, help="повторов каждого запроса")
+    parser.add_argument('--drop', action='store_true', help="удалить таблицу замера после запуска")
+    args = parser.parse_args()
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    try:
+        db.cursor.execute(CREATE_BENCH_TABLE)
+        fill_table(db, args.rows)
+        print(json.dumps({'table_rows': args.rows, 'results': run(db, args.repeat)},
+                         ensure_ascii=False, indent=2))
+    finally:
+        if args.drop:
+            db.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+# Нагрузочный прогон: несколько касс (отдельных процессов) работают с базой так же,
+# как окна приложения: поиск рейсов, схема мест, бронирование, оплата, иногда отмена
+# (в том числе повторная отмена бронирования, место которого могло быть продано заново).
+# Работает на синтетических данных (python -m benchmarks.dataset)
+import argparse
+import json
+import multiprocessing
+import random
+import statistics
+import time
+from datetime import datetime
+from config import Config
+from database import Database
+from db_backend import backend_name
+from query_stats import get_query_stats
+from route_cache import get_route_cache
+from seat_allocator import SeatAllocator
+from benchmarks.concurrent_booking import ROUTE_STATE, lock_status, percentile
+from benchmarks.dataset import DOCUMENT_PREFIX, USER_PREFIX, synthetic_exists
+import queries
+
+# Шаги сеанса кассира в порядке выполнения
+STEPS = ('list_routes', 'route_info', 'seat_map', 'book', 'my_bookings', 'pay', 'cancel')
+
+# Запрос окна выбора мест (SeatSelectionWindow.load_route_info)
+ROUTE_INFO = """
+SELECT t.train_name, t.train_number, r.departure_station, r.arrival_station,
+       r.departure_time, r.arrival_time, r.base_price
+FROM routes r
+JOIN trains t ON r.train_id = t.id
+WHERE r.id = %s
+"""
+
+# Места, проданные в прогоне, у которых есть еще одно действующее бронирование
+DOUBLE_SALES = """
+SELECT COALESCE(b.seat_id, b.layout_seat_id) as seat_id
+FROM bookings b
+WHERE b.id > %s AND b.status != 'отменено'
+  AND EXISTS (SELECT 1 FROM bookings o
+              WHERE (o.seat_id = b.seat_id
+                     OR (o.route_id = b.route_id AND o.layout_seat_id = b.layout_seat_id))
+                AND o.id != b.id AND o.status != 'отменено')
+"""
+
+# Коды ошибок MySQL: взаимоблокировка и превышение ожидания блокировки
+DEADLOCK = 1213
+LOCK_WAIT_TIMEOUT = 1205
+
+
+class ErrorSink:
+    """Приемник замеров: число ошибок запросов по классу и коду"""
+
+    def __init__(self):
+        self.errors = {}
+
+    def record(self, call):
+        if call.error is not None:
+            self.errors[call.error] = self.errors.get(call.error, 0) + 1
+
+
+def zipf_choice(rng: random.Random, items, skew: float):
+    """Элемент списка с весом 1 / (i + 1)^skew: первые элементы выбираются чаще"""
+    weights = [1 / (rank + 1) ** skew for rank in range(len(items))]
+    return rng.choices(items, weights=weights)[0]
+
+
+class Cashier:
+    """Кассир: сеансы продажи с паузами на раздумья до окончания прогона"""
+
+    def __init__(self, number: int, user_id: int, pairs, args):
+        self.number = number
+        self.user_id = user_id
+        self.pairs = pairs
+        self.args = args
+        self.rng = random.Random(args.seed * 1000 + number)
+        self.db = Database()
+        self.sale = 0
+        # Отмененные кассой бронирования: часть из них позже отменяется повторно
+        self.cancelled_ids = []
+        self.result = {'sessions': 0, 'empty_searches': 0, 'sold': 0, 'tickets': 0, 'paid': 0,
+                       'cancelled': 0, 'recancelled': 0, 'seat_taken': 0, 'retries': 0, 'failed': 0,
+                       'steps': {step: [] for step in STEPS}, 'routes': set()}
+
+    def think(self):
+        if self.args.think_ms > 0:
+            time.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+
+    def step(self, name: str, method, *args):
+        """Шаг сеанса как в окне: подключение, вызов, отключение; время пишется в замеры шага"""
+        started = time.perf_counter()
+        if not self.db.connect():
+            return None
+        try:
+            return method(*args)
+        finally:
+            self.db.disconnect()
+            self.result['steps'][name].append((time.perf_counter() - started) * 1000)
+
+    def route_info(self, route_id: int):
+        self.db.cursor.execute(ROUTE_INFO, (route_id,))
+        return self.db.cursor.fetchone()
+
+    def passenger(self) -> dict:
+        """Новый пассажир или постоянный (с уже известным номером документа)"""
+        if self.args.known_passengers and self.rng.random() < self.args.returning:
+            document = f'{DOCUMENT_PREFIX}{self.rng.randrange(self.args.known_passengers):09d}'
+            return {'full_name': f'Постоянный {document}', 'document_number': document, 'phone': ''}
+
+        self.sale += 1
+        return {'full_name': f'Нагрузка {self.number}-{self.sale}',
+                'document_number': f'{DOCUMENT_PREFIX}L{self.number:03d}{self.sale:07d}', 'phone': ''}
+
+    def book(self, route_id: int):
+        """Выбор мест по схеме и бронирование; при занятом месте схема открывается заново"""
+        for attempt in range(self.args.attempts):
+            if attempt:
+                self.result['retries'] += 1
+            seat_map = self.step('seat_map', self.db.get_seat_map, route_id)
+            if not seat_map or not seat_map.free_count():
+                return None
+            self.think()
+
+            size = self.rng.randint(2, self.args.max_group) if self.rng.random() < self.args.group_share else 1
+            if size > 1:
+                seat_ids = SeatAllocator(seat_map).allocate(size)
+                if not seat_ids:
+                    return None
+                result = self.step('book', self.db.create_group_booking,
+                                   [self.passenger() for _ in seat_ids], seat_ids, route_id, self.user_id)
+            else:
+                seat_ids = [self.rng.choice(list(seat_map.free_seats()))['seat_id']]
+                result = self.step('book', self.db.create_booking,
+                                   self.passenger(), seat_ids[0], route_id, self.user_id)
+
+            if result is not None and result.success:
+                self.result['sold'] += 1
+                self.result['tickets'] += len(seat_ids)
+                return result.booking_ids or [result.booking_id]
+            if result is not None and result.seat_taken:
+                self.result['seat_taken'] += 1
+
+        self.result['failed'] += 1
+        return None
+
+    def recancel(self):
+        """Повторная отмена давнего бронирования: проданное заново место не должно освободиться"""
+        booking_id = self.cancelled_ids.pop(self.rng.randrange(len(self.cancelled_ids)))
+        if self.step('cancel', self.db.cancel_booking, booking_id):
+            self.result['recancelled'] += 1
+
+    def session(self):
+        """Один покупатель у кассы"""
+        self.result['sessions'] += 1
+        if self.cancelled_ids and self.rng.random() < self.args.recancel_share:
+            self.recancel()
+        departure, arrival = zipf_choice(self.rng, self.pairs, self.args.skew)
+        filters = {'departure_station': departure, 'arrival_station': arrival}
+        if self.rng.random() < 0.5:
+            filters['date_filter'] = self.rng.choice(queries.DATE_PERIODS)
+
+        routes = self.step('list_routes', self.db.get_all_available_routes, filters)
+        if not routes and 'date_filter' in filters:
+            del filters['date_filter']
+            routes = self.step('list_routes', self.db.get_all_available_routes, filters)
+        if not routes:
+            self.result['empty_searches'] += 1
+            return
+        self.think()
+
+        # Ближайшие рейсы популярнее поздних
+        route_id = zipf_choice(self.rng, routes, self.args.skew)['route_id']
+        self.result['routes'].add(route_id)
+        self.step('route_info', self.route_info, route_id)
+
+        booking_ids = self.book(route_id)
+        if not booking_ids:
+            return
+        self.think()
+
+        self.step('my_bookings', self.db.get_user_bookings_with_counts, self.user_id)
+        if self.rng.random() < self.args.cancel_share:
+            for booking_id in booking_ids:
+                if self.step('cancel', self.db.cancel_booking, booking_id):
+                    self.result['cancelled'] += 1
+                    self.cancelled_ids.append(booking_id)
+        elif self.rng.random() < self.args.pay_share:
+            for booking_id in booking_ids:
+                if self.step('pay', self.db.update_booking_status, booking_id, 'оплачен'):
+                    self.result['paid'] += 1
+
+    def run(self, deadline: float):
+        while time.time() < deadline:
+            self.session()
+            self.think()
+
+
+def cashier_process(number: int, user_id: int, pairs, args, start_at: float, results):
+    """Процесс кассы: свое соединение с базой, свой интерпретатор"""
+    # Замеры нужны только для подсчета ошибок; журнал и сводка процессов не пишутся
+    Config.QUERY_STATS = dict(Config.QUERY_STATS, enabled=True, slow_log_path=None, dump_path=None)
+    if args.no_route_cache:
+        Config.ROUTE_CACHE = dict(Config.ROUTE_CACHE, size=0)
+    errors = ErrorSink()
+    get_query_stats().add_sink(errors)
+
+    cashier = Cashier(number, user_id, pairs, args)
+    time.sleep(max(0.0, start_at - time.time()))
+    try:
+        cashier.run(start_at + args.duration)
+    except Exception as e:
+        print(f"Ошибка кассы {number}: {e}")
+    finally:
+        # Результат отправляется всегда: родитель ждет по одному от каждой кассы
+        cashier.result['routes'] = sorted(cashier.result['routes'])
+        cashier.result['errors'] = errors.errors
+        cashier.result['route_cache_hits'] = get_route_cache().hits
+        cashier.result['route_cache_misses'] = get_route_cache().misses
+        results.put(cashier.result)
+
+
+def merge(results) -> dict:
+    total = {'steps': {step: [] for step in STEPS}, 'errors': {}, 'routes': set()}
+    for result in results:
+        for key, value in result.items():
+            if key == 'steps':
+                for step, timings in value.items():
+                    total['steps'][step].extend(timings)
+            elif key == 'errors':
+                for error, count in value.items():
+                    total['errors'][error] = total['errors'].get(error, 0) + count
+            elif key == 'routes':
+                total['routes'].update(value)
+            else:
+                total[key] = total.get(key, 0) + value
+    return total
+
+
+def latency(timings) -> dict:
+    return {'count': len(timings), 'p50_ms': percentile(timings, 0.5), 'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99), 'max_ms': round(max(timings), 2) if timings else 0.0,
+            'mean_ms': round(statistics.mean(timings), 2) if timings else 0.0}
+
+
+def counter_drift(db: Database, route_ids) -> int:
+    """Число рейсов прогона, где счетчик свободных мест расходится с местами (строками или картой)"""
+    drift = 0
+    for route_id in route_ids:
+        db.cursor.execute(ROUTE_STATE, (route_id,))
+        state = db.cursor.fetchone()
+        drift += state['free_seats'] != db.get_seat_map(route_id).free_count()
+    return drift
+
+
+def cleanup(db: Database, first_booking_id: int):
+    """Отмена и удаление бронирований прогона: места и счетчики возвращаются к исходным"""
+    db.cursor.execute("SELECT id FROM bookings WHERE id > %s AND status != 'отменено'", (first_booking_id,))
+    for row in db.cursor.fetchall():
+        db.cancel_booking(row['id'])
+    db.cursor.execute("DELETE FROM bookings WHERE id > %s", (first_booking_id,))
+    db.cursor.execute("DELETE FROM passengers WHERE document_number LIKE %s "
+                      "AND id NOT IN (SELECT passenger_id FROM bookings)",
+                      (queries.like_prefix(f'{DOCUMENT_PREFIX}L'),))
+    db.connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон: одновременные сеансы нескольких касс")
+    parser.add_argument('--cashiers', type=int, default=20, help="число касс (процессов)")
+    parser.add_argument('--duration', type=float, default=60, help="длительность прогона, с")
+    parser.add_argument('--think-ms', type=float, default=500, help="средняя пауза кассира между действиями, мс")
+    parser.add_argument('--skew', type=float, default=1.1, help="неравномерность спроса на направления и рейсы")
+    parser.add_argument('--pairs', type=int, default=50, help="число направлений, о которых спрашивают")
+    parser.add_argument('--group-share', type=float, default=0.15, help="доля групповых покупок")
+    parser.add_argument('--max-group', type=int, default=4, help="наибольший размер группы")
+    parser.add_argument('--pay-share', type=float, default=0.7, help="доля бронирований, оплачиваемых сразу")
+    parser.add_argument('--cancel-share', type=float, default=0.05, help="доля бронирований, отменяемых сразу")
+    parser.add_argument('--recancel-share', type=float, default=0.5,
+                        help="доля отмененных бронирований, позже отменяемых повторно")
+    parser.add_argument('--returning', type=float, default=0.3, help="доля постоянных пассажиров")
+    parser.add_argument('--attempts', type=int, default=3, help="попыток бронирования на сеанс")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-route-cache', action='store_true', help="кассы без кэша выдачи поиска рейсов")
+    parser.add_argument('--keep', action='store_true', help="не удалять бронирования прогона")
+    parser.add_argument('--output', help="файл для результатов JSON (по умолчанию - вывод на экран)")
+    args = parser.parse_args()
+
+    Config.QUERY_STATS = dict(Config.QUERY_STATS, enabled=False)
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    try:
+        if not synthetic_exists(db):
+            raise SystemExit("Нет синтетических данных: python -m benchmarks.dataset")
+
+        db.cursor.execute("SELECT id FROM users WHERE username LIKE %s ORDER BY id",
+                          (queries.like_prefix(USER_PREFIX),))
+        user_ids = [row['id'] for row in db.cursor.fetchall()]
+        db.cursor.execute("""
+            SELECT departure_station, arrival_station, COUNT(*) AS routes
+            FROM routes GROUP BY departure_station, arrival_station
+            ORDER BY routes DESC LIMIT %s
+        """, (args.pairs,))
+        pairs = [(row['departure_station'], row['arrival_station']) for row in db.cursor.fetchall()]
+        db.cursor.execute("SELECT COUNT(*) AS total FROM passengers WHERE document_number LIKE %s",
+                          (queries.like_prefix(DOCUMENT_PREFIX + '0'),))
+        args.known_passengers = db.cursor.fetchone()['total']
+        db.cursor.execute("SELECT COALESCE(MAX(id), 0) AS last FROM bookings")
+        first_booking_id = db.cursor.fetchone()['last']
+        db.connection.commit()
+
+        # spawn: процессы не наследуют соединения родителя
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        start_at = time.time() + 2 + args.cashiers * 0.05
+        processes = [context.Process(target=cashier_process,
+                                     args=(number, user_ids[number % len(user_ids)], pairs, args,
+                                           start_at, results))
+                     for number in range(args.cashiers)]
+
+        locks_before = lock_status(db)
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = max(time.time() - start_at, args.duration)
+        locks_after = lock_status(db)
+
+        total = merge(collected)
+        db.connection.commit()
+        db.cursor.execute(DOUBLE_SALES, (first_booking_id,))
+        double_sales = len(db.cursor.fetchall())
+        drift = counter_drift(db, sorted(total['routes']))
+        db.connection.commit()
+
+        report = {
+            'meta': {'backend': backend_name(), 'started_at': datetime.fromtimestamp(start_at).isoformat(
+                timespec='seconds'), 'cashiers': args.cashiers, 'duration_s': args.duration,
+                     'think_ms': args.think_ms, 'skew': args.skew, 'seed': args.seed},
+            'throughput': {'sessions_per_sec': round(total['sessions'] / elapsed, 2),
+                           'bookings_per_sec': round(total['sold'] / elapsed, 2),
+                           'tickets_per_sec': round(total['tickets'] / elapsed, 2)},
+            'totals': {key: total[key] for key in ('sessions', 'empty_searches', 'sold', 'tickets', 'paid',
+                                                   'cancelled', 'recancelled', 'seat_taken', 'retries', 'failed')},
+            'steps': {step: latency(timings) for step, timings in total['steps'].items() if timings},
+            'route_cache': {'hits': total['route_cache_hits'], 'misses': total['route_cache_misses'],
+                            'hit_ratio': round(total['route_cache_hits'] / max(1, total['route_cache_hits']
+                                                                               + total['route_cache_misses']), 3)},
+            'errors': total['errors'],
+            'deadlocks': sum(count for error, count in total['errors'].items() if f'({DEADLOCK})' in error),
+            'lock_wait_timeouts': sum(count for error, count in total['errors'].items()
+                                      if f'({LOCK_WAIT_TIMEOUT})' in error),
+            'lock_waits': {name: locks_after[name] - locks_before.get(name, 0) for name in locks_after},
+            'double_sales': double_sales,
+            'routes_touched': len(total['routes']),
+            'routes_with_counter_drift': drift
+        }
+
+        if not args.keep:
+            cleanup(db, first_booking_id)
+    finally:
+        db.disconnect()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Таблица рейсов RoutesPage: QTableWidget с кнопкой-виджетом в строке против модели с делегатом (без базы данных)
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+# Без дисплея замер идет на внеэкранной платформе Qt
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from config import Config
+from ui.table_models import ButtonDelegate, RecordTableView
+from ui.routes_page import BOOK_COLUMN, ROUTE_COLUMNS
+from ui.theme import HOVER_COLORS
+
+STATIONS = ['Москва', 'Санкт-Петербург', 'Казань', 'Нижний Новгород', 'Екатеринбург', 'Самара', 'Воронеж']
+
+
+def make_routes(count: int, rng: random.Random) -> list:
+    """Рейсы в формате Database.get_all_available_routes"""
+    departure = datetime.now().replace(second=0, microsecond=0)
+    routes = []
+    for route_id in range(1, count + 1):
+        start = departure + timedelta(minutes=rng.randrange(60 * 24 * 30))
+        departure_station, arrival_station = rng.sample(STATIONS, 2)
+        routes.append({'route_id': route_id, 'train_number': f'{rng.randrange(1, 999):03d}А',
+                       'train_name': f'Поезд {rng.randrange(1, 50)}', 'train_type': 'пассажирский',
+                       'departure_station': departure_station, 'arrival_station': arrival_station,
+                       'departure_time': start, 'arrival_time': start + timedelta(hours=rng.randrange(2, 30)),
+                       'base_price': rng.randrange(500, 10000) + 0.5, 'available_seats': rng.randrange(0, 60)})
+    return routes
+
+
+def widget_table(routes: list) -> QTableWidget:
+    """Прежнее заполнение: элемент на ячейку и кнопка со своей таблицей стилей на строку"""
+    table = QTableWidget()
+    table.setColumnCount(8)
+    table.setHorizontalHeaderLabels(
+        ['Поезд', 'Откуда', 'Куда', 'Отправление', 'Прибытие', 'Цена', 'Свободных мест', 'Действия'])
+    table.verticalHeader().setDefaultSectionSize(50)
+    table.setRowCount(len(routes))
+
+    for row, route in enumerate(routes):
+        table.setItem(row, 0, QTableWidgetItem(f"{route['train_name']}\n({route['train_number']})"))
+        table.setItem(row, 1, QTableWidgetItem(route['departure_station']))
+        table.setItem(row, 2, QTableWidgetItem(route['arrival_station']))
+
+        departure_item = QTableWidgetItem(route['departure_time'].strftime('%d.%m.%Y\n%H:%M'))
+        arrival_item = QTableWidgetItem(route['arrival_time'].strftime('%d.%m.%Y\n%H:%M'))
+        departure_item.setTextAlignment(Qt.AlignCenter)
+        arrival_item.setTextAlignment(Qt.AlignCenter)
+        table.setItem(row, 3, departure_item)
+        table.setItem(row, 4, arrival_item)
+
+        price_item = QTableWidgetItem(f"{route['base_price']:.2f} ₽")
+        price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        table.setItem(row, 5, price_item)
+
+        seats_item = QTableWidgetItem(str(route['available_seats']))
+        seats_item.setTextAlignment(Qt.AlignCenter)
+        if route['available_seats'] > 10:
+            seats_item.setBackground(QColor(220, 255, 220))
+        elif route['available_seats'] > 5:
+            seats_item.setBackground(QColor(255, 255, 200))
+        elif route['available_seats'] > 0:
+            seats_item.setBackground(QColor(255, 200, 200))
+        table.setItem(row, 6, seats_item)
+
+        book_cell_btn = QPushButton('Забронировать')
+        book_cell_btn.setStyleSheet(f'''
+            QPushButton {{
+                background-color: {Config.COLORS["primary"]};
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 8px 12px;
+                font-size: {Config.FONT_SIZES["small"]}px;
+            }}
+            QPushButton:hover {{
+                background-color: #b71c1c;
+            }}
+        ''')
+        book_cell_btn.clicked.connect(lambda checked, r=row: None)
+        table.setCellWidget(row, 7, book_cell_btn)
+        table.item(row, 0).setData(Qt.UserRole, route['route_id'])
+    return table
+
+
+def model_table(routes: list) -> RecordTableView:
+    """Текущее заполнение: модель по колонкам и нарисованная кнопка"""
+    table = RecordTableView(ROUTE_COLUMNS)
+    table.verticalHeader().setDefaultSectionSize(50)
+    delegate = ButtonDelegate('Забронировать', Config.COLORS['primary'], HOVER_COLORS['primary'],
+                              Config.FONT_SIZES['small'], table)
+    table.setItemDelegateForColumn(BOOK_COLUMN, delegate)
+    table.set_rows(routes)
+    return table
+
+
+def measure(app: QApplication, build, routes: list) -> dict:
+    """Заполнение, первый показ и прокрутка в конец (миллисекунды)"""
+    started = time.perf_counter()
+    table = build(routes)
+    filled = time.perf_counter()
+
+    table.resize(1200, 700)
+    table.show()
+    app.processEvents()
+    table.viewport().grab()
+    shown = time.perf_counter()
+
+    table.scrollToBottom()
+    app.processEvents()
+    table.viewport().grab()
+    scrolled = time.perf_counter()
+
+    table.close()
+    table.deleteLater()
+    app.processEvents()
+    return {'fill_ms': round((filled - started) * 1000, 1), 'first_paint_ms': round((shown - filled) * 1000, 1),
+            'total_ms': round((shown - started) * 1000, 1), 'scroll_to_end_ms': round((scrolled - shown) * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер заполнения таблицы рейсов")
+    parser.add_argument('--routes', type=int, default=10000, help="строк в таблице")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    routes = make_routes(args.routes, random.Random(args.seed))
+    print(json.dumps({
+        'routes': args.routes,
+        'widgets': measure(app, widget_table, routes),
+        'model_delegate': measure(app, model_table, routes)
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
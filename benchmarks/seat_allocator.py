@@ -0,0 +1,51 @@
+# Подбор мест для группы на поезде из 1000 мест (без базы данных)
+import argparse
+import json
+import random
+import timeit
+from seat_allocator import SeatAllocator
+from seat_map import SeatMap
+from seat_layouts import generate_seats
+
+
+def route_seats(num_seats: int, occupancy: float, train_type: str, rng: random.Random):
+    """Места рейса в формате get_seat_map при заданной заполненности"""
+    return [{'seat_id': seat_id, 'carriage_number': carriage, 'seat_number': number, 'seat_type': seat_type,
+             'status': 'забронировано' if rng.random() < occupancy else 'свободно'}
+            for seat_id, (carriage, number, seat_type) in enumerate(generate_seats(num_seats, train_type), 1)]
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время вызова в микросекундах (лучший из пяти прогонов)"""
+    return round(min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер подбора соседних мест")
+    parser.add_argument('--seats', type=int, default=1000, help="мест в поезде")
+    parser.add_argument('--train-type', default='пассажирский', help="тип поезда (схема вагона)")
+    parser.add_argument('--repeat', type=int, default=1000, help="вызовов на одно измерение")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    for occupancy in (0.3, 0.7, 0.95):
+        seat_map = SeatMap.from_rows(route_seats(args.seats, occupancy, args.train_type, rng))
+        allocator = SeatAllocator(seat_map)
+        for count in (2, 4, 6):
+            results.append({
+                'occupancy': occupancy,
+                'free_seats': seat_map.free_count(),
+                'group': count,
+                'found': len(allocator.allocate(count)),
+                'allocate_us': measure(lambda: allocator.allocate(count), args.repeat)
+            })
+        results[-1]['build_us'] = measure(lambda: SeatAllocator(seat_map), max(1, args.repeat // 10))
+
+    print(json.dumps({'seats': args.seats, 'train_type': args.train_type, 'results': results},
+                     ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Хранение мест: строка на место в seats против битовой карты в строке рейса.
+# Рейсы обоих видов загружаются в одну базу; замеряются объем, время загрузки и операции касс
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from database import Database
+from db_backend import backend_name
+from seat_layouts import generate_seats
+from seat_map import all_free, with_slots
+from benchmarks.concurrent_booking import percentile
+from benchmarks.dataset import INSERT_SEAT, insert_batch
+import queries
+
+TRAIN_PREFIX = 'INV-'
+DOCUMENT_PREFIX = 'INV'
+TRAIN_TYPE = 'пассажирский'
+
+MYSQL_SIZE = """
+SELECT COALESCE(SUM(data_length + index_length), 0) AS size
+FROM information_schema.TABLES
+WHERE table_schema = DATABASE()
+"""
+
+CLEANUP = [
+    f"DELETE FROM bookings WHERE route_id IN (SELECT r.id FROM routes r JOIN trains t ON t.id = r.train_id "
+    f"WHERE t.train_number LIKE '{TRAIN_PREFIX}%')",
+    f"DELETE FROM seats WHERE route_id IN (SELECT r.id FROM routes r JOIN trains t ON t.id = r.train_id "
+    f"WHERE t.train_number LIKE '{TRAIN_PREFIX}%')",
+    f"DELETE FROM routes WHERE train_id IN (SELECT id FROM trains WHERE train_number LIKE '{TRAIN_PREFIX}%')",
+    f"DELETE FROM trains WHERE train_number LIKE '{TRAIN_PREFIX}%'",
+    f"DELETE FROM passengers WHERE document_number LIKE '{DOCUMENT_PREFIX}%' "
+    f"AND id NOT IN (SELECT passenger_id FROM bookings)"
+]
+
+
+def storage_size(db: Database) -> int:
+    """Объем базы в байтах (данные и индексы всех таблиц)"""
+    if backend_name() == 'sqlite':
+        db.cursor.execute("PRAGMA page_count")
+        pages = db.cursor.fetchone()['page_count']
+        db.cursor.execute("PRAGMA freelist_count")
+        pages -= db.cursor.fetchone()['freelist_count']
+        db.cursor.execute("PRAGMA page_size")
+        return pages * db.cursor.fetchone()['page_size']
+
+    # Статистика InnoDB обновляется лениво - пересчитываем таблицы мест
+    for table in ('routes', 'seats', 'layout_seats'):
+        db.cursor.execute(f"ANALYZE TABLE {table}")
+        db.cursor.fetchall()
+    db.cursor.execute(MYSQL_SIZE)
+    return int(db.cursor.fetchone()['size'])
+
+
+def load(db: Database, mode: str, routes: int, num_seats: int, occupancy: float, batch: int,
+         rng: random.Random) -> list:
+    """Загрузка рейсов с одним видом хранения мест; id рейсов"""
+    db.add_train(f'{TRAIN_PREFIX}{mode}', f'Замер хранения мест ({mode})', TRAIN_TYPE)
+    db.cursor.execute("SELECT id FROM trains WHERE train_number = %s", (f'{TRAIN_PREFIX}{mode}',))
+    train_id = db.cursor.fetchone()['id']
+    seats = generate_seats(num_seats, TRAIN_TYPE)
+    layout_id = db.get_seat_layout(TRAIN_TYPE, num_seats) if mode == 'bitmap' else None
+
+    departure = datetime.now().replace(second=0, microsecond=0) + timedelta(days=30)
+    route_ids = []
+    routes_per_batch = max(1, batch // num_seats)
+    for offset in range(0, routes, routes_per_batch):
+        planned = []
+        for _ in range(min(routes_per_batch, routes - offset)):
+            sold = set(rng.sample(range(num_seats), round(num_seats * occupancy)))
+            free_types = [seat_type for index, (_, _, seat_type) in enumerate(seats) if index not in sold]
+            route = (train_id, 'Замер-А', 'Замер-Б', departure, departure + timedelta(hours=5), 1000)
+            planned.append((route + queries.free_seat_deltas(free_types), sold))
+
+        if mode == 'bitmap':
+            ids = insert_batch(db, queries.ADD_BITMAP_ROUTE, [
+                route + (layout_id, with_slots(all_free(num_seats), sold, False)) for route, sold in planned
+            ])
+        else:
+            ids = insert_batch(db, queries.ADD_ROUTE, [route for route, _ in planned])
+            insert_batch(db, INSERT_SEAT, [
+                (route_id, carriage, number, seat_type, 'забронировано' if index in sold else 'свободно')
+                for route_id, (_, sold) in zip(ids, planned)
+                for index, (carriage, number, seat_type) in enumerate(seats)
+            ])
+        db.connection.commit()
+        route_ids.extend(ids)
+    return route_ids
+
+
+def timings(values) -> dict:
+    return {'p50_ms': percentile(values, 0.5), 'p95_ms': percentile(values, 0.95),
+            'mean_ms': round(statistics.mean(values), 3) if values else 0.0}
+
+
+def operations(db: Database, route_ids: list, samples: int, user_id: int, rng: random.Random) -> dict:
+    """Операции кассы на случайных рейсах: схема мест, список мест, продажа и отмена"""
+    measured = {'get_seat_map': [], 'get_available_seats': [], 'create_booking': [], 'cancel_booking': []}
+
+    def timed(name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        measured[name].append((time.perf_counter() - started) * 1000)
+        return result
+
+    for sample in range(samples):
+        route_id = rng.choice(route_ids)
+        timed('get_seat_map', db.get_seat_map, route_id)
+        free = timed('get_available_seats', db.get_available_seats, route_id)
+        if not free:
+            continue
+
+        passenger = {'full_name': f'Пассажир {sample}', 'document_number': f'{DOCUMENT_PREFIX}{sample:07d}',
+                     'phone': ''}
+        result = timed('create_booking', db.create_booking, passenger, rng.choice(free)['seat_id'], route_id, user_id)
+        if result.success:
+            timed('cancel_booking', db.cancel_booking, result.booking_id)
+
+    return {name: timings(values) for name, values in measured.items()}
+
+
+def cleanup(db: Database):
+    """Удаление рейсов замера (общие схемы мест остаются)"""
+    for statement in CLEANUP:
+        db.cursor.execute(statement)
+    db.connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер хранения мест: строки seats против битовых карт")
+    parser.add_argument('--routes', type=int, default=10000, help="рейсов каждого вида")
+    parser.add_argument('--seats', type=int, default=100, help="мест на рейсе")
+    parser.add_argument('--occupancy', type=float, default=0.5, help="доля проданных мест")
+    parser.add_argument('--samples', type=int, default=500, help="операций каждого вида")
+    parser.add_argument('--batch', type=int, default=5000, help="строк в одной вставке")
+    parser.add_argument('--user-id', type=int, default=1, help="пользователь, от имени которого продаются билеты")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--keep', action='store_true', help="не удалять рейсы замера")
+    args = parser.parse_args()
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    rng = random.Random(args.seed)
+    report = {'backend': backend_name(), 'routes': args.routes, 'seats': args.seats,
+              'occupancy': args.occupancy, 'modes': {}}
+    try:
+        for mode in ('rows', 'bitmap'):
+            size_before = storage_size(db)
+            started = time.perf_counter()
+            route_ids = load(db, mode, args.routes, args.seats, args.occupancy, args.batch, rng)
+            load_seconds = time.perf_counter() - started
+            size = storage_size(db) - size_before
+
+            report['modes'][mode] = {
+                'load_seconds': round(load_seconds, 2),
+                'storage_bytes': size,
+                'bytes_per_route': round(size / args.routes, 1) if args.routes else 0,
+                'operations': operations(db, route_ids, args.samples, args.user_id, rng)
+            }
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        if not args.keep:
+            cleanup(db)
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Схема мест рейса: объем в памяти и скорость операций SeatMap против списка строк (без базы данных)
+import argparse
+import json
+import random
+import sys
+import timeit
+from seat_map import SeatMap
+from benchmarks.seat_allocator import route_seats
+
+
+def rows_size(rows) -> int:
+    """Объем списка словарей со всеми ключами и значениями в байтах"""
+    seen, size = set(), sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in list(row.keys()) + list(row.values()):
+            if id(value) not in seen:
+                seen.add(id(value))
+                size += sys.getsizeof(value)
+    return size
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время вызова в микросекундах (лучший из пяти прогонов)"""
+    return round(min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер схемы мест SeatMap")
+    parser.add_argument('--seats', type=int, default=1000, help="мест в поезде")
+    parser.add_argument('--train-type', default='пассажирский', help="тип поезда (схема вагона)")
+    parser.add_argument('--occupancy', type=float, default=0.5, help="доля занятых мест")
+    parser.add_argument('--repeat', type=int, default=1000, help="вызовов на одно измерение")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = route_seats(args.seats, args.occupancy, args.train_type, rng)
+    free_rows = [row for row in rows if row['status'] == 'свободно']
+    seat_map = SeatMap.from_rows(rows, 1)
+    data = seat_map.to_bytes()
+    seat_id = free_rows[0]['seat_id']
+
+    def claim_release():
+        seat_map.claim(seat_id)
+        seat_map.release(seat_id)
+
+    print(json.dumps({
+        'seats': args.seats,
+        'free_seats': seat_map.free_count(),
+        'memory_bytes': {'free_rows': rows_size(free_rows), 'all_rows': rows_size(rows),
+                         'seat_map': seat_map.nbytes, 'seat_map_serialized': len(data)},
+        'timings_us': {
+            'from_rows': measure(lambda: SeatMap.from_rows(rows, 1), max(1, args.repeat // 10)),
+            'claim_release': measure(claim_release, args.repeat),
+            'is_free': measure(lambda: seat_map.is_free(seat_id), args.repeat),
+            'free_count': measure(seat_map.free_count, args.repeat),
+            'free_counts': measure(seat_map.free_counts, args.repeat),
+            'free_rows_count_by_type': measure(
+                lambda: sum(1 for row in free_rows if row['seat_type'] == 'Купе'), args.repeat),
+            'to_bytes': measure(seat_map.to_bytes, args.repeat),
+            'from_bytes': measure(lambda: SeatMap.from_bytes(data), args.repeat),
+            'free_seats_iterate': measure(lambda: list(seat_map.free_seats()), max(1, args.repeat // 10))
+        }
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
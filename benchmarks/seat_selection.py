@@ -0,0 +1,174 @@
+# Схема мест SeatSelectionWindow: сетка кнопок со своими стилями против нарисованной схемы (без базы данных)
+import argparse
+import json
+import os
+import random
+import time
+
+# Без дисплея замер идет на внеэкранной платформе Qt
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtTest import QTest
+from config import Config
+from seat_layouts import get_layout
+from seat_map import SeatMap
+from benchmarks.seat_allocator import route_seats
+from ui.seat_map_widget import SeatMapWidget
+
+
+def button_grid(seat_map: SeatMap) -> QScrollArea:
+    """Прежняя схема: кнопка со своей таблицей стилей на каждое свободное место"""
+    grid = QGridLayout()
+    grid.setSpacing(10)
+    buttons = {}
+
+    carriages = {}
+    for seat in seat_map.free_seats():
+        carriages.setdefault(seat['carriage_number'], []).append(seat)
+
+    row = 0
+    for carriage_num in sorted(carriages):
+        carriage_label = QLabel(f'Вагон {carriage_num}')
+        carriage_label.setStyleSheet(f'''
+            font-size: {Config.FONT_SIZES["large"]}px;
+            font-weight: bold;
+            color: {Config.COLORS["primary"]};
+            margin-top: 20px;
+            padding: 5px;
+            background-color: #f0f8ff;
+            border-radius: 4px;
+        ''')
+        grid.addWidget(carriage_label, row, 0, 1, 10)
+        row += 1
+
+        col = 0
+        for seat in carriages[carriage_num]:
+            seat_btn = QPushButton(str(seat['seat_number']))
+            seat_btn.setFixedSize(50, 50)
+            seat_btn.setProperty('seat_id', seat['seat_id'])
+            seat_btn.setCursor(Qt.PointingHandCursor)
+            buttons[seat['seat_id']] = seat_btn
+
+            seat_type = seat['seat_type'].lower() if seat['seat_type'] else 'standard'
+            if 'люкс' in seat_type:
+                color = Config.COLORS["primary"]
+            elif 'купе' in seat_type:
+                color = Config.COLORS["secondary"]
+            else:
+                color = Config.COLORS["success"]
+
+            seat_btn.setStyleSheet(f'''
+                QPushButton {{
+                    background-color: {color};
+                    color: white;
+                    border: 2px solid {color};
+                    border-radius: 8px;
+                    font-size: {Config.FONT_SIZES["normal"]}px;
+                    font-weight: bold;
+                }}
+                QPushButton:hover {{
+                    background-color: white;
+                    color: {color};
+                }}
+                QPushButton:checked {{
+                    background-color: white;
+                    color: {color};
+                    border: 3px solid {Config.COLORS["warning"]};
+                }}
+            ''')
+            seat_btn.setCheckable(True)
+            grid.addWidget(seat_btn, row, col)
+            col += 1
+            if col >= 10:
+                col = 0
+                row += 1
+        if col != 0:
+            row += 1
+
+    area = QScrollArea()
+    widget = QWidget()
+    widget.setLayout(grid)
+    area.setWidget(widget)
+    area.setWidgetResizable(True)
+    area.buttons = buttons
+    return area
+
+
+def painted_map(seat_map: SeatMap) -> QScrollArea:
+    """Текущая схема: один виджет SeatMapWidget"""
+    area = QScrollArea()
+    widget = SeatMapWidget()
+    widget.set_seat_map(seat_map)
+    area.setWidget(widget)
+    area.setWidgetResizable(True)
+    return area
+
+
+def click_target(area: QScrollArea, seat_map: SeatMap):
+    """Виджет и точка щелчка по первому свободному месту"""
+    seat_id = next(seat_map.free_seats())['seat_id']
+    if isinstance(area.widget(), SeatMapWidget):
+        return area.widget(), area.widget().seat_rect(seat_id).center()
+    return area.buttons[seat_id], QPoint(25, 25)
+
+
+def measure(app: QApplication, build, seat_map: SeatMap, clicks: int) -> dict:
+    """Построение, первый показ, прокрутка в конец и щелчки по месту (миллисекунды)"""
+    started = time.perf_counter()
+    area = build(seat_map)
+    built = time.perf_counter()
+
+    area.resize(860, 450)
+    area.show()
+    app.processEvents()
+    area.viewport().grab()
+    shown = time.perf_counter()
+
+    area.verticalScrollBar().setValue(area.verticalScrollBar().maximum())
+    app.processEvents()
+    area.viewport().grab()
+    scrolled = time.perf_counter()
+
+    area.verticalScrollBar().setValue(0)
+    app.processEvents()
+    widget, point = click_target(area, seat_map)
+    click_started = time.perf_counter()
+    for _ in range(clicks):
+        QTest.mouseClick(widget, Qt.LeftButton, pos=point)
+        app.processEvents()
+    clicked = time.perf_counter()
+
+    area.close()
+    area.deleteLater()
+    app.processEvents()
+    return {'build_ms': round((built - started) * 1000, 1), 'first_paint_ms': round((shown - built) * 1000, 1),
+            'total_ms': round((shown - started) * 1000, 1), 'scroll_to_end_ms': round((scrolled - shown) * 1000, 1),
+            'click_ms': round((clicked - click_started) * 1000 / max(1, clicks), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер окна выбора места")
+    parser.add_argument('--carriages', type=int, default=30, help="вагонов в поезде")
+    parser.add_argument('--train-type', default='пассажирский', help="тип поезда (схема вагона)")
+    parser.add_argument('--occupancy', type=float, default=0.3, help="доля занятых мест")
+    parser.add_argument('--clicks', type=int, default=100, help="щелчков по месту")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    num_seats = args.carriages * get_layout(args.train_type)['seats_per_carriage']
+    seat_map = SeatMap.from_rows(route_seats(num_seats, args.occupancy, args.train_type, random.Random(args.seed)), 1)
+    print(json.dumps({
+        'carriages': args.carriages,
+        'seats': num_seats,
+        'free_seats': seat_map.free_count(),
+        'buttons': measure(app, button_grid, seat_map, args.clicks),
+        'painted': measure(app, painted_map, seat_map, args.clicks)
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
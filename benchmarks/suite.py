@@ -0,0 +1,241 @@
+# Замеры методов Database на синтетических данных (python -m benchmarks.dataset).
+# Параметры сценариев выбираются генератором с фиксированным зерном, поэтому
+# результаты разных коммитов на одном наборе данных сравнимы
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+from config import Config
+from database import Database
+from db_backend import backend_name
+from benchmarks.concurrent_booking import percentile
+from benchmarks.dataset import DOCUMENT_PREFIX, SYNTHETIC_ROUTES, USER_PREFIX
+import queries
+
+TABLES = ('users', 'trains', 'routes', 'seats', 'passengers', 'bookings')
+
+
+class Context:
+    """Данные, из которых сценарии берут параметры"""
+
+    def __init__(self, db: Database, rng: random.Random):
+        self.rng = rng
+        db.cursor.execute("SELECT MIN(id) AS first, MAX(id) AS last FROM (" + SYNTHETIC_ROUTES + ") r")
+        bounds = db.cursor.fetchone()
+        if bounds['first'] is None:
+            raise SystemExit("Нет синтетических данных: python -m benchmarks.dataset")
+        self.route_ids = (bounds['first'], bounds['last'])
+
+        db.cursor.execute("SELECT id FROM users WHERE username LIKE %s ORDER BY id",
+                          (queries.like_prefix(USER_PREFIX),))
+        self.user_ids = [row['id'] for row in db.cursor.fetchall()]
+
+        # Самые частые направления - как у реальных касс, большинство запросов о них
+        db.cursor.execute("""
+            SELECT departure_station, arrival_station, COUNT(*) AS routes
+            FROM routes GROUP BY departure_station, arrival_station
+            ORDER BY routes DESC LIMIT 20
+        """)
+        self.pairs = [(row['departure_station'], row['arrival_station']) for row in db.cursor.fetchall()]
+        self.today = date.today()
+        self.created = []
+        self.sale = 0
+
+    def route_id(self) -> int:
+        return self.rng.randint(*self.route_ids)
+
+    def pair(self):
+        return self.rng.choice(self.pairs)
+
+    def user_id(self) -> int:
+        return self.rng.choice(self.user_ids)
+
+    def passenger(self) -> dict:
+        self.sale += 1
+        return {'full_name': f'Замер {self.sale}', 'document_number': f'{DOCUMENT_PREFIX}B{self.sale:08d}',
+                'phone': ''}
+
+
+# Сценарий - функция (db, ctx) -> вызов для замера: параметры выбираются до замера
+
+def routes_with(filters_factory):
+    """Поиск рейсов с фильтрами, построенными по контексту"""
+    def scenario(db: Database, ctx: Context):
+        filters = filters_factory(ctx)
+        return lambda: db.get_all_available_routes(filters)
+    return scenario
+
+
+def pair_filters(ctx: Context) -> dict:
+    return dict(zip(('departure_station', 'arrival_station'), ctx.pair()))
+
+
+def this_week(ctx: Context) -> dict:
+    start, end = queries.period_bounds('this_week', ctx.today)
+    return {'date_from': start.date(), 'date_to': (end - timedelta(days=1)).date()}
+
+
+def search_trains(db: Database, ctx: Context):
+    departure, arrival = ctx.pair()
+    day = (ctx.today + timedelta(days=ctx.rng.randint(0, 30))).isoformat()
+    return lambda: db.search_trains(departure[:4], arrival[:4], day)
+
+
+def available_seats(db: Database, ctx: Context):
+    route_id = ctx.route_id()
+    return lambda: db.get_available_seats(route_id)
+
+
+def create_booking(db: Database, ctx: Context):
+    """Бронирование свободного места (поиск места в замер не входит)"""
+    seats = []
+    while not seats:
+        route_id = ctx.route_id()
+        seats = db.get_available_seats(route_id)
+    seat_id, passenger, user_id = ctx.rng.choice(seats)['seat_id'], ctx.passenger(), ctx.user_id()
+
+    def call():
+        result = db.create_booking(passenger, seat_id, route_id, user_id)
+        if result.success:
+            ctx.created.append(result.booking_id)
+        return result
+    return call
+
+
+def cancel_booking(db: Database, ctx: Context):
+    """Отмена бронирования из сценария create_booking (места возвращаются в продажу)"""
+    booking_id = ctx.created.pop() if ctx.created else None
+    return lambda: db.cancel_booking(booking_id) if booking_id else None
+
+
+def bookings(method, filters_factory=lambda ctx: None, deep=False, for_user=False):
+    """Список бронирований (всех или пользователя); deep - страница из середины списка"""
+    def scenario(db: Database, ctx: Context):
+        args = (ctx.user_id(),) if for_user else ()
+        filters = filters_factory(ctx)
+        after = None
+        if deep:
+            rows = getattr(db, method)(*args, filters)
+            after = queries.page_cursor(rows[len(rows) // 2:]) if rows else None
+        return lambda: getattr(db, method)(*args, filters, after)
+    return scenario
+
+
+def with_counts(method, for_user=False):
+    def scenario(db: Database, ctx: Context):
+        args = (ctx.user_id(),) if for_user else ()
+        return lambda: getattr(db, method)(*args)
+    return scenario
+
+
+SCENARIOS = {
+    'routes_all': routes_with(lambda ctx: {}),
+    'routes_by_departure': routes_with(lambda ctx: {'departure_station': ctx.pair()[0]}),
+    'routes_by_pair': routes_with(pair_filters),
+    **{f'routes_{period}': routes_with(lambda ctx, period=period: {'date_filter': period})
+       for period in queries.DATE_PERIODS},
+    'routes_by_date_range': routes_with(this_week),
+    'routes_by_pair_this_week': routes_with(lambda ctx: {**pair_filters(ctx), 'date_filter': 'this_week'}),
+    'search_trains': search_trains,
+    'get_available_seats': available_seats,
+    'create_booking': create_booking,
+    'cancel_booking': cancel_booking,
+    'get_all_bookings': bookings('get_all_bookings'),
+    'get_all_bookings_paid': bookings('get_all_bookings', lambda ctx: {'status': 'оплачен'}),
+    'get_all_bookings_deep_page': bookings('get_all_bookings', deep=True),
+    'get_all_bookings_with_counts': with_counts('get_all_bookings_with_counts'),
+    'get_user_bookings': bookings('get_user_bookings', for_user=True),
+    'get_user_bookings_deep_page': bookings('get_user_bookings', deep=True, for_user=True),
+    'get_user_bookings_with_counts': with_counts('get_user_bookings_with_counts', for_user=True)
+}
+
+
+def rows_of(result) -> int:
+    """Число строк результата (для пары "страница, счетчики" - строки страницы)"""
+    if isinstance(result, tuple):
+        result = result[0]
+    return len(result) if isinstance(result, list) else 0
+
+
+def run_scenario(db: Database, ctx: Context, scenario, repeat: int, warmup: int) -> dict:
+    """Замер сценария: перцентили времени и среднее число строк"""
+    timings, rows = [], []
+    for iteration in range(warmup + repeat):
+        call = scenario(db, ctx)
+        started = time.perf_counter()
+        result = call()
+        elapsed = (time.perf_counter() - started) * 1000
+        if iteration >= warmup:
+            timings.append(elapsed)
+            rows.append(rows_of(result))
+
+    return {'p50_ms': percentile(timings, 0.5), 'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99), 'min_ms': round(min(timings), 2),
+            'mean_ms': round(statistics.mean(timings), 2), 'rows': round(statistics.mean(rows), 1)}
+
+
+def dataset_size(db: Database) -> dict:
+    sizes = {}
+    for table in TABLES:
+        db.cursor.execute(f"SELECT COUNT(*) AS total FROM {table}")
+        sizes[table] = db.cursor.fetchone()['total']
+    return sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры методов Database на синтетических данных")
+    parser.add_argument('--repeat', type=int, default=20, help="замеров на сценарий")
+    parser.add_argument('--warmup', type=int, default=2, help="прогревочных вызовов на сценарий")
+    parser.add_argument('--only', nargs='*', choices=sorted(SCENARIOS), help="запустить только эти сценарии")
+    parser.add_argument('--output', help="файл для результатов JSON (по умолчанию - вывод на экран)")
+    parser.add_argument('--route-cache', action='store_true',
+                        help="поиск рейсов через кэш выдачи (по умолчанию замеряются сами запросы)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # Замеряем сами запросы, без собственных замеров Database и кэша выдачи поиска
+    Config.QUERY_STATS = dict(Config.QUERY_STATS, enabled=False)
+    if not args.route_cache:
+        Config.ROUTE_CACHE = dict(Config.ROUTE_CACHE, size=0)
+
+    db = Database()
+    if not db.connect():
+        raise SystemExit(1)
+
+    try:
+        ctx = Context(db, random.Random(args.seed))
+        results = {}
+        for name, scenario in SCENARIOS.items():
+            if not args.only or name in args.only:
+                results[name] = run_scenario(db, ctx, scenario, args.repeat, args.warmup)
+
+        report = {
+            'meta': {'commit': git_commit(), 'backend': backend_name(), 'python': platform.python_version(),
+                     'started_at': datetime.now().isoformat(timespec='seconds'), 'seed': args.seed,
+                     'repeat': args.repeat, 'route_cache': args.route_cache, 'rows': dataset_size(db)},
+            'scenarios': results
+        }
+    finally:
+        db.disconnect()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Запуск интерфейса: построение и первый показ окон с одной таблицей стилей приложения
+import argparse
+import json
+import os
+import time
+
+# Без дисплея замер идет на внеэкранной платформе Qt
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from config import Config
+from models import User
+from ui.theme import HOVER_COLORS, apply_theme, themed
+
+
+def styled_buttons(count: int) -> QWidget:
+    """Прежний способ: таблица стилей из f-строки на каждой кнопке"""
+    panel = QWidget()
+    layout = QVBoxLayout(panel)
+    variants = list(HOVER_COLORS.items())
+    for number in range(count):
+        variant, hover = variants[number % len(variants)]
+        btn = QPushButton(f'Кнопка {number}')
+        btn.setStyleSheet(f'''
+            QPushButton {{
+                background-color: {Config.COLORS[variant]};
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 0 15px;
+                font-size: {Config.FONT_SIZES["normal"]}px;
+                font-weight: bold;
+            }}
+            QPushButton:hover {{
+                background-color: {hover};
+            }}
+        ''')
+        layout.addWidget(btn)
+    return panel
+
+
+def themed_buttons(count: int) -> QWidget:
+    """Текущий способ: свойство variant под общей таблицей стилей"""
+    panel = QWidget()
+    layout = QVBoxLayout(panel)
+    variants = list(HOVER_COLORS)
+    for number in range(count):
+        layout.addWidget(themed(QPushButton(f'Кнопка {number}'), variant=variants[number % len(variants)]))
+    return panel
+
+
+def measure(app: QApplication, build) -> dict:
+    """Построение и первый показ окна (миллисекунды)"""
+    started = time.perf_counter()
+    window = build()
+    built = time.perf_counter()
+
+    window.resize(1200, 800)
+    window.show()
+    app.processEvents()
+    window.grab()
+    shown = time.perf_counter()
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {'build_ms': round((built - started) * 1000, 1), 'first_paint_ms': round((shown - built) * 1000, 1),
+            'total_ms': round((shown - started) * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер запуска окон приложения")
+    parser.add_argument('--buttons', type=int, default=300, help="кнопок в синтетической панели")
+    parser.add_argument('--repeat', type=int, default=3, help="повторов построения окон (берется лучший)")
+    parser.add_argument('--no-windows', action='store_true', help="только синтетическая панель (без базы данных)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    started = time.perf_counter()
+    apply_theme(app)
+    result = {'apply_theme_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+    builds = {
+        'styled_buttons': lambda: styled_buttons(args.buttons),
+        'themed_buttons': lambda: themed_buttons(args.buttons)
+    }
+    if not args.no_windows:
+        from auth.login_window import LoginWindow
+        from auth.register_window import RegisterWindow
+        from ui.passenger_info_window import PassengerInfoWindow
+        from ui.main_window import MainWindow
+        builds.update({
+            'login_window': LoginWindow,
+            'register_window': RegisterWindow,
+            'passenger_info_window': PassengerInfoWindow,
+            'main_window_user': lambda: MainWindow(User(2, 'test_user', 'Тестовый пользователь', 'user')),
+            'main_window_admin': lambda: MainWindow(User(1, 'admin', 'Администратор', 'admin'))
+        })
+
+    for name, build in builds.items():
+        runs = [measure(app, build) for _ in range(max(1, args.repeat))]
+        result[name] = min(runs, key=lambda run: run['total_ms'])
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 # Конфигурация приложения
+import os
+
+
 class Config:
     # Настройки базы данных
     DB_CONFIG = {
@@ -9,6 +12,87 @@ class Config:
         'port': 3306
     }
 
+    # Хранилище: 'mysql' (сервер из DB_CONFIG) или 'sqlite' (локальный файл - работа и замеры без сервера)
+    DB_BACKEND = os.environ.get('RAILWAY_DB_BACKEND', 'mysql')
+
+    SQLITE_DB = {
+        'path': os.environ.get('RAILWAY_SQLITE_PATH',
+                               os.path.join(os.path.expanduser('~'), '.railway_booking', 'railway.db')),
+        'timeout': 10  # Ожидание блокировки записи другим соединением (сек)
+    }
+
+    # Настройки пула соединений
+    DB_POOL = {
+        'size': 5,  # Максимум одновременно открытых соединений
+        'idle_timeout': 300,  # Закрывать соединения, простаивающие дольше (сек)
+        'ping_interval': 30,  # Проверять соединение после простоя дольше (сек)
+        'checkout_timeout': 10,  # Ожидание свободного соединения (сек)
+        'reconnect_attempts': 3
+    }
+
+    # Пул соединений AsyncDatabase (сервисы без GUI)
+    ASYNC_DB_POOL = {
+        'minsize': 1,
+        'maxsize': 20,
+        'pool_recycle': 300  # Пересоздавать соединения старше (сек)
+    }
+
+    # Схемы вагонов по типу поезда: число мест в вагоне и классы по диапазонам мест
+    CARRIAGE_LAYOUTS = {
+        'default': {
+            'seats_per_carriage': 10,
+            'classes': [(1, 2, 'Люкс'), (3, 6, 'Купе'), (7, 10, 'Стандарт')]
+        },
+        'скоростной': {
+            'seats_per_carriage': 20,
+            'classes': [(1, 4, 'Люкс'), (5, 20, 'Стандарт')]
+        },
+        'фирменный': {
+            'seats_per_carriage': 18,
+            'classes': [(1, 2, 'Люкс'), (3, 18, 'Купе')]
+        },
+        'пассажирский': {
+            'seats_per_carriage': 36,
+            'classes': [(1, 12, 'Купе'), (13, 36, 'Стандарт')]
+        }
+    }
+
+    # Хранение мест новых рейсов: 'rows' - строка на место в таблице seats, 'bitmap' - битовая
+    # карта занятости в строке рейса и общая на рейсы схема мест (нужна миграция 7)
+    SEAT_INVENTORY = {
+        'mode': os.environ.get('RAILWAY_SEAT_INVENTORY', 'rows'),
+        'cas_attempts': 5  # Попыток обновления карты при одновременной продаже мест одного рейса
+    }
+
+    # Кэш справочников (станции, поезда, типы поездов)
+    REFERENCE_CACHE = {
+        'ttl': 300,  # Время жизни записей (сек)
+        # Файл для мгновенного заполнения списков при запуске (None - не сохранять)
+        'path': os.path.join(os.path.expanduser('~'), '.railway_booking', 'reference_cache.json')
+    }
+
+    # Кэш выдачи поиска рейсов в памяти кассы (route_cache.py)
+    ROUTE_CACHE = {
+        'size': 128,  # Выдач в кэше (0 - кэш выключен)
+        'ttl': 15  # Время жизни выдачи (сек): изменения других касс видны не позже
+    }
+
+    # Размер страницы при постраничной загрузке бронирований
+    BOOKINGS_PAGE_SIZE = 100
+
+    # Замеры запросов к базе данных (см. query_stats)
+    QUERY_STATS = {
+        'enabled': True,
+        'desk': os.environ.get('RAILWAY_DESK', ''),  # Рабочее место (по умолчанию - имя компьютера)
+        'slow_threshold_ms': 300,  # В журнал попадают вызовы дольше порога
+        # Журнал медленных запросов с ротацией (None - не вести)
+        'slow_log_path': os.path.join(os.path.expanduser('~'), '.railway_booking', 'slow_queries.log'),
+        'slow_log_max_bytes': 1024 * 1024,
+        'slow_log_backups': 5,
+        # Сводка p50/p95/p99 по методам при выходе из программы (None - не сохранять)
+        'dump_path': os.path.join(os.path.expanduser('~'), '.railway_booking', 'query_stats.json')
+    }
+
     # Настройки приложения
     APP_NAME = 'Система бронирования ЖД билетов'
     VERSION = '1.0'
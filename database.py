@@ -1,52 +1,74 @@
-import mysql.connector
-from mysql.connector import Error
-from typing import Optional, List, Dict, Any  # Добавляем этот импорт в начале
+from typing import Optional, List, Dict, Any, Tuple  # Добавляем этот импорт в начале
 from config import Config
-from models import User
+from db_backend import Error, get_backend, source_name
+from models import User, BookingResult
+from reference_cache import get_reference_cache
+from route_cache import get_route_cache, routes_key, trains_key
+from query_stats import instrument_methods, note_checkout, wrap_cursor
+import queries
+from seat_layouts import generate_seats, layout_key
+from seat_map import SeatMap, all_free, taken_slots, with_slots
 
+# Общие схемы мест рейсов с битовой картой не меняются после создания:
+# (источник данных, id схемы) -> SeatMap со всеми местами свободными
+_layout_maps: Dict[Tuple[str, int], SeatMap] = {}
 
+
+@instrument_methods
 class Database:
     """Класс для работы с базой данных"""
 
     def __init__(self):
         self.connection = None
         self.cursor = None
+        self._depth = 0
+        # Стек замеров вызовов методов (см. query_stats)
+        self._calls = []
 
     def connect(self) -> bool:
-        """Подключение к базе данных"""
-        try:
-            self.connection = mysql.connector.connect(
-                host=Config.DB_CONFIG['host'],
-                database=Config.DB_CONFIG['database'],
-                user=Config.DB_CONFIG['user'],
-                password=Config.DB_CONFIG['password'],
-                port=Config.DB_CONFIG['port']
-            )
-
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
-                return True
+        """Получение соединения из пула (или из локальной базы SQLite, см. Config.DB_BACKEND)"""
+        # Вложенные connect()/disconnect() используют одно и то же соединение
+        if self.connection is not None:
+            self._depth += 1
+            return True
+
+        connection = None
+        try:
+            connection = get_backend().acquire()
+            note_checkout(self._calls, *get_backend().last_checkout())
+            self.cursor = wrap_cursor(connection.cursor(dictionary=True), self._calls)
+            self.connection = connection
+            self._depth = 1
+            return True
 
         except Error as e:
+            if connection is not None:
+                get_backend().release(connection)
             print(f"Ошибка подключения к БД: {e}")
             return False
 
     def disconnect(self):
-        """Отключение от базы данных"""
-        if self.connection and self.connection.is_connected():
+        """Возврат соединения в пул"""
+        if self.connection is None:
+            return
+
+        self._depth -= 1
+        if self._depth > 0:
+            return
+
+        try:
             self.cursor.close()
-            self.connection.close()
+        except Error:
+            pass
+
+        get_backend().release(self.connection)
+        self.connection = None
+        self.cursor = None
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Аутентификация пользователя"""
         try:
-            query = """
-            SELECT id, username, full_name, role 
-            FROM users 
-            WHERE username = %s AND password_hash = SHA2(%s, 256)
-            """
-
-            self.cursor.execute(query, (username, password))
+            self.cursor.execute(queries.AUTHENTICATE_USER, (username, password))
             result = self.cursor.fetchone()
 
             if result:
@@ -65,12 +87,7 @@ class Database:
     def register_user(self, username: str, password: str, full_name: str) -> bool:
         """Регистрация нового пользователя"""
         try:
-            query = """
-            INSERT INTO users (username, password_hash, full_name, role)
-            VALUES (%s, SHA2(%s, 256), %s, 'user')
-            """
-
-            self.cursor.execute(query, (username, password, full_name))
+            self.cursor.execute(queries.REGISTER_USER, (username, password, full_name))
             self.connection.commit()
             return True
 
@@ -81,8 +98,7 @@ class Database:
     def check_username_exists(self, username: str) -> bool:
         """Проверка существования username"""
         try:
-            query = "SELECT 1 FROM users WHERE username = %s"
-            self.cursor.execute(query, (username,))
+            self.cursor.execute(queries.CHECK_USERNAME_EXISTS, (username,))
             return self.cursor.fetchone() is not None
         except Error as e:
             print(f"Ошибка проверки username: {e}")
@@ -92,358 +108,609 @@ class Database:
 
     def get_all_trains(self) -> List[Dict]:
         """Получение списка всех поездов"""
+        cache = get_reference_cache()
+        trains = cache.get('trains')
+        if trains is not None:
+            return trains
+
         try:
-            query = """
-            SELECT id, train_number, train_name, train_type
-            FROM trains
-            ORDER BY train_number
-            """
-            self.cursor.execute(query)
-            return self.cursor.fetchall()
+            self.cursor.execute(queries.GET_ALL_TRAINS)
+            trains = self.cursor.fetchall()
+            cache.put('trains', trains)
+            return trains
         except Error as e:
             print(f"Ошибка получения поездов: {e}")
             return []
 
+    def get_train_types(self) -> List[str]:
+        """Получение списка типов поездов"""
+        cache = get_reference_cache()
+        train_types = cache.get('train_types')
+        if train_types is not None:
+            return train_types
+
+        try:
+            self.cursor.execute(queries.GET_TRAIN_TYPES)
+            train_types = [row['train_type'] for row in self.cursor.fetchall() if row['train_type']]
+            cache.put('train_types', train_types)
+            return train_types
+        except Error as e:
+            print(f"Ошибка получения типов поездов: {e}")
+            return []
+
     def add_train(self, train_number: str, train_name: str, train_type: str) -> bool:
         """Добавление нового поезда"""
         try:
-            query = """
-            INSERT INTO trains (train_number, train_name, train_type)
-            VALUES (%s, %s, %s)
-            """
-            self.cursor.execute(query, (train_number, train_name, train_type))
+            self.cursor.execute(queries.ADD_TRAIN, (train_number, train_name, train_type))
             self.connection.commit()
+            get_reference_cache().invalidate('trains', 'train_types')
             return True
         except Error as e:
             print(f"Ошибка добавления поезда: {e}")
             return False
 
     def add_route(self, train_id: int, departure_station: str, arrival_station: str,
-                  departure_time: str, arrival_time: str, base_price: float) -> bool:
-        """Добавление нового маршрута"""
-        try:
-            query = """
-            INSERT INTO routes (train_id, departure_station, arrival_station, 
-                               departure_time, arrival_time, base_price)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            self.cursor.execute(query, (train_id, departure_station, arrival_station,
-                                        departure_time, arrival_time, base_price))
+                  departure_time: str, arrival_time: str, base_price: float,
+                  num_seats: int = 0, train_type: Optional[str] = None) -> Optional[int]:
+        """Добавление нового маршрута вместе с местами; возвращает ID маршрута"""
+        try:
+            seats = []
+            if num_seats > 0:
+                train_type = train_type or self._get_train_type(train_id)
+                seats = generate_seats(num_seats, train_type)
+
+            # Маршрут сразу получает счетчики свободных мест, места вставляются в той же транзакции
+            counters = queries.free_seat_deltas([seat_type for _, _, seat_type in seats])
+            route = (train_id, departure_station, arrival_station, departure_time, arrival_time, base_price) + counters
+            if seats and Config.SEAT_INVENTORY['mode'] == 'bitmap':
+                # Строки мест не вставляются: ссылка на общую схему и карта "все свободно"
+                layout_id = self._seat_layout_id(train_type, num_seats)
+                self.cursor.execute(queries.ADD_BITMAP_ROUTE, route + (layout_id, all_free(num_seats)))
+                route_id = self.cursor.lastrowid
+            else:
+                self.cursor.execute(queries.ADD_ROUTE, route)
+                route_id = self.cursor.lastrowid
+                self._insert_seats(route_id, seats)
+
             self.connection.commit()
-            return True
+            # Новый маршрут может добавить станции в списки фильтров и попасть в выдачи поиска
+            get_reference_cache().invalidate('stations')
+            get_route_cache().invalidate_route(route_id, {'departure_station': departure_station,
+                                                         'arrival_station': arrival_station,
+                                                         'departure_time': departure_time})
+            return route_id
         except Error as e:
+            self.connection.rollback()
             print(f"Ошибка добавления маршрута: {e}")
-            return False
+            return None
 
-    def add_seats_for_route(self, route_id: int, num_seats: int) -> bool:
+    def add_seats_for_route(self, route_id: int, num_seats: int, train_type: Optional[str] = None) -> bool:
         """Добавление мест для маршрута"""
         try:
-            # Добавляем места
-            seat_query = """
-            INSERT INTO seats (carriage_number, seat_number, seat_type, status, route_id)
-            VALUES (%s, %s, %s, 'свободно', %s)
-            """
-
-            seats_added = 0
-            carriage_num = 1
-            seat_in_carriage = 1
-
-            for i in range(num_seats):
-                # Определяем тип места
-                if seat_in_carriage <= 2:
-                    seat_type = 'Люкс'
-                elif seat_in_carriage <= 6:
-                    seat_type = 'Купе'
-                else:
-                    seat_type = 'Стандарт'
-
-                self.cursor.execute(seat_query, (carriage_num, seat_in_carriage, seat_type, route_id))
-                seats_added += 1
-                seat_in_carriage += 1
-
-                if seat_in_carriage > 10:  # 10 мест в вагоне
-                    carriage_num += 1
-                    seat_in_carriage = 1
+            self.cursor.execute(queries.GET_ROUTE_INVENTORY, (route_id,))
+            inventory = self.cursor.fetchone()
+            if inventory and inventory['seat_layout_id'] is not None:
+                print("Ошибка добавления мест: места рейса с битовой картой задаются схемой мест")
+                return False
+
+            seats = generate_seats(num_seats, train_type)
+            self._insert_seats(route_id, seats)
+
+            deltas = queries.free_seat_deltas([seat_type for _, _, seat_type in seats])
+            self.cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
 
             self.connection.commit()
-            return seats_added > 0
+            self._invalidate_route_searches(route_id)
+            return len(seats) > 0
 
         except Error as e:
+            self.connection.rollback()
             print(f"Ошибка добавления мест: {e}")
             return False
 
+    def _invalidate_route_searches(self, route_id: int):
+        """Сброс выдач поиска с рейсом и тех, куда он может попасть (места рейса стали свободны)"""
+        try:
+            self.cursor.execute(queries.GET_ROUTE_SEARCH_FIELDS, (route_id,))
+            get_route_cache().invalidate_route(route_id, self.cursor.fetchone())
+        except Error:
+            # Изменение уже зафиксировано - без полей рейса сбрасываем весь кэш
+            get_route_cache().clear()
+
+    def _get_train_type(self, train_id: int) -> Optional[str]:
+        """Тип поезда (для выбора схемы вагонов)"""
+        self.cursor.execute(queries.GET_TRAIN_TYPE, (train_id,))
+        result = self.cursor.fetchone()
+        return result['train_type'] if result else None
+
+    def _insert_seats(self, route_id: int, seats: List[Tuple[int, int, str]]):
+        """Вставка мест маршрута многострочным INSERT (без фиксации транзакции)"""
+        if seats:
+            # executemany для INSERT отправляет один многострочный запрос
+            self.cursor.executemany(queries.ADD_SEAT, [seat + (route_id,) for seat in seats])
+
+    def _seat_layout_id(self, train_type: Optional[str], num_seats: int) -> int:
+        """Общая схема мест поезда (создается при первом обращении, без фиксации транзакции)"""
+        key = layout_key(train_type)
+        self.cursor.execute(queries.FIND_SEAT_LAYOUT, (key, num_seats))
+        layout = self.cursor.fetchone()
+        if layout:
+            return layout['id']
+
+        self.cursor.execute(queries.ADD_SEAT_LAYOUT, (key, num_seats))
+        layout_id = self.cursor.lastrowid
+        self.cursor.executemany(queries.ADD_LAYOUT_SEAT, [
+            (layout_id, slot) + seat for slot, seat in enumerate(generate_seats(num_seats, key))
+        ])
+        return layout_id
+
+    def get_seat_layout(self, train_type: Optional[str], num_seats: int) -> Optional[int]:
+        """ID общей схемы мест для рейсов с битовой картой"""
+        try:
+            layout_id = self._seat_layout_id(train_type, num_seats)
+            self.connection.commit()
+            return layout_id
+
+        except Error as e:
+            self.connection.rollback()
+            print(f"Ошибка получения схемы мест: {e}")
+            return None
+
+    def get_layout_map(self, layout_id: int) -> Optional[SeatMap]:
+        """Общая схема мест со всеми свободными местами (id мест - строки layout_seats)"""
+        try:
+            return self._layout_map(layout_id)
+
+        except Error as e:
+            print(f"Ошибка получения схемы мест: {e}")
+            return None
+
+    def _layout_map(self, layout_id: int) -> SeatMap:
+        """Общая схема мест из кэша или базы (ошибка базы передается вызывающему)"""
+        key = (source_name(), layout_id)
+        seat_map = _layout_maps.get(key)
+        if seat_map is None:
+            self.cursor.execute(queries.GET_LAYOUT_SEATS, (layout_id,))
+            seat_map = _layout_maps[key] = SeatMap.from_rows(self.cursor.fetchall())
+        return seat_map
+
+    def _bitmap_seat_map(self, route_id: int) -> Optional[SeatMap]:
+        """Схема рейса с битовой картой (None - места рейса хранятся строками seats)"""
+        self.cursor.execute(queries.GET_ROUTE_INVENTORY, (route_id,))
+        inventory = self.cursor.fetchone()
+        if not inventory or inventory['seat_layout_id'] is None:
+            return None
+        # Ошибка чтения схемы уходит в except Error вызывающего метода, а не превращается в None
+        return self._layout_map(inventory['seat_layout_id']).with_free(route_id, inventory['seat_bitmap'])
+
+    def reconcile_free_seats(self) -> int:
+        """Пересчет счетчиков свободных мест по таблице seats; возвращает число исправленных маршрутов"""
+        try:
+            self.cursor.execute(queries.RECONCILE_ROW_FREE_SEATS)
+            self.connection.commit()
+            get_route_cache().clear()
+            return self.cursor.rowcount
+
+        except Error as e:
+            self.connection.rollback()
+            print(f"Ошибка пересчета свободных мест: {e}")
+            return -1
+
     def get_all_available_routes(self, filters=None) -> List[Dict]:
         """Получение всех доступных рейсов с фильтрами"""
+        cache = get_route_cache()
         try:
-            query = """
-            SELECT 
-                t.id as train_id,
-                t.train_number,
-                t.train_name,
-                t.train_type,
-                r.id as route_id,
-                r.departure_station,
-                r.arrival_station,
-                r.departure_time,
-                r.arrival_time,
-                r.base_price,
-                COUNT(s.id) as available_seats
-            FROM trains t
-            JOIN routes r ON t.id = r.train_id
-            LEFT JOIN seats s ON s.route_id = r.id AND s.status = 'свободно'
-            WHERE 1=1
-            """
-
-            params = []
-
-            # Применяем фильтры если они есть
-            if filters:
-                if filters.get('departure_station'):
-                    query += " AND r.departure_station = %s"
-                    params.append(filters['departure_station'])
-
-                if filters.get('arrival_station'):
-                    query += " AND r.arrival_station = %s"
-                    params.append(filters['arrival_station'])
-
-                if filters.get('date_filter'):
-                    if filters['date_filter'] == 'today':
-                        query += " AND DATE(r.departure_time) = CURDATE()"
-                    elif filters['date_filter'] == 'tomorrow':
-                        query += " AND DATE(r.departure_time) = DATE_ADD(CURDATE(), INTERVAL 1 DAY)"
-                    elif filters['date_filter'] == 'this_week':
-                        query += " AND YEARWEEK(r.departure_time, 1) = YEARWEEK(CURDATE(), 1)"
-                    elif filters['date_filter'] == 'next_week':
-                        query += " AND YEARWEEK(r.departure_time, 1) = YEARWEEK(DATE_ADD(CURDATE(), INTERVAL 7 DAY), 1)"
-
-            query += """
-            GROUP BY r.id, t.id, t.train_number, t.train_name, t.train_type,
-                     r.departure_station, r.arrival_station, r.departure_time, 
-                     r.arrival_time, r.base_price
-            HAVING available_seats > 0
-            ORDER BY r.departure_time
-            """
+            key = routes_key(filters)
+            routes = cache.get(key)
+            if routes is not None:
+                return routes
 
+            query, params = queries.build_available_routes_query(filters)
             self.cursor.execute(query, params)
-            return self.cursor.fetchall()
+            routes = self.cursor.fetchall()
+            cache.put(key, routes)
+            return routes
 
         except Error as e:
             print(f"Ошибка получения рейсов: {e}")
             return []
+        except ValueError as e:
+            print(f"Ошибка получения рейсов: неверная дата в фильтрах: {e}")
+            return []
 
     def search_trains(self, from_station: str, to_station: str, date: str) -> List[Dict]:
         """Поиск поездов по маршруту"""
+        cache = get_route_cache()
         try:
-            query = """
-            SELECT 
-                t.id as train_id,
-                t.train_number,
-                t.train_name,
-                t.train_type,
-                r.id as route_id,
-                r.departure_station,
-                r.arrival_station,
-                r.departure_time,
-                r.arrival_time,
-                r.base_price,
-                COUNT(s.id) as available_seats
-            FROM trains t
-            JOIN routes r ON t.id = r.train_id
-            LEFT JOIN seats s ON s.route_id = r.id AND s.status = 'свободно'
-            WHERE r.departure_station LIKE %s 
-                AND r.arrival_station LIKE %s
-                AND DATE(r.departure_time) = %s
-            GROUP BY r.id, t.id, t.train_number, t.train_name, t.train_type,
-                     r.departure_station, r.arrival_station, r.departure_time, 
-                     r.arrival_time, r.base_price
-            HAVING available_seats > 0
-            ORDER BY r.departure_time
-            """
-
-            self.cursor.execute(query, (f"%{from_station}%", f"%{to_station}%", date))
-            return self.cursor.fetchall()
+            # Ключ с границами суток строится внутри try: неверная дата - пустая выдача, а не исключение
+            key = trains_key(from_station, to_station, date)
+            routes = cache.get(key)
+            if routes is not None:
+                return routes
+
+            start, end = queries.day_bounds(date)
+            self.cursor.execute(queries.SEARCH_TRAINS, (f"%{from_station}%", f"%{to_station}%", start, end))
+            routes = self.cursor.fetchall()
+            cache.put(key, routes)
+            return routes
 
         except Error as e:
             print(f"Ошибка поиска поездов: {e}")
             return []
+        except ValueError as e:
+            print(f"Ошибка поиска поездов: неверная дата {date!r}: {e}")
+            return []
+
+    def get_stations(self) -> Dict[str, List[str]]:
+        """Получение списков станций отправления и назначения"""
+        cache = get_reference_cache()
+        stations = cache.get('stations')
+        if stations is not None:
+            return stations
+
+        try:
+            self.cursor.execute(queries.GET_DEPARTURE_STATIONS)
+            departure = [row['departure_station'] for row in self.cursor.fetchall()]
+
+            self.cursor.execute(queries.GET_ARRIVAL_STATIONS)
+            arrival = [row['arrival_station'] for row in self.cursor.fetchall()]
+
+            stations = {'departure': departure, 'arrival': arrival}
+            cache.put('stations', stations)
+            return stations
+
+        except Error as e:
+            print(f"Ошибка получения станций: {e}")
+            return {'departure': [], 'arrival': []}
+
+    def get_routes_overview(self, limit: int = 100) -> List[Dict]:
+        """Получение последних рейсов с количеством свободных мест (для админа)"""
+        try:
+            self.cursor.execute(queries.GET_ROUTES_OVERVIEW, (limit,))
+            return self.cursor.fetchall()
+
+        except Error as e:
+            print(f"Ошибка получения списка рейсов: {e}")
+            return []
 
     def get_available_seats(self, route_id: int) -> List[Dict]:
         """Получение свободных мест для рейса"""
         try:
-            query = """
-            SELECT 
-                s.id as seat_id,
-                s.seat_number,
-                s.seat_type,
-                s.carriage_number,
-                s.status
-            FROM seats s
-            WHERE s.route_id = %s AND s.status = 'свободно'
-            ORDER BY s.carriage_number, s.seat_number
-            """
-
-            self.cursor.execute(query, (route_id,))
+            seat_map = self._bitmap_seat_map(route_id)
+            if seat_map is not None:
+                return list(seat_map.free_seats())
+
+            self.cursor.execute(queries.GET_AVAILABLE_SEATS, (route_id,))
             return self.cursor.fetchall()
 
         except Error as e:
             print(f"Ошибка получения мест: {e}")
             return []
 
+    def get_seat_map(self, route_id: int) -> Optional[SeatMap]:
+        """Схема занятости мест рейса (одним запросом)"""
+        try:
+            seat_map = self._bitmap_seat_map(route_id)
+            if seat_map is not None:
+                return seat_map
+
+            self.cursor.execute(queries.GET_ROUTE_SEATS, (route_id,))
+            return SeatMap.from_rows(self.cursor.fetchall(), route_id)
+
+        except Error as e:
+            print(f"Ошибка получения схемы мест: {e}")
+            return None
+
     # ========== БРОНИРОВАНИЯ ==========
 
-    def create_booking(self, passenger_data: Dict, seat_id: int, route_id: int, user_id: int) -> Optional[int]:
+    def create_booking(self, passenger_data: Dict, seat_id: int, route_id: int, user_id: int) -> BookingResult:
         """Создание бронирования"""
         try:
+            # Рейс с битовой картой: место захватывается сравнением с обменом карты
+            layout_seats = self._layout_seats(route_id, [seat_id])
+            if layout_seats:
+                return self._book_layout_seats([passenger_data], layout_seats, route_id, user_id)
+
             # Начинаем транзакцию
             self.cursor.execute("START TRANSACTION")
 
-            # 1. Создаем пассажира
-            passenger_query = """
-            INSERT INTO passengers (full_name, document_number, phone)
-            VALUES (%s, %s, %s)
-            """
-            self.cursor.execute(passenger_query, (
+            # 1. Захватываем место - до любых вставок, чтобы занятое место не продать дважды
+            self.cursor.execute(queries.CLAIM_SEAT, (seat_id, route_id))
+            if self.cursor.rowcount == 0:
+                self.connection.rollback()
+                return BookingResult(seat_taken=True)
+
+            # 2. Получаем цену маршрута и класс места, уменьшаем счетчики свободных мест.
+            # Строка маршрута блокируется раньше вставки бронирования: проверка внешнего
+            # ключа ставит на нее разделяемую блокировку, и обратный порядок ведет к взаимоблокировкам
+            self.cursor.execute(queries.GET_PRICE_AND_SEAT_TYPE, (seat_id, route_id))
+            price_result = self.cursor.fetchone()
+            deltas = queries.free_seat_deltas([price_result['seat_type']], -1)
+            self.cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
+
+            # 3. Находим или создаем пассажира по номеру документа
+            self.cursor.execute(queries.UPSERT_PASSENGER, (
                 passenger_data['full_name'],
                 passenger_data['document_number'],
                 passenger_data['phone']
             ))
             passenger_id = self.cursor.lastrowid
 
-            # 2. Получаем цену маршрута
-            price_query = "SELECT base_price FROM routes WHERE id = %s"
-            self.cursor.execute(price_query, (route_id,))
-            price_result = self.cursor.fetchone()
-            price = price_result['base_price'] if price_result else 0
-
-            # 3. Создаем бронирование
-            booking_query = """
-            INSERT INTO bookings (passenger_id, seat_id, route_id, status, final_price, user_id, confirmed_by_admin)
-            VALUES (%s, %s, %s, 'забронирован', %s, %s, FALSE)
-            """
-            self.cursor.execute(booking_query, (passenger_id, seat_id, route_id, price, user_id))
+            # 4. Создаем бронирование
+            self.cursor.execute(queries.ADD_BOOKING, (passenger_id, seat_id, route_id,
+                                                      price_result['base_price'], user_id))
             booking_id = self.cursor.lastrowid
 
-            # 4. Обновляем статус места
-            seat_query = "UPDATE seats SET status = 'забронировано' WHERE id = %s"
-            self.cursor.execute(seat_query, (seat_id,))
-
             # Фиксируем транзакцию
             self.connection.commit()
-            return booking_id
+            get_route_cache().invalidate_route(route_id)
+            return BookingResult(booking_id=booking_id, booking_ids=[booking_id])
 
         except Error as e:
             if self.connection:
                 self.connection.rollback()
             print(f"Ошибка создания бронирования: {e}")
+            return BookingResult()
+
+    def create_group_booking(self, passengers: List[Dict], seat_ids: List[int], route_id: int,
+                             user_id: int) -> BookingResult:
+        """Групповое бронирование: passengers[i] едет на месте seat_ids[i], все или ничего"""
+        if not seat_ids or len(passengers) != len(seat_ids):
+            return BookingResult()
+
+        placeholders = queries.in_placeholders(seat_ids)
+        try:
+            layout_seats = self._layout_seats(route_id, seat_ids)
+            if layout_seats:
+                return self._book_layout_seats(passengers, layout_seats, route_id, user_id)
+
+            self.cursor.execute("START TRANSACTION")
+
+            # 1. Захватываем все места одним условным обновлением
+            self.cursor.execute(queries.CLAIM_SEATS.format(placeholders), [route_id] + list(seat_ids))
+            if self.cursor.rowcount != len(seat_ids):
+                self.connection.rollback()
+                # После отката несвободными остаются только места, занятые другими кассами
+                self.cursor.execute(queries.GET_TAKEN_SEATS.format(placeholders), list(seat_ids))
+                taken = [row['id'] for row in self.cursor.fetchall()]
+                self.connection.commit()
+                return BookingResult(seat_taken=True, taken_seat_ids=taken)
+
+            # 2. Классы мест и цена, счетчики свободных мест - одним обновлением
+            self.cursor.execute(queries.GET_SEATS_WITH_PRICE.format(placeholders), [route_id] + list(seat_ids))
+            seats = self.cursor.fetchall()
+            deltas = queries.free_seat_deltas([seat['seat_type'] for seat in seats], -1)
+            self.cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (route_id,))
+            price = seats[0]['base_price']
+
+            # 3. Пассажиры многострочной вставкой с обновлением известных документов;
+            # часть строк может оказаться существующей, поэтому id читаются по документам
+            documents = [passenger['document_number'] for passenger in passengers]
+            self.cursor.executemany(queries.UPSERT_PASSENGER, [
+                (passenger['full_name'], passenger['document_number'], passenger['phone'])
+                for passenger in passengers
+            ])
+            self.cursor.execute(queries.GET_PASSENGER_IDS.format(queries.in_placeholders(documents)), documents)
+            passenger_ids = {row['document_number']: row['id'] for row in self.cursor.fetchall()}
+
+            # 4. Бронирования многострочной вставкой; id читаются по местам в той же транзакции
+            self.cursor.executemany(queries.ADD_BOOKING, [
+                (passenger_ids[document], seat_id, route_id, price, user_id)
+                for document, seat_id in zip(documents, seat_ids)
+            ])
+            booking_ids = self._new_booking_ids(queries.GET_NEW_BOOKING_IDS, route_id, seat_ids)
+
+            self.connection.commit()
+            get_route_cache().invalidate_route(route_id)
+            return BookingResult(booking_id=booking_ids[0], booking_ids=booking_ids)
+
+        except Error as e:
+            if self.connection:
+                self.connection.rollback()
+            print(f"Ошибка группового бронирования: {e}")
+            return BookingResult()
+
+    def _layout_seats(self, route_id: int, seat_ids: List[int]) -> List[Dict]:
+        """Места рейса с битовой картой в порядке seat_ids (пусто для рейса со строками seats)"""
+        self.cursor.execute(queries.GET_LAYOUT_SEATS_WITH_PRICE.format(queries.in_placeholders(seat_ids)),
+                            [route_id] + list(seat_ids))
+        seats = {seat['id']: seat for seat in self.cursor.fetchall()}
+        return [seats[seat_id] for seat_id in seat_ids] if len(seats) == len(set(seat_ids)) else []
+
+    def _swap_seat_bitmap(self, route_id: int, seats: List[Dict], free: bool) -> Tuple[bool, List[Dict]]:
+        """Освобождение (free=True) или захват мест карты рейса сравнением с обменом по версии.
+
+        Успех - (True, измененные места) с открытой транзакцией для остальных изменений.
+        При захвате занятых мест - (False, занятые места); (False, []) - карту не удалось
+        обновить за Config.SEAT_INVENTORY['cas_attempts'] попыток.
+        """
+        for _ in range(Config.SEAT_INVENTORY['cas_attempts']):
+            # Чтение вне транзакции: каждая попытка видит последнюю версию карты
+            self.connection.commit()
+            self.cursor.execute(queries.GET_ROUTE_INVENTORY, (route_id,))
+            inventory = self.cursor.fetchone()
+            taken = set(taken_slots(inventory['seat_bitmap'], [seat['slot'] for seat in seats]))
+            if free:
+                changed = [seat for seat in seats if seat['slot'] in taken]
+            elif taken:
+                return False, [seat for seat in seats if seat['slot'] in taken]
+            else:
+                changed = seats
+
+            self.cursor.execute("START TRANSACTION")
+            if not changed:
+                return True, []
+
+            bitmap = with_slots(inventory['seat_bitmap'], [seat['slot'] for seat in changed], free)
+            deltas = queries.free_seat_deltas([seat['seat_type'] for seat in changed], 1 if free else -1)
+            self.cursor.execute(queries.SWAP_SEAT_BITMAP,
+                                (bitmap,) + deltas + (route_id, inventory['seat_version']))
+            if self.cursor.rowcount == 1:
+                return True, changed
+
+            # Карту изменила другая касса - повторяем по новой версии
+            self.connection.rollback()
+
+        return False, []
+
+    def _book_layout_seats(self, passengers: List[Dict], seats: List[Dict], route_id: int,
+                           user_id: int) -> BookingResult:
+        """Бронирование мест рейса с битовой картой: passengers[i] едет на месте seats[i]"""
+        # 1. Захватываем места (карта и счетчики - одним обновлением строки рейса)
+        swapped, taken = self._swap_seat_bitmap(route_id, seats, free=False)
+        if not swapped:
+            self.connection.rollback()
+            if taken:
+                return BookingResult(seat_taken=True, taken_seat_ids=[seat['id'] for seat in taken])
+            print("Ошибка бронирования: карта мест рейса меняется другими кассами, повторите попытку")
+            return BookingResult()
+
+        # 2. Пассажиры по документам и бронирования многострочными вставками
+        documents = [passenger['document_number'] for passenger in passengers]
+        self.cursor.executemany(queries.UPSERT_PASSENGER, [
+            (passenger['full_name'], passenger['document_number'], passenger['phone'])
+            for passenger in passengers
+        ])
+        self.cursor.execute(queries.GET_PASSENGER_IDS.format(queries.in_placeholders(documents)), documents)
+        passenger_ids = {row['document_number']: row['id'] for row in self.cursor.fetchall()}
+
+        self.cursor.executemany(queries.ADD_LAYOUT_BOOKING, [
+            (passenger_ids[document], seat['id'], route_id, seat['base_price'], user_id)
+            for document, seat in zip(documents, seats)
+        ])
+        booking_ids = self._new_booking_ids(queries.GET_NEW_LAYOUT_BOOKING_IDS, route_id,
+                                            [seat['id'] for seat in seats])
+
+        self.connection.commit()
+        get_route_cache().invalidate_route(route_id)
+        return BookingResult(booking_id=booking_ids[0], booking_ids=booking_ids)
+
+    def _new_booking_ids(self, query: str, route_id: int, seat_ids: List[int]) -> List[int]:
+        """id только что вставленных бронирований в порядке seat_ids"""
+        self.cursor.execute(query.format(queries.in_placeholders(seat_ids)), [route_id] + list(seat_ids))
+        booking_ids = {row['seat_id']: row['id'] for row in self.cursor.fetchall()}
+        return [booking_ids[seat_id] for seat_id in seat_ids]
+
+    def get_row_route_ids(self, after_id: int = 0, limit: int = 1000) -> List[int]:
+        """ID рейсов, места которых хранятся строками seats (по возрастанию, после after_id)"""
+        try:
+            self.cursor.execute(queries.GET_ROW_ROUTES, (after_id, limit))
+            return [row['id'] for row in self.cursor.fetchall()]
+
+        except Error as e:
+            print(f"Ошибка получения рейсов: {e}")
+            return []
+
+    def convert_route_to_bitmap(self, route_id: int) -> bool:
+        """Перевод мест рейса из строк seats в битовую карту; False, если места не совпадают со схемой"""
+        try:
+            self.cursor.execute("START TRANSACTION")
+            self.cursor.execute(queries.LOCK_ROUTE_SEATS, (route_id,))
+            self.cursor.execute(queries.GET_ROUTE_SEATS, (route_id,))
+            rows = sorted(self.cursor.fetchall(), key=lambda row: (row['carriage_number'], row['seat_number']))
+            self.cursor.execute(queries.GET_ROUTE_TRAIN_TYPE, (route_id,))
+            train = self.cursor.fetchone()
+
+            # Переводятся только рейсы, места которых в точности совпадают со схемой поезда
+            seats = [(row['carriage_number'], row['seat_number'], row['seat_type']) for row in rows]
+            if not rows or not train or seats != generate_seats(len(rows), train['train_type']):
+                self.connection.rollback()
+                return False
+
+            layout_id = self._seat_layout_id(train['train_type'], len(rows))
+            layout = self._layout_map(layout_id)
+            seat_map = SeatMap.from_rows(rows, route_id)
+            layout_ids = {row['seat_id']: layout.seat_id(row['carriage_number'], row['seat_number'])
+                          for row in rows}
+
+            self.cursor.execute(queries.GET_ROUTE_SEAT_BOOKINGS, (route_id,))
+            moves = [(layout_ids[row['seat_id']], row['id']) for row in self.cursor.fetchall()]
+            if moves:
+                self.cursor.executemany(queries.MOVE_BOOKING_TO_LAYOUT, moves)
+
+            counters = queries.free_seat_deltas([seat['seat_type'] for seat in seat_map.free_seats()])
+            self.cursor.execute(queries.SET_ROUTE_BITMAP, (layout_id, seat_map.free_bitmap)
+                                + counters + (route_id,))
+            self.cursor.execute(queries.DELETE_ROUTE_SEATS, (route_id,))
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            self.connection.rollback()
+            print(f"Ошибка перевода мест рейса на битовую карту: {e}")
+            return False
+
+    def find_passenger_by_document(self, document_number: str) -> Optional[Dict]:
+        """Поиск пассажира по номеру документа"""
+        try:
+            self.cursor.execute(queries.FIND_PASSENGER_BY_DOCUMENT, (document_number,))
+            return self.cursor.fetchone()
+
+        except Error as e:
+            print(f"Ошибка поиска пассажира: {e}")
             return None
 
-    def get_user_bookings(self, user_id: int) -> List[Dict]:
-        """Получение списка бронирований пользователя"""
-        try:
-            query = """
-            SELECT 
-                b.id as booking_id,
-                b.status,
-                b.booking_date,
-                b.final_price,
-                p.full_name,
-                t.train_name,
-                r.departure_station,
-                r.arrival_station,
-                s.seat_number,
-                s.carriage_number,
-                b.confirmed_by_admin
-            FROM bookings b
-            JOIN passengers p ON b.passenger_id = p.id
-            JOIN routes r ON b.route_id = r.id
-            JOIN trains t ON r.train_id = t.id
-            JOIN seats s ON b.seat_id = s.id
-            WHERE b.user_id = %s
-            ORDER BY b.booking_date DESC
-            LIMIT 100
-            """
-
-            self.cursor.execute(query, (user_id,))
+    def search_passengers(self, name_prefix: str, limit: int = 10) -> List[Dict]:
+        """Поиск пассажиров по началу ФИО"""
+        try:
+            self.cursor.execute(queries.SEARCH_PASSENGERS_BY_NAME, (queries.like_prefix(name_prefix), limit))
             return self.cursor.fetchall()
 
         except Error as e:
-            print(f"Ошибка получения бронирований: {e}")
+            print(f"Ошибка поиска пассажиров: {e}")
             return []
 
-    def get_all_bookings(self) -> List[Dict]:
-        """Получение всех бронирований (для админа)"""
-        try:
-            query = """
-            SELECT 
-                b.id as booking_id,
-                b.status,
-                b.booking_date,
-                b.final_price,
-                b.confirmed_by_admin,
-                p.full_name,
-                p.document_number,
-                p.phone,
-                t.train_name,
-                t.train_number,
-                r.departure_station,
-                r.arrival_station,
-                r.departure_time,
-                r.arrival_time,
-                s.seat_number,
-                s.carriage_number,
-                s.seat_type,
-                u.username as created_by_user,
-                u.full_name as user_full_name
-            FROM bookings b
-            JOIN passengers p ON b.passenger_id = p.id
-            JOIN routes r ON b.route_id = r.id
-            JOIN trains t ON r.train_id = t.id
-            JOIN seats s ON b.seat_id = s.id
-            JOIN users u ON b.user_id = u.id
-            ORDER BY b.booking_date DESC
-            LIMIT 200
-            """
-
-            self.cursor.execute(query)
+    def get_user_bookings(self, user_id: int, filters: Optional[Dict] = None, after: Optional[Tuple] = None,
+                          page_size: int = Config.BOOKINGS_PAGE_SIZE) -> List[Dict]:
+        """Получение страницы бронирований пользователя (after - ключ из queries.page_cursor)"""
+        return self._get_bookings_page(queries.USER_BOOKINGS_SELECT, dict(filters or {}, user_id=user_id),
+                                       after, page_size)
+
+    def get_all_bookings(self, filters: Optional[Dict] = None, after: Optional[Tuple] = None,
+                         page_size: int = Config.BOOKINGS_PAGE_SIZE) -> List[Dict]:
+        """Получение страницы всех бронирований с фильтрами (для админа)"""
+        return self._get_bookings_page(queries.BOOKING_DETAILS_SELECT, filters, after, page_size)
+
+    def get_user_bookings_with_counts(self, user_id: int, filters: Optional[Dict] = None,
+                                      page_size: int = Config.BOOKINGS_PAGE_SIZE) -> Tuple[List[Dict], Dict]:
+        """Первая страница бронирований пользователя и счетчики по статусам за один запрос"""
+        return self._get_bookings_with_counts(queries.USER_BOOKINGS_SELECT,
+                                              dict(filters or {}, user_id=user_id), page_size)
+
+    def get_all_bookings_with_counts(self, filters: Optional[Dict] = None,
+                                     page_size: int = Config.BOOKINGS_PAGE_SIZE) -> Tuple[List[Dict], Dict]:
+        """Первая страница всех бронирований и счетчики по статусам за один запрос (для админа)"""
+        return self._get_bookings_with_counts(queries.BOOKING_DETAILS_SELECT, filters, page_size)
+
+    def _get_bookings_page(self, select: str, filters: Optional[Dict], after: Optional[Tuple],
+                           page_size: int) -> List[Dict]:
+        """Страница бронирований по фильтрам queries.build_bookings_filter"""
+        try:
+            conditions, params = queries.build_bookings_filter(filters)
+            query, params = queries.build_bookings_page_query(select, conditions, params, after, page_size)
+            self.cursor.execute(query, params)
             return self.cursor.fetchall()
 
         except Error as e:
-            print(f"Ошибка получения всех бронирований: {e}")
+            print(f"Ошибка получения бронирований: {e}")
             return []
 
+    def _get_bookings_with_counts(self, select: str, filters: Optional[Dict],
+                                  page_size: int) -> Tuple[List[Dict], Dict]:
+        """Первая страница бронирований вместе со счетчиками по статусам"""
+        try:
+            query, params = queries.build_bookings_with_counts_query(select, filters, page_size)
+            self.cursor.execute(query, params)
+            return queries.split_bookings_with_counts(self.cursor.fetchall())
+
+        except Error as e:
+            print(f"Ошибка получения бронирований: {e}")
+            return [], {}
+
     def get_booking_details(self, booking_id: int) -> Optional[Dict]:
         """Получение детальной информации о бронировании"""
         try:
-            query = """
-            SELECT 
-                b.id as booking_id,
-                b.status,
-                b.booking_date,
-                b.final_price,
-                b.confirmed_by_admin,
-                p.full_name,
-                p.document_number,
-                p.phone,
-                t.train_name,
-                t.train_number,
-                r.departure_station,
-                r.arrival_station,
-                r.departure_time,
-                r.arrival_time,
-                s.seat_number,
-                s.carriage_number,
-                s.seat_type,
-                u.username as created_by_user
-            FROM bookings b
-            JOIN passengers p ON b.passenger_id = p.id
-            JOIN routes r ON b.route_id = r.id
-            JOIN trains t ON r.train_id = t.id
-            JOIN seats s ON b.seat_id = s.id
-            JOIN users u ON b.user_id = u.id
-            WHERE b.id = %s
-            """
-
-            self.cursor.execute(query, (booking_id,))
+            self.cursor.execute(queries.GET_BOOKING_DETAILS, (booking_id,))
             return self.cursor.fetchone()
 
         except Error as e:
@@ -457,20 +724,34 @@ class Database:
             self.cursor.execute("START TRANSACTION")
 
             # 1. Получаем seat_id для освобождения места
-            seat_query = "SELECT seat_id FROM bookings WHERE id = %s"
-            self.cursor.execute(seat_query, (booking_id,))
+            self.cursor.execute(queries.GET_BOOKING_SEAT, (booking_id,))
             seat_result = self.cursor.fetchone()
 
-            if seat_result:
-                # 2. Обновляем статус бронирования
-                booking_query = "UPDATE bookings SET status = 'отменено' WHERE id = %s"
-                self.cursor.execute(booking_query, (booking_id,))
+            # Повторная отмена не должна освободить место, уже проданное заново:
+            # для строк мест и для карты рейса место и счетчики не меняются
+            if not seat_result or seat_result['status'] == 'отменено':
+                self.connection.rollback()
+                return True
 
-                # 3. Освобождаем место
-                seat_query = "UPDATE seats SET status = 'свободно' WHERE id = %s"
-                self.cursor.execute(seat_query, (seat_result['seat_id'],))
+            if seat_result['layout_seat_id'] is not None:
+                return self._cancel_layout_booking(booking_id, seat_result)
+
+            # 2. Обновляем статус только активного бронирования (его могла отменить другая касса)
+            self.cursor.execute(queries.CANCEL_ACTIVE_BOOKING, (booking_id,))
+            if self.cursor.rowcount == 0:
+                self.connection.rollback()
+                return True
+
+            # 3. Освобождаем место и возвращаем его в счетчики маршрута
+            self.cursor.execute(queries.RELEASE_SEAT, (seat_result['seat_id'],))
+            released = self.cursor.rowcount > 0
+            if released:
+                deltas = queries.free_seat_deltas([seat_result['seat_type']])
+                self.cursor.execute(queries.ADJUST_FREE_SEATS, deltas + (seat_result['route_id'],))
 
             self.connection.commit()
+            if released:
+                self._invalidate_route_searches(seat_result['route_id'])
             return True
 
         except Error as e:
@@ -479,15 +760,29 @@ class Database:
             print(f"Ошибка отмены бронирования: {e}")
             return False
 
+    def _cancel_layout_booking(self, booking_id: int, seat_result: Dict) -> bool:
+        """Отмена бронирования на рейсе с битовой картой"""
+        seat = {'id': seat_result['layout_seat_id'], 'slot': seat_result['slot'],
+                'seat_type': seat_result['seat_type']}
+        swapped, _ = self._swap_seat_bitmap(seat_result['route_id'], [seat], free=True)
+        if not swapped:
+            self.connection.rollback()
+            print("Ошибка отмены бронирования: карта мест рейса меняется другими кассами, повторите попытку")
+            return False
+
+        self.cursor.execute(queries.CANCEL_ACTIVE_BOOKING, (booking_id,))
+        if self.cursor.rowcount == 0:
+            # Бронирование отменила другая касса после проверки: карта не меняется
+            self.connection.rollback()
+        else:
+            self.connection.commit()
+            self._invalidate_route_searches(seat_result['route_id'])
+        return True
+
     def confirm_booking(self, booking_id: int) -> bool:
         """Подтверждение бронирования администратором"""
         try:
-            query = """
-            UPDATE bookings 
-            SET status = 'подтвержден', confirmed_by_admin = TRUE 
-            WHERE id = %s AND status != 'отменено'  # Не подтверждаем отмененные
-            """
-            self.cursor.execute(query, (booking_id,))
+            self.cursor.execute(queries.CONFIRM_BOOKING, (booking_id,))
             self.connection.commit()
             return self.cursor.rowcount > 0
 
@@ -497,9 +792,12 @@ class Database:
 
     def update_booking_status(self, booking_id: int, status: str) -> bool:
         """Обновление статуса бронирования"""
+        # Отмена освобождает место и меняет счетчики рейса
+        if status == 'отменено':
+            return self.cancel_booking(booking_id)
+
         try:
-            query = "UPDATE bookings SET status = %s WHERE id = %s"
-            self.cursor.execute(query, (status, booking_id))
+            self.cursor.execute(queries.UPDATE_BOOKING_STATUS, (status, booking_id))
             self.connection.commit()
             return self.cursor.rowcount > 0
 
@@ -510,13 +808,7 @@ class Database:
     def get_all_users(self) -> List[Dict]:
         """Получение списка всех пользователей"""
         try:
-            query = """
-            SELECT id, username, full_name, role, created_at
-            FROM users
-            WHERE role != 'admin'  # Не показываем админов
-            ORDER BY created_at DESC
-            """
-            self.cursor.execute(query)
+            self.cursor.execute(queries.GET_ALL_USERS)
             return self.cursor.fetchall()
         except Error as e:
             print(f"Ошибка получения пользователей: {e}")
@@ -525,10 +817,9 @@ class Database:
     def update_user_role(self, user_id: int, new_role: str) -> bool:
         """Обновление роли пользователя"""
         try:
-            query = "UPDATE users SET role = %s WHERE id = %s"
-            self.cursor.execute(query, (new_role, user_id))
+            self.cursor.execute(queries.UPDATE_USER_ROLE, (new_role, user_id))
             self.connection.commit()
             return self.cursor.rowcount > 0
         except Error as e:
             print(f"Ошибка обновления роли пользователя: {e}")
-            return False
\ No newline at end of file
+            return False
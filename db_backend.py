@@ -0,0 +1,42 @@
+import sqlite3
+import threading
+from typing import Optional
+from config import Config
+
+# Ошибки обоих хранилищ: except Error ловит любую из них
+try:
+    from mysql.connector import Error as MySQLError
+    Error = (MySQLError, sqlite3.Error)
+except ImportError:
+    Error = (sqlite3.Error,)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_name() -> str:
+    """Выбранное хранилище: 'mysql' или 'sqlite'"""
+    return Config.DB_BACKEND
+
+
+def get_backend():
+    """Источник соединений выбранного хранилища (acquire/release/last_checkout/close_all)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if backend_name() == 'sqlite':
+                import atexit
+                from sqlite_backend import SqliteBackend
+                _backend = SqliteBackend(Config.SQLITE_DB['path'], Config.SQLITE_DB['timeout'])
+                atexit.register(_backend.close_all)
+            else:
+                from db_pool import get_pool
+                _backend = get_pool()
+        return _backend
+
+
+def source_name() -> str:
+    """Адрес базы (для привязки локальных кэшей к базе)"""
+    if backend_name() == 'sqlite':
+        return f"sqlite:{Config.SQLITE_DB['path']}"
+    return f"{Config.DB_CONFIG['host']}:{Config.DB_CONFIG.get('port', 3306)}/{Config.DB_CONFIG['database']}"
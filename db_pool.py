@@ -0,0 +1,169 @@
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from config import Config
+
+
+class ConnectionPool:
+    """Пул соединений с базой данных, общий для всего процесса"""
+
+    def __init__(self, db_config: Dict, size: int = 5, idle_timeout: float = 300,
+                 ping_interval: float = 30, checkout_timeout: float = 10,
+                 reconnect_attempts: int = 3):
+        self.db_config = dict(db_config)
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.checkout_timeout = checkout_timeout
+        self.reconnect_attempts = reconnect_attempts
+
+        # Свободные соединения: (соединение, время возврата в пул)
+        self._idle = deque()
+        self._opened = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Ожидание и число переподключений последней выдачи соединения в каждом потоке
+        self._local = threading.local()
+
+    def _open(self):
+        """Открытие нового физического соединения"""
+        return mysql.connector.connect(**self.db_config)
+
+    @staticmethod
+    def _close_quietly(connection):
+        """Закрытие соединения без выброса ошибок"""
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def _take_expired(self) -> list:
+        """Извлечение соединений, простаивавших дольше idle_timeout (под блокировкой)"""
+        expired = []
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] >= self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+            self._opened -= 1
+        return expired
+
+    def acquire(self):
+        """Выдача соединения из пула"""
+        deadline = time.monotonic() + self.checkout_timeout
+        connection = None
+        released_at = 0.0
+        waited = 0.0
+        self._local.checkout = (0.0, 0)
+
+        with self._condition:
+            expired = self._take_expired()
+            while True:
+                if self._closed:
+                    raise PoolError('Пул соединений закрыт')
+                if self._idle:
+                    # Берем последнее возвращенное - оно с наибольшей вероятностью живо
+                    connection, released_at = self._idle.pop()
+                    break
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError('Нет свободных соединений в пуле')
+                wait_started = time.monotonic()
+                self._condition.wait(remaining)
+                waited += time.monotonic() - wait_started
+
+        for stale in expired:
+            self._close_quietly(stale)
+
+        # Сетевые операции выполняем вне блокировки
+        retries = 0
+        try:
+            if connection is None:
+                connection = self._open()
+            elif time.monotonic() - released_at >= self.ping_interval:
+                connection, retries = self._revive(connection)
+        except Error:
+            self._local.checkout = (waited, 1)
+            self._forget()
+            raise
+
+        self._local.checkout = (waited, retries)
+        return connection
+
+    def _revive(self, connection):
+        """Проверка соединения после простоя с прозрачным переподключением; (соединение, переподключения)"""
+        try:
+            connection.ping()
+            return connection, 0
+        except Error:
+            pass
+
+        try:
+            connection.reconnect(attempts=self.reconnect_attempts, delay=1)
+            return connection, 1
+        except Error:
+            self._close_quietly(connection)
+            return self._open(), 1
+
+    def last_checkout(self) -> Tuple[float, int]:
+        """Ожидание свободного соединения (сек) и переподключения при последней выдаче в этом потоке"""
+        return getattr(self._local, 'checkout', (0.0, 0))
+
+    def _forget(self):
+        """Учет соединения, которое не удалось открыть или вернуть"""
+        with self._condition:
+            self._opened -= 1
+            self._condition.notify()
+
+    def release(self, connection):
+        """Возврат соединения в пул"""
+        try:
+            # Не оставляем незавершенных транзакций и снимков чтения
+            if connection.in_transaction:
+                connection.rollback()
+            healthy = True
+        except Error:
+            healthy = False
+
+        with self._condition:
+            if healthy and not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+            self._opened -= 1
+            self._condition.notify()
+
+        self._close_quietly(connection)
+
+    def close_all(self):
+        """Закрытие всех свободных соединений"""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._close_quietly(connection)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Получение общего пула соединений (создается при первом обращении)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(Config.DB_CONFIG, **Config.DB_POOL)
+            atexit.register(_pool.close_all)
+        return _pool
@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
 from auth.login_window import LoginWindow
 from config import Config
+from ui.theme import apply_theme
 
 
 def main():
@@ -17,6 +18,9 @@ def main():
         font.setPointSize(Config.FONT_SIZES['normal'])
         app.setFont(font)
 
+        # Одна таблица стилей на все окна (ui/theme.py)
+        apply_theme(app)
+
         # Создаем окно входа
         window = LoginWindow()
         window.show()
@@ -0,0 +1,87 @@
+import argparse
+import sys
+from db_backend import Error
+from database import Database
+import migrations
+
+
+def migrate(db: Database) -> bool:
+    """Применение недостающих миграций схемы"""
+    return migrations.migrate(db)
+
+
+def check_indexes(db: Database) -> bool:
+    """Проверка через EXPLAIN, что горячие запросы не просматривают таблицы целиком"""
+    try:
+        problems = migrations.check_query_plans(db)
+    except Error as e:
+        print(f"Ошибка проверки планов запросов: {e}")
+        return False
+
+    for name, tables in problems.items():
+        print(f"{name}: полный просмотр таблиц {', '.join(tables)}")
+    if not problems:
+        print(f"Все запросы используют индексы ({len(migrations.QUERY_PLAN_CHECKS)})")
+    return not problems
+
+
+def reconcile(db: Database) -> bool:
+    """Пересчет счетчиков свободных мест по фактическим статусам мест"""
+    fixed = db.reconcile_free_seats()
+    if fixed < 0:
+        return False
+
+    print(f"Исправлено маршрутов: {fixed}")
+    return True
+
+
+def convert_seats(db: Database) -> bool:
+    """Перевод мест рейсов из строк seats в битовые карты (пачками, по транзакции на рейс)"""
+    converted, skipped, after_id = 0, 0, 0
+    while True:
+        route_ids = db.get_row_route_ids(after_id)
+        if not route_ids:
+            break
+        for route_id in route_ids:
+            if db.convert_route_to_bitmap(route_id):
+                converted += 1
+            else:
+                skipped += 1
+        after_id = route_ids[-1]
+
+    print(f"Переведено рейсов: {converted}, оставлено со строками мест: {skipped}")
+    return True
+
+
+COMMANDS = {
+    'migrate': migrate,
+    'check-indexes': check_indexes,
+    'reconcile': reconcile,
+    'convert-seats': convert_seats
+}
+
+
+def main():
+    """Служебные команды обслуживания базы данных"""
+    parser = argparse.ArgumentParser(description="Обслуживание базы данных")
+    parser.add_argument('command', choices=sorted(COMMANDS),
+                        help="migrate - применить миграции схемы, "
+                             "check-indexes - проверить планы горячих запросов, "
+                             "reconcile - пересчитать счетчики свободных мест, "
+                             "convert-seats - перевести места рейсов на битовые карты")
+    args = parser.parse_args()
+
+    db = Database()
+    if not db.connect():
+        sys.exit(1)
+
+    try:
+        ok = COMMANDS[args.command](db)
+    finally:
+        db.disconnect()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# Версионные миграции схемы базы данных и проверка планов горячих запросов
+from datetime import datetime
+from typing import Dict, List, Optional
+from db_backend import Error, backend_name
+import queries
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+GET_APPLIED_VERSIONS = "SELECT version FROM schema_migrations ORDER BY version"
+
+RECORD_MIGRATION = "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)"
+
+# ========== ШАГИ МИГРАЦИЙ ==========
+# DDL в MySQL фиксируется неявно, поэтому каждый шаг написан так,
+# чтобы его повторный запуск после сбоя был безопасен
+
+SCHEMA_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(50) NOT NULL UNIQUE,
+        password_hash CHAR(64) NOT NULL,
+        full_name VARCHAR(100) NOT NULL,
+        role VARCHAR(20) NOT NULL DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trains (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        train_number VARCHAR(20) NOT NULL,
+        train_name VARCHAR(100) NOT NULL,
+        train_type VARCHAR(50)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS routes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        train_id INT NOT NULL,
+        departure_station VARCHAR(100) NOT NULL,
+        arrival_station VARCHAR(100) NOT NULL,
+        departure_time DATETIME NOT NULL,
+        arrival_time DATETIME NOT NULL,
+        base_price DECIMAL(10, 2) NOT NULL,
+        FOREIGN KEY (train_id) REFERENCES trains(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS seats (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        route_id INT NOT NULL,
+        carriage_number INT NOT NULL,
+        seat_number INT NOT NULL,
+        seat_type VARCHAR(20) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'свободно',
+        FOREIGN KEY (route_id) REFERENCES routes(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS passengers (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        document_number VARCHAR(50) NOT NULL,
+        phone VARCHAR(20)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        passenger_id INT NOT NULL,
+        seat_id INT NOT NULL,
+        route_id INT NOT NULL,
+        user_id INT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'забронирован',
+        final_price DECIMAL(10, 2) NOT NULL,
+        confirmed_by_admin BOOLEAN NOT NULL DEFAULT FALSE,
+        booking_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (passenger_id) REFERENCES passengers(id),
+        FOREIGN KEY (seat_id) REFERENCES seats(id),
+        FOREIGN KEY (route_id) REFERENCES routes(id),
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """
+]
+
+# Колонки счетчиков свободных мест на маршруте
+FREE_SEAT_COLUMNS = ('free_seats', 'free_lux', 'free_coupe', 'free_standard')
+
+# Индексы под фильтры горячих запросов. Вторичные индексы InnoDB содержат
+# первичный ключ, поэтому (user_id, booking_date) упорядочен и по id
+HOT_INDEXES = [
+    ('seats', 'idx_seats_route_status', ('route_id', 'status')),
+    ('routes', 'idx_routes_stations_departure', ('departure_station', 'arrival_station', 'departure_time')),
+    ('bookings', 'idx_bookings_user_date', ('user_id', 'booking_date')),
+    ('bookings', 'idx_bookings_date', ('booking_date',))
+]
+
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def _index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+
+def _create_indexes(cursor, indexes):
+    for table, index, columns in indexes:
+        if not _index_exists(cursor, table, index):
+            cursor.execute(f"CREATE INDEX {index} ON {table} ({', '.join(columns)})")
+
+
+def create_schema(cursor):
+    """Базовые таблицы приложения"""
+    for statement in SCHEMA_TABLES:
+        cursor.execute(statement)
+
+
+def add_free_seat_counters(cursor):
+    """Счетчики свободных мест на маршрутах с первичным заполнением по таблице seats"""
+    for column in FREE_SEAT_COLUMNS:
+        if not _column_exists(cursor, 'routes', column):
+            cursor.execute(f"ALTER TABLE routes ADD COLUMN {column} INT NOT NULL DEFAULT 0")
+    cursor.execute(queries.RECONCILE_FREE_SEATS)
+
+
+def add_hot_indexes(cursor):
+    """Составные индексы под фильтры списков маршрутов, мест и бронирований"""
+    _create_indexes(cursor, HOT_INDEXES)
+
+
+def add_departure_index(cursor):
+    """Индекс по времени отправления для фильтра по датам без фильтра по станциям"""
+    _create_indexes(cursor, [('routes', 'idx_routes_departure', ('departure_time',))])
+
+
+def add_booking_status_index(cursor):
+    """Индекс для отбора бронирований по статусу с сортировкой по дате"""
+    _create_indexes(cursor, [('bookings', 'idx_bookings_status_date', ('status', 'booking_date'))])
+
+
+def deduplicate_passengers(cursor):
+    """Один пассажир на номер документа: уникальный ключ для UPSERT_PASSENGER и индекс по ФИО"""
+    if not _index_exists(cursor, 'passengers', 'uq_passengers_document'):
+        # Бронирования дублей переводятся на самую раннюю запись с тем же документом
+        cursor.execute("""
+            UPDATE bookings b
+            JOIN passengers p ON p.id = b.passenger_id
+            JOIN (SELECT document_number, MIN(id) AS keep_id
+                  FROM passengers GROUP BY document_number) k ON k.document_number = p.document_number
+            SET b.passenger_id = k.keep_id
+            WHERE b.passenger_id != k.keep_id
+        """)
+        cursor.execute("""
+            DELETE p FROM passengers p
+            JOIN passengers keep ON keep.document_number = p.document_number AND keep.id < p.id
+        """)
+        cursor.execute("CREATE UNIQUE INDEX uq_passengers_document ON passengers (document_number)")
+
+    _create_indexes(cursor, [('passengers', 'idx_passengers_name', ('full_name',))])
+
+
+# Общие схемы мест для рейсов с битовой картой занятости (Config.SEAT_INVENTORY)
+SEAT_LAYOUT_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS seat_layouts (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        layout_key VARCHAR(50) NOT NULL,
+        num_seats INT NOT NULL,
+        UNIQUE KEY uq_seat_layouts (layout_key, num_seats)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS layout_seats (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        layout_id INT NOT NULL,
+        slot INT NOT NULL,
+        carriage_number INT NOT NULL,
+        seat_number INT NOT NULL,
+        seat_type VARCHAR(20) NOT NULL,
+        UNIQUE KEY uq_layout_seats_slot (layout_id, slot),
+        FOREIGN KEY (layout_id) REFERENCES seat_layouts(id)
+    )
+    """
+]
+
+
+def add_seat_bitmaps(cursor):
+    """Битовые карты мест на рейсах: схемы мест, карта и версия на рейсе, бронирования по схеме"""
+    for statement in SEAT_LAYOUT_TABLES:
+        cursor.execute(statement)
+
+    if not _column_exists(cursor, 'routes', 'seat_layout_id'):
+        # До 8192 мест на рейс; версия растет при каждом изменении карты (сравнение с обменом)
+        cursor.execute("""
+            ALTER TABLE routes
+                ADD COLUMN seat_layout_id INT NULL,
+                ADD COLUMN seat_bitmap VARBINARY(1024) NULL,
+                ADD COLUMN seat_version INT NOT NULL DEFAULT 0,
+                ADD CONSTRAINT fk_routes_seat_layout FOREIGN KEY (seat_layout_id) REFERENCES seat_layouts(id)
+        """)
+
+    if not _column_exists(cursor, 'bookings', 'layout_seat_id'):
+        # Бронирование рейса с картой ссылается на место схемы, а не на строку seats
+        cursor.execute("""
+            ALTER TABLE bookings
+                MODIFY seat_id INT NULL,
+                ADD COLUMN layout_seat_id INT NULL,
+                ADD CONSTRAINT fk_bookings_layout_seat FOREIGN KEY (layout_seat_id) REFERENCES layout_seats(id)
+        """)
+
+
+# Версии применяются строго по возрастанию; опубликованные шаги не меняются
+MIGRATIONS = [
+    (1, 'Базовая схема', create_schema),
+    (2, 'Счетчики свободных мест на маршрутах', add_free_seat_counters),
+    (3, 'Составные индексы для горячих запросов', add_hot_indexes),
+    (4, 'Индекс по времени отправления', add_departure_index),
+    (5, 'Индекс бронирований по статусу', add_booking_status_index),
+    (6, 'Уникальные пассажиры по номеру документа', deduplicate_passengers),
+    (7, 'Битовые карты занятости мест на рейсах', add_seat_bitmaps)
+]
+
+
+def applied_versions(db) -> List[int]:
+    """Версии, уже примененные к базе"""
+    db.cursor.execute(CREATE_MIGRATIONS_TABLE)
+    db.cursor.execute(GET_APPLIED_VERSIONS)
+    return [row['version'] for row in db.cursor.fetchall()]
+
+
+def migrate(db, target: Optional[int] = None) -> bool:
+    """Применение недостающих миграций до версии target (по умолчанию до последней)"""
+    if backend_name() == 'sqlite':
+        # Схема SQLite создается сразу в итоговом виде при первом подключении
+        print("SQLite: схема создается при подключении, миграции не нужны")
+        return True
+
+    try:
+        applied = set(applied_versions(db))
+        for version, description, step in MIGRATIONS:
+            if version in applied or (target is not None and version > target):
+                continue
+
+            step(db.cursor)
+            db.cursor.execute(RECORD_MIGRATION, (version, description))
+            db.connection.commit()
+            print(f"Применена миграция {version}: {description}")
+
+        return True
+
+    except Error as e:
+        db.connection.rollback()
+        print(f"Ошибка применения миграций: {e}")
+        return False
+
+
+# ========== ПРОВЕРКА ПЛАНОВ ЗАПРОСОВ ==========
+
+# Горячие запросы Database с тестовыми параметрами. Для таблиц из allow_scan
+# полный просмотр допустим (маленькие справочники)
+QUERY_PLAN_CHECKS = {
+    'get_available_seats': (queries.GET_AVAILABLE_SEATS, (1,), ()),
+    'get_all_available_routes': (
+        *queries.build_available_routes_query({'departure_station': 'Москва', 'arrival_station': 'Иркутск',
+                                               'date_filter': 'this_week'}),
+        ('t',)
+    ),
+    'get_all_available_routes_by_date': (
+        *queries.build_available_routes_query({'date_filter': 'tomorrow'}),
+        ('t',)
+    ),
+    'get_user_bookings': (
+        *queries.build_bookings_page_query(queries.USER_BOOKINGS_SELECT, ["b.user_id = %s"], [1],
+                                           (datetime(2025, 1, 1), 1000)),
+        ()
+    ),
+    'get_all_bookings': (
+        *queries.build_bookings_page_query(queries.BOOKING_DETAILS_SELECT, [], [], (datetime(2025, 1, 1), 1000)),
+        ()
+    ),
+    'get_all_bookings_by_status': (
+        *queries.build_bookings_page_query(queries.BOOKING_DETAILS_SELECT,
+                                           *queries.build_bookings_filter({'status': 'оплачен'})),
+        ()
+    ),
+    'get_booking_details': (queries.GET_BOOKING_DETAILS, (1,), ()),
+    'get_booking_seat': (queries.GET_BOOKING_SEAT, (1,), ()),
+    'claim_seat': (queries.CLAIM_SEAT, (1, 1), ()),
+    'claim_seats': (queries.CLAIM_SEATS.format('%s, %s'), (1, 1, 2), ()),
+    'get_route_inventory': (queries.GET_ROUTE_INVENTORY, (1,), ()),
+    'get_layout_seats': (queries.GET_LAYOUT_SEATS, (1,), ()),
+    'get_layout_seats_with_price': (queries.GET_LAYOUT_SEATS_WITH_PRICE.format('%s, %s'), (1, 1, 2), ()),
+    'find_passenger_by_document': (queries.FIND_PASSENGER_BY_DOCUMENT, ('4510123456',), ()),
+    'search_passengers': (queries.SEARCH_PASSENGERS_BY_NAME, (queries.like_prefix('Иванов'), 10), ())
+}
+
+
+def check_query_plans(db) -> Dict[str, List[str]]:
+    """EXPLAIN горячих запросов; возвращает таблицы с полным просмотром по каждому запросу"""
+    problems = {}
+    for name, (query, params, allow_scan) in QUERY_PLAN_CHECKS.items():
+        if backend_name() == 'sqlite':
+            # SQLite: "SCAN t" - полный просмотр, "SEARCH t USING INDEX" / "SCAN t USING INDEX" - по индексу
+            db.cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+            details = [row['detail'].split() for row in db.cursor.fetchall()]
+            scans = [words[1] for words in details
+                     if words[0] == 'SCAN' and 'USING' not in words and words[1] not in allow_scan]
+        else:
+            db.cursor.execute("EXPLAIN " + query, params)
+            scans = [row['table'] for row in db.cursor.fetchall()
+                     if row['type'] == 'ALL' and row['table'] not in allow_scan]
+        if scans:
+            problems[name] = scans
+
+    return problems
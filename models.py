@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass
@@ -68,4 +68,17 @@ class Booking:
     route_id: int = 0
     status: str = "booked"  # забронирован, оплачен, отменен, подтвержден
     booking_date: Optional[datetime] = None
-    price: float = 0.0
\ No newline at end of file
+    price: float = 0.0
+
+
+@dataclass
+class BookingResult:
+    """Результат создания бронирования"""
+    booking_id: Optional[int] = None  # для группы - первое бронирование
+    seat_taken: bool = False  # место заняли раньше (другая касса)
+    booking_ids: List[int] = field(default_factory=list)
+    taken_seat_ids: List[int] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return self.booking_id is not None
@@ -0,0 +1,650 @@
+# SQL-запросы, общие для Database и AsyncDatabase
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+# ========== ПОЛЬЗОВАТЕЛИ ==========
+
+AUTHENTICATE_USER = """
+SELECT id, username, full_name, role
+FROM users
+WHERE username = %s AND password_hash = SHA2(%s, 256)
+"""
+
+REGISTER_USER = """
+INSERT INTO users (username, password_hash, full_name, role)
+VALUES (%s, SHA2(%s, 256), %s, 'user')
+"""
+
+CHECK_USERNAME_EXISTS = "SELECT 1 FROM users WHERE username = %s"
+
+GET_ALL_USERS = """
+SELECT id, username, full_name, role, created_at
+FROM users
+WHERE role != 'admin'  # Не показываем админов
+ORDER BY created_at DESC
+"""
+
+UPDATE_USER_ROLE = "UPDATE users SET role = %s WHERE id = %s"
+
+# ========== ПОЕЗДА И МАРШРУТЫ ==========
+
+GET_ALL_TRAINS = """
+SELECT id, train_number, train_name, train_type
+FROM trains
+ORDER BY train_number
+"""
+
+ADD_TRAIN = """
+INSERT INTO trains (train_number, train_name, train_type)
+VALUES (%s, %s, %s)
+"""
+
+GET_TRAIN_TYPE = "SELECT train_type FROM trains WHERE id = %s"
+
+GET_TRAIN_TYPES = "SELECT DISTINCT train_type FROM trains ORDER BY train_type"
+
+ADD_ROUTE = """
+INSERT INTO routes (train_id, departure_station, arrival_station,
+                   departure_time, arrival_time, base_price,
+                   free_seats, free_lux, free_coupe, free_standard)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+ADD_SEAT = """
+INSERT INTO seats (carriage_number, seat_number, seat_type, status, route_id)
+VALUES (%s, %s, %s, 'свободно', %s)
+"""
+
+# ========== БИТОВЫЕ КАРТЫ МЕСТ ==========
+# Рейс с картой (Config.SEAT_INVENTORY) не имеет строк в seats: занятость хранится
+# в routes.seat_bitmap (бит на место), места описывает общая схема layout_seats.
+# id мест такого рейса - id строк layout_seats, бронирования ссылаются на них
+
+ADD_BITMAP_ROUTE = """
+INSERT INTO routes (train_id, departure_station, arrival_station,
+                   departure_time, arrival_time, base_price,
+                   free_seats, free_lux, free_coupe, free_standard,
+                   seat_layout_id, seat_bitmap)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+FIND_SEAT_LAYOUT = "SELECT id FROM seat_layouts WHERE layout_key = %s AND num_seats = %s"
+
+ADD_SEAT_LAYOUT = "INSERT INTO seat_layouts (layout_key, num_seats) VALUES (%s, %s)"
+
+ADD_LAYOUT_SEAT = """
+INSERT INTO layout_seats (layout_id, slot, carriage_number, seat_number, seat_type)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+GET_LAYOUT_SEATS = """
+SELECT id as seat_id, carriage_number, seat_number, seat_type
+FROM layout_seats
+WHERE layout_id = %s
+ORDER BY slot
+"""
+
+GET_ROUTE_INVENTORY = "SELECT seat_layout_id, seat_bitmap, seat_version FROM routes WHERE id = %s"
+
+# Места карты рейса с позициями и цена; для рейса со строками в seats строк нет
+GET_LAYOUT_SEATS_WITH_PRICE = """
+SELECT ls.id, ls.slot, ls.seat_type, r.base_price
+FROM routes r
+JOIN layout_seats ls ON ls.layout_id = r.seat_layout_id
+WHERE r.id = %s AND ls.id IN ({})
+"""
+
+# Сравнение с обменом: карта и счетчики меняются, только если версия не изменилась с чтения
+SWAP_SEAT_BITMAP = """
+UPDATE routes
+SET seat_bitmap = %s,
+    seat_version = seat_version + 1,
+    free_seats = free_seats + %s,
+    free_lux = free_lux + %s,
+    free_coupe = free_coupe + %s,
+    free_standard = free_standard + %s
+WHERE id = %s AND seat_version = %s
+"""
+
+ADD_LAYOUT_BOOKING = """
+INSERT INTO bookings (passenger_id, layout_seat_id, route_id, status, final_price, user_id, confirmed_by_admin)
+VALUES (%s, %s, %s, 'забронирован', %s, %s, FALSE)
+"""
+
+GET_NEW_LAYOUT_BOOKING_IDS = """
+SELECT layout_seat_id AS seat_id, MAX(id) AS id FROM bookings
+WHERE route_id = %s AND layout_seat_id IN ({})
+GROUP BY layout_seat_id
+"""
+
+# Повторная отмена не должна освободить место, уже проданное заново
+CANCEL_ACTIVE_BOOKING = "UPDATE bookings SET status = 'отменено' WHERE id = %s AND status != 'отменено'"
+
+# Перевод рейса со строк seats на битовую карту (maintenance.py convert-seats)
+GET_ROW_ROUTES = "SELECT id FROM routes WHERE seat_layout_id IS NULL AND id > %s ORDER BY id LIMIT %s"
+
+GET_ROUTE_TRAIN_TYPE = "SELECT t.train_type FROM routes r JOIN trains t ON t.id = r.train_id WHERE r.id = %s"
+
+# Пустое обновление блокирует места рейса в том же порядке, что и бронирование (сначала места)
+LOCK_ROUTE_SEATS = "UPDATE seats SET status = status WHERE route_id = %s"
+
+GET_ROUTE_SEAT_BOOKINGS = "SELECT id, seat_id FROM bookings WHERE route_id = %s AND seat_id IS NOT NULL"
+
+MOVE_BOOKING_TO_LAYOUT = "UPDATE bookings SET layout_seat_id = %s, seat_id = NULL WHERE id = %s"
+
+SET_ROUTE_BITMAP = """
+UPDATE routes
+SET seat_layout_id = %s,
+    seat_bitmap = %s,
+    seat_version = seat_version + 1,
+    free_seats = %s,
+    free_lux = %s,
+    free_coupe = %s,
+    free_standard = %s
+WHERE id = %s
+"""
+
+DELETE_ROUTE_SEATS = "DELETE FROM seats WHERE route_id = %s"
+
+# Счетчики свободных мест на маршруте (общий и по классам) меняются
+# в тех же транзакциях, что и статусы мест
+ADJUST_FREE_SEATS = """
+UPDATE routes
+SET free_seats = free_seats + %s,
+    free_lux = free_lux + %s,
+    free_coupe = free_coupe + %s,
+    free_standard = free_standard + %s
+WHERE id = %s
+"""
+
+# Колонки счетчиков по классам мест
+SEAT_CLASS_COUNTERS = {
+    'Люкс': 'free_lux',
+    'Купе': 'free_coupe',
+    'Стандарт': 'free_standard'
+}
+
+RECONCILE_FREE_SEATS = """
+UPDATE routes
+SET free_seats = (SELECT COUNT(*) FROM seats s
+                  WHERE s.route_id = routes.id AND s.status = 'свободно'),
+    free_lux = (SELECT COUNT(*) FROM seats s
+                WHERE s.route_id = routes.id AND s.status = 'свободно' AND s.seat_type = 'Люкс'),
+    free_coupe = (SELECT COUNT(*) FROM seats s
+                  WHERE s.route_id = routes.id AND s.status = 'свободно' AND s.seat_type = 'Купе'),
+    free_standard = (SELECT COUNT(*) FROM seats s
+                     WHERE s.route_id = routes.id AND s.status = 'свободно'
+                         AND s.seat_type NOT IN ('Люкс', 'Купе'))
+"""
+
+# Пересчет только для рейсов со строками мест: счетчики рейсов с битовой картой
+# меняются тем же запросом, что и карта (RECONCILE_FREE_SEATS остается для миграции 2)
+RECONCILE_ROW_FREE_SEATS = RECONCILE_FREE_SEATS + """
+WHERE seat_layout_id IS NULL
+"""
+
+ROUTES_SELECT = """
+SELECT
+    t.id as train_id,
+    t.train_number,
+    t.train_name,
+    t.train_type,
+    r.id as route_id,
+    r.departure_station,
+    r.arrival_station,
+    r.departure_time,
+    r.arrival_time,
+    r.base_price,
+    r.free_seats as available_seats,
+    r.free_lux,
+    r.free_coupe,
+    r.free_standard
+FROM routes r
+JOIN trains t ON t.id = r.train_id
+WHERE r.free_seats > 0
+"""
+
+ROUTES_ORDER = """
+ORDER BY r.departure_time
+"""
+
+# Фильтр по времени отправления - полуинтервал [начало, конец), границы
+# считаются на клиенте, чтобы не оборачивать колонку в функцию и не терять индекс
+DEPARTURE_RANGE = " AND r.departure_time >= %s AND r.departure_time < %s"
+
+# Именованные периоды фильтра по дате (см. period_bounds)
+DATE_PERIODS = ('today', 'tomorrow', 'this_week', 'next_week')
+
+SEARCH_TRAINS = ROUTES_SELECT + """
+    AND r.departure_station LIKE %s
+    AND r.arrival_station LIKE %s
+""" + DEPARTURE_RANGE + ROUTES_ORDER
+
+# Поля рейса для сброса выдач поиска, в которые он может попасть (route_cache)
+GET_ROUTE_SEARCH_FIELDS = """
+SELECT id as route_id, departure_station, arrival_station, departure_time
+FROM routes
+WHERE id = %s
+"""
+
+GET_DEPARTURE_STATIONS = """
+SELECT DISTINCT departure_station
+FROM routes
+ORDER BY departure_station
+"""
+
+GET_ARRIVAL_STATIONS = """
+SELECT DISTINCT arrival_station
+FROM routes
+ORDER BY arrival_station
+"""
+
+GET_ROUTES_OVERVIEW = """
+SELECT
+    r.id,
+    t.train_name,
+    t.train_number,
+    r.departure_station,
+    r.arrival_station,
+    r.departure_time,
+    r.arrival_time,
+    r.base_price,
+    r.free_seats
+FROM routes r
+JOIN trains t ON r.train_id = t.id
+ORDER BY r.departure_time DESC
+LIMIT %s
+"""
+
+GET_AVAILABLE_SEATS = """
+SELECT
+    s.id as seat_id,
+    s.seat_number,
+    s.seat_type,
+    s.carriage_number,
+    s.status
+FROM seats s
+WHERE s.route_id = %s AND s.status = 'свободно'
+ORDER BY s.carriage_number, s.seat_number
+"""
+
+# Все места рейса с занятостью - для схемы мест (SeatMap)
+GET_ROUTE_SEATS = """
+SELECT
+    s.id as seat_id,
+    s.seat_number,
+    s.seat_type,
+    s.carriage_number,
+    s.status
+FROM seats s
+WHERE s.route_id = %s
+"""
+
+# ========== БРОНИРОВАНИЯ ==========
+
+# Пассажир с тем же документом не дублируется: обновляются ФИО и телефон (пустой
+# телефон не затирает известный), а LAST_INSERT_ID(id) возвращает id существующей строки
+UPSERT_PASSENGER = """
+INSERT INTO passengers (full_name, document_number, phone)
+VALUES (%s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    id = LAST_INSERT_ID(id),
+    full_name = VALUES(full_name),
+    phone = COALESCE(NULLIF(VALUES(phone), ''), phone)
+"""
+
+# id пассажиров группы после многострочного UPSERT_PASSENGER
+GET_PASSENGER_IDS = "SELECT id, document_number FROM passengers WHERE document_number IN ({})"
+
+FIND_PASSENGER_BY_DOCUMENT = """
+SELECT id, full_name, document_number, phone
+FROM passengers
+WHERE document_number = %s
+"""
+
+# Поиск по началу ФИО: LIKE 'префикс%' идет по индексу idx_passengers_name
+SEARCH_PASSENGERS_BY_NAME = """
+SELECT id, full_name, document_number, phone
+FROM passengers
+WHERE full_name LIKE %s
+ORDER BY full_name, id
+LIMIT %s
+"""
+
+GET_PRICE_AND_SEAT_TYPE = """
+SELECT r.base_price, s.seat_type
+FROM routes r
+JOIN seats s ON s.id = %s
+WHERE r.id = %s
+"""
+
+# Групповое бронирование: списки мест подставляются через in_placeholders.
+# UPDATE блокирует строки по возрастанию id, поэтому встречные группы не взаимоблокируются
+CLAIM_SEATS = """
+UPDATE seats SET status = 'забронировано'
+WHERE route_id = %s AND status = 'свободно' AND id IN ({})
+"""
+
+GET_SEATS_WITH_PRICE = """
+SELECT s.id, s.seat_type, r.base_price
+FROM seats s
+JOIN routes r ON r.id = s.route_id
+WHERE s.route_id = %s AND s.id IN ({})
+"""
+
+GET_TAKEN_SEATS = "SELECT id FROM seats WHERE id IN ({}) AND status != 'свободно'"
+
+ADD_BOOKING = """
+INSERT INTO bookings (passenger_id, seat_id, route_id, status, final_price, user_id, confirmed_by_admin)
+VALUES (%s, %s, %s, 'забронирован', %s, %s, FALSE)
+"""
+
+# id бронирований многострочной вставки: MySQL не обещает, что они идут подряд
+# (auto_increment_increment > 1, чередующийся режим блокировок), поэтому они читаются
+# в той же транзакции - у захваченного места новое бронирование самое позднее
+GET_NEW_BOOKING_IDS = """
+SELECT seat_id, MAX(id) AS id FROM bookings
+WHERE route_id = %s AND seat_id IN ({})
+GROUP BY seat_id
+"""
+
+# Захват места условным обновлением: 0 измененных строк - место уже занято
+CLAIM_SEAT = """
+UPDATE seats SET status = 'забронировано'
+WHERE id = %s AND route_id = %s AND status = 'свободно'
+"""
+
+USER_BOOKINGS_SELECT = """
+SELECT
+    b.id as booking_id,
+    b.status,
+    b.booking_date,
+    b.final_price,
+    p.full_name,
+    t.train_name,
+    r.departure_station,
+    r.arrival_station,
+    COALESCE(s.seat_number, ls.seat_number) as seat_number,
+    COALESCE(s.carriage_number, ls.carriage_number) as carriage_number,
+    b.confirmed_by_admin
+FROM bookings b
+JOIN passengers p ON b.passenger_id = p.id
+JOIN routes r ON b.route_id = r.id
+JOIN trains t ON r.train_id = t.id
+LEFT JOIN seats s ON b.seat_id = s.id
+LEFT JOIN layout_seats ls ON b.layout_seat_id = ls.id
+"""
+
+BOOKING_DETAILS_SELECT = """
+SELECT
+    b.id as booking_id,
+    b.status,
+    b.booking_date,
+    b.final_price,
+    b.confirmed_by_admin,
+    p.full_name,
+    p.document_number,
+    p.phone,
+    t.train_name,
+    t.train_number,
+    r.departure_station,
+    r.arrival_station,
+    r.departure_time,
+    r.arrival_time,
+    COALESCE(s.seat_number, ls.seat_number) as seat_number,
+    COALESCE(s.carriage_number, ls.carriage_number) as carriage_number,
+    COALESCE(s.seat_type, ls.seat_type) as seat_type,
+    u.username as created_by_user,
+    u.full_name as user_full_name
+FROM bookings b
+JOIN passengers p ON b.passenger_id = p.id
+JOIN routes r ON b.route_id = r.id
+JOIN trains t ON r.train_id = t.id
+LEFT JOIN seats s ON b.seat_id = s.id
+LEFT JOIN layout_seats ls ON b.layout_seat_id = ls.id
+JOIN users u ON b.user_id = u.id
+"""
+
+# Постраничная выборка бронирований по ключу (booking_date, id): стоимость
+# страницы не зависит от ее номера, в отличие от OFFSET
+BOOKINGS_PAGE_ORDER = """
+ORDER BY b.booking_date DESC, b.id DESC
+LIMIT %s
+"""
+
+# Строки строго после последней строки предыдущей страницы
+BOOKINGS_AFTER = "(b.booking_date < %s OR (b.booking_date = %s AND b.id < %s))"
+
+# Счетчики бронирований для подписей фильтров (кроме общего total): ключ -> условие
+BOOKING_COUNTS = {
+    'booked': "b.status = 'забронирован'",
+    'paid': "b.status = 'оплачен'",
+    'awaiting': "b.status = 'оплачен' AND b.confirmed_by_admin = FALSE",
+    'confirmed': "b.confirmed_by_admin = TRUE",
+    'cancelled': "b.status = 'отменено'"
+}
+
+# Сумма оплаченных и подтвержденных бронирований
+PAID_AMOUNT = ("SUM(CASE WHEN b.status IN ('оплачен', 'подтвержден') OR b.confirmed_by_admin = TRUE "
+               "THEN b.final_price ELSE 0 END) AS paid_amount")
+
+GET_BOOKING_DETAILS = BOOKING_DETAILS_SELECT + """
+WHERE b.id = %s
+"""
+
+GET_BOOKING_SEAT = """
+SELECT b.seat_id, b.layout_seat_id, b.route_id, b.status, ls.slot,
+       COALESCE(s.seat_type, ls.seat_type) as seat_type
+FROM bookings b
+LEFT JOIN seats s ON s.id = b.seat_id
+LEFT JOIN layout_seats ls ON ls.id = b.layout_seat_id
+WHERE b.id = %s
+"""
+
+RELEASE_SEAT = "UPDATE seats SET status = 'свободно' WHERE id = %s AND status != 'свободно'"
+
+CONFIRM_BOOKING = """
+UPDATE bookings
+SET status = 'подтвержден', confirmed_by_admin = TRUE
+WHERE id = %s AND status != 'отменено'  # Не подтверждаем отмененные
+"""
+
+# Отмененное бронирование не возвращается в действие: его место уже учтено свободным
+UPDATE_BOOKING_STATUS = "UPDATE bookings SET status = %s WHERE id = %s AND status != 'отменено'"
+
+
+def _to_date(value: Union[date, str]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def day_bounds(day: Union[date, str]) -> Tuple[datetime, datetime]:
+    """Границы одних суток [00:00, 00:00 следующего дня)"""
+    start = datetime.combine(_to_date(day), datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def period_bounds(period: str, today: Optional[date] = None) -> Optional[Tuple[datetime, datetime]]:
+    """Границы именованного периода ('today', 'tomorrow', 'this_week', 'next_week')"""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday())
+
+    if period == 'today':
+        start, days = today, 1
+    elif period == 'tomorrow':
+        start, days = today + timedelta(days=1), 1
+    elif period == 'this_week':
+        start, days = monday, 7
+    elif period == 'next_week':
+        start, days = monday + timedelta(days=7), 7
+    else:
+        return None
+
+    start = datetime.combine(start, datetime.min.time())
+    return start, start + timedelta(days=days)
+
+
+def departure_bounds(filters: Dict, today: Optional[date] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Границы времени отправления из фильтров: период date_filter и/или даты date_from..date_to включительно.
+
+    Отсутствующая граница возвращается как None; несколько условий дают пересечение интервалов.
+    """
+    starts, ends = [], []
+    if filters.get('date_filter') in DATE_PERIODS:
+        start, end = period_bounds(filters['date_filter'], today)
+        starts.append(start)
+        ends.append(end)
+
+    if filters.get('date_from'):
+        starts.append(day_bounds(filters['date_from'])[0])
+
+    if filters.get('date_to'):
+        ends.append(day_bounds(filters['date_to'])[1])
+
+    return (max(starts) if starts else None), (min(ends) if ends else None)
+
+
+def build_available_routes_query(filters: Optional[Dict] = None,
+                                 today: Optional[date] = None) -> Tuple[str, List]:
+    """Построение запроса доступных рейсов с фильтрами"""
+    query = ROUTES_SELECT
+    params = []
+
+    # Применяем фильтры если они есть
+    if filters:
+        if filters.get('departure_station'):
+            query += " AND r.departure_station = %s"
+            params.append(filters['departure_station'])
+
+        if filters.get('arrival_station'):
+            query += " AND r.arrival_station = %s"
+            params.append(filters['arrival_station'])
+
+        start, end = departure_bounds(filters, today)
+        if start is not None:
+            query += " AND r.departure_time >= %s"
+            params.append(start)
+
+        if end is not None:
+            query += " AND r.departure_time < %s"
+            params.append(end)
+
+    return query + ROUTES_ORDER, params
+
+
+def build_bookings_page_query(select: str, conditions: List[str], params: List,
+                              after: Optional[Tuple] = None, page_size: int = 100) -> Tuple[str, List]:
+    """Построение запроса страницы бронирований после ключа after = (booking_date, booking_id)"""
+    conditions = list(conditions)
+    params = list(params)
+
+    if after:
+        booking_date, booking_id = after
+        conditions.append(BOOKINGS_AFTER)
+        params.extend([booking_date, booking_date, booking_id])
+
+    query = select
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions)
+
+    return query + BOOKINGS_PAGE_ORDER, params + [page_size]
+
+
+def build_bookings_filter(filters: Optional[Dict] = None,
+                          include_status: bool = True) -> Tuple[List[str], List]:
+    """Условия отбора бронирований: status, confirmed, date_from..date_to, route_id, user_id.
+
+    Без include_status условия по статусу и подтверждению не добавляются (для счетчиков).
+    """
+    conditions = []
+    params = []
+    if not filters:
+        return conditions, params
+
+    if include_status:
+        if filters.get('status'):
+            conditions.append("b.status = %s")
+            params.append(filters['status'])
+
+        if filters.get('confirmed') is not None:
+            conditions.append("b.confirmed_by_admin = %s")
+            params.append(bool(filters['confirmed']))
+
+    if filters.get('date_from'):
+        conditions.append("b.booking_date >= %s")
+        params.append(day_bounds(filters['date_from'])[0])
+
+    if filters.get('date_to'):
+        conditions.append("b.booking_date < %s")
+        params.append(day_bounds(filters['date_to'])[1])
+
+    for column in ('route_id', 'user_id'):
+        if filters.get(column):
+            conditions.append(f"b.{column} = %s")
+            params.append(filters[column])
+
+    return conditions, params
+
+
+def build_bookings_with_counts_query(select: str, filters: Optional[Dict] = None,
+                                     page_size: int = 100) -> Tuple[str, List]:
+    """Первая страница бронирований и счетчики по статусам одним запросом.
+
+    Счетчики считаются без учета фильтра по статусу и приходят в каждой строке;
+    если страница пуста, возвращается одна строка с пустыми полями бронирования.
+    """
+    counts = ",\n    ".join(["COUNT(*) AS total_count"] + [f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS {key}_count"
+                                for key, condition in BOOKING_COUNTS.items()])
+    count_conditions, count_params = build_bookings_filter(filters, include_status=False)
+    counts_query = f"SELECT\n    {counts},\n    {PAID_AMOUNT}\nFROM bookings b\n"
+    if count_conditions:
+        counts_query += "WHERE " + " AND ".join(count_conditions) + "\n"
+
+    conditions, params = build_bookings_filter(filters)
+    page_query, page_params = build_bookings_page_query(select, conditions, params, None, page_size)
+
+    query = (f"SELECT c.*, page.*\nFROM ({counts_query}) c\nLEFT JOIN ({page_query}) page ON 1 = 1\n"
+             f"ORDER BY page.booking_date DESC, page.booking_id DESC")
+    return query, count_params + page_params
+
+
+def split_bookings_with_counts(rows: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """Разделение результата build_bookings_with_counts_query на страницу и счетчики"""
+    keys = ['total'] + list(BOOKING_COUNTS)
+    count_columns = [f"{key}_count" for key in keys] + ['paid_amount']
+    counts = {key: int(rows[0][f"{key}_count"] or 0) if rows else 0 for key in keys}
+    counts['paid_amount'] = (rows[0]['paid_amount'] or 0) if rows else 0
+
+    page = [{column: value for column, value in row.items() if column not in count_columns}
+            for row in rows if row['booking_id'] is not None]
+    return page, counts
+
+
+def page_cursor(rows: List[Dict]) -> Optional[Tuple]:
+    """Ключ для запроса следующей страницы - (booking_date, booking_id) последней строки"""
+    if not rows:
+        return None
+    return rows[-1]['booking_date'], rows[-1]['booking_id']
+
+
+def in_placeholders(values: List) -> str:
+    """Плейсхолдеры для условия IN по списку значений"""
+    return ', '.join(['%s'] * len(values))
+
+
+def like_prefix(prefix: str) -> str:
+    """Шаблон LIKE для поиска по началу строки (с экранированием % и _)"""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def free_seat_deltas(seat_types: List[str], sign: int = 1) -> Tuple[int, int, int, int]:
+    """Изменения счетчиков (всего, люкс, купе, стандарт) для набора мест"""
+    deltas = {column: 0 for column in SEAT_CLASS_COUNTERS.values()}
+    for seat_type in seat_types:
+        deltas[SEAT_CLASS_COUNTERS.get(seat_type, 'free_standard')] += sign
+
+    return (sign * len(seat_types), deltas['free_lux'], deltas['free_coupe'], deltas['free_standard'])
+
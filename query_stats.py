@@ -0,0 +1,348 @@
+import atexit
+import functools
+import json
+import logging
+import math
+import os
+import platform
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+from config import Config
+
+
+class QueryCall:
+    """Замер одного вызова метода Database (или отдельного запроса вне методов)"""
+
+    __slots__ = ('name', 'started', 'wall_ms', 'rows', 'bytes', 'retries', 'pool_wait_ms', 'error', 'statements')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.wall_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.retries = 0
+        self.pool_wait_ms = 0.0
+        self.error = None
+        # (SQL, форма параметров, время в мс) по каждому запросу вызова
+        self.statements: List[tuple] = []
+
+
+def params_shape(params) -> str:
+    """Форма параметров запроса без значений: типы и длины строк/списков"""
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {params_shape([value])[1:-1]}' for key, value in params.items()) + '}'
+
+    parts = []
+    for value in params:
+        if isinstance(value, (str, bytes, list, tuple)):
+            parts.append(f'{type(value).__name__}[{len(value)}]')
+        else:
+            parts.append(type(value).__name__)
+    return '(' + ', '.join(parts) + ')'
+
+
+def _value_size(value) -> int:
+    """Примерный объем значения в ответе сервера"""
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (datetime, date, Decimal)):
+        return 8
+    return 4 if isinstance(value, int) else len(str(value))
+
+
+def _rows_size(rows) -> int:
+    size = 0
+    for row in rows:
+        values = row.values() if isinstance(row, dict) else row
+        size += sum(_value_size(value) for value in values)
+    return size
+
+
+class InstrumentedCursor:
+    """Обертка курсора: время, строки и объем ответа каждого запроса.
+
+    Запросы записываются в текущий замер метода (calls - стек вызовов Database);
+    запрос вне методов (встроенный SQL окон) замеряется отдельно, без учета строк.
+    """
+
+    def __init__(self, cursor, calls: List[QueryCall]):
+        self._cursor = cursor
+        self._calls = calls
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _run(self, method, query, params, shape):
+        standalone = not self._calls
+        call = QueryCall('sql:' + query.split(None, 1)[0].lower()) if standalone else self._calls[-1]
+        started = time.perf_counter()
+        try:
+            return method(query, params)
+        except Exception as e:
+            # Код ошибки сервера (1213 - взаимоблокировка, 1205 - ожидание блокировки) важнее класса
+            errno = getattr(e, 'errno', None)
+            call.error = f'{type(e).__name__}({errno})' if errno else type(e).__name__
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            call.statements.append((query, shape, elapsed))
+            if standalone:
+                call.wall_ms = elapsed
+                get_query_stats().record(call)
+
+    def _count(self, rows):
+        if self._calls:
+            self._calls[-1].rows += len(rows)
+            self._calls[-1].bytes += _rows_size(rows)
+
+    def execute(self, query, params=None):
+        return self._run(self._cursor.execute, query, params, params_shape(params))
+
+    def executemany(self, query, seq_params):
+        seq_params = list(seq_params)
+        shape = f'{len(seq_params)} x {params_shape(seq_params[0])}' if seq_params else '[]'
+        return self._run(self._cursor.executemany, query, seq_params, shape)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count([row])
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(rows)
+        return rows
+
+
+def wrap_cursor(cursor, calls: List[QueryCall]):
+    """Курсор с замерами (или исходный, если замеры выключены)"""
+    return InstrumentedCursor(cursor, calls) if get_query_stats().enabled else cursor
+
+
+def note_checkout(calls: List[QueryCall], wait: float, retries: int):
+    """Ожидание свободного соединения и переподключения - в текущий замер"""
+    if calls:
+        calls[-1].pool_wait_ms += wait * 1000
+        calls[-1].retries += retries
+
+
+def instrumented(method):
+    """Замер вызова метода Database: время, строки, объем, ожидание пула, повторы"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        stats = get_query_stats()
+        if not stats.enabled:
+            return method(self, *args, **kwargs)
+
+        call = QueryCall(method.__name__)
+        self._calls.append(call)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            call.wall_ms = (time.perf_counter() - started) * 1000
+            self._calls.pop()
+            stats.record(call)
+
+    return wrapper
+
+
+def instrument_methods(cls):
+    """Декоратор класса: замер всех публичных методов (и connect)"""
+    for name, value in list(vars(cls).items()):
+        if callable(value) and not name.startswith('_') and name != 'disconnect':
+            setattr(cls, name, instrumented(value))
+    return cls
+
+
+class QueryHistogram:
+    """Гистограмма времени вызовов с логарифмическими корзинами (шаг 10%)"""
+
+    BASE_MS = 0.01
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+        self.retries = 0
+        self.pool_wait_ms = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, call: QueryCall):
+        self.count += 1
+        self.total_ms += call.wall_ms
+        self.max_ms = max(self.max_ms, call.wall_ms)
+        self.errors += call.error is not None
+        self.rows += call.rows
+        self.bytes += call.bytes
+        self.retries += call.retries
+        self.pool_wait_ms += call.pool_wait_ms
+
+        bucket = max(0, int(math.log(max(call.wall_ms, self.BASE_MS) / self.BASE_MS, self.GROWTH)))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, share: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль"""
+        rank = max(1, math.ceil(self.count * share))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(min(self.BASE_MS * self.GROWTH ** (bucket + 1), self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'errors': self.errors,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'pool_wait_ms': round(self.pool_wait_ms, 3)
+        }
+
+
+class HistogramSink:
+    """Приемник замеров: гистограмма по каждому методу"""
+
+    def __init__(self):
+        self._histograms: Dict[str, QueryHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: QueryCall):
+        with self._lock:
+            histogram = self._histograms.get(call.name)
+            if histogram is None:
+                histogram = self._histograms[call.name] = QueryHistogram()
+            histogram.add(call)
+
+    def summary(self) -> Dict[str, Dict]:
+        """p50/p95/p99 и счетчики по методам, самые медленные по p95 - первыми"""
+        with self._lock:
+            items = [(name, histogram.summary()) for name, histogram in self._histograms.items()]
+        return dict(sorted(items, key=lambda item: item[1]['p95_ms'], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class SlowQueryLog:
+    """Приемник замеров: журнал вызовов дольше порога с ротацией файла"""
+
+    def __init__(self, path: str, threshold_ms: float, desk: str,
+                 max_bytes: int = 1024 * 1024, backups: int = 5):
+        self.threshold_ms = threshold_ms
+        self.desk = desk
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._logger = logging.getLogger(f'{__name__}.slow.{path}')
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._logger.addHandler(handler)
+
+    def record(self, call: QueryCall):
+        if call.wall_ms < self.threshold_ms:
+            return
+
+        self._logger.info(json.dumps({
+            'time': datetime.fromtimestamp(call.started).isoformat(timespec='milliseconds'),
+            'desk': self.desk,
+            'method': call.name,
+            'wall_ms': round(call.wall_ms, 3),
+            'rows': call.rows,
+            'bytes': call.bytes,
+            'retries': call.retries,
+            'pool_wait_ms': round(call.pool_wait_ms, 3),
+            'error': call.error,
+            'statements': [{'sql': ' '.join(sql.split()), 'params': shape, 'ms': round(ms, 3)}
+                           for sql, shape, ms in call.statements]
+        }, ensure_ascii=False))
+
+
+class QueryStats:
+    """Замеры запросов процесса: рассылка по подключаемым приемникам"""
+
+    def __init__(self, enabled: bool = True, desk: str = ''):
+        self.enabled = enabled
+        self.desk = desk or platform.node()
+        self.histograms = HistogramSink()
+        self._sinks = [self.histograms]
+
+    def add_sink(self, sink):
+        """Подключение приемника: любой объект с методом record(call)"""
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+
+    def record(self, call: QueryCall):
+        for sink in list(self._sinks):
+            try:
+                sink.record(call)
+            except Exception as e:
+                print(f"Ошибка записи замера запроса: {e}")
+
+    def summary(self) -> Dict:
+        """Сводка по методам для рабочего места"""
+        return {'desk': self.desk, 'methods': self.histograms.summary()}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Сводка p50/p95/p99 в JSON (и в файл, если указан путь)"""
+        text = json.dumps(self.summary(), ensure_ascii=False, indent=2)
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(text)
+            except OSError as e:
+                print(f"Ошибка сохранения сводки запросов: {e}")
+        return text
+
+
+_stats: Optional[QueryStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_query_stats() -> QueryStats:
+    """Получение общих замеров запросов (создаются по Config.QUERY_STATS при первом обращении)"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            settings = Config.QUERY_STATS
+            _stats = QueryStats(settings['enabled'], settings['desk'])
+            if settings['enabled'] and settings['slow_log_path']:
+                try:
+                    _stats.add_sink(SlowQueryLog(settings['slow_log_path'], settings['slow_threshold_ms'],
+                                                 _stats.desk, settings['slow_log_max_bytes'],
+                                                 settings['slow_log_backups']))
+                except OSError as e:
+                    print(f"Ошибка открытия журнала медленных запросов: {e}")
+            if settings['enabled'] and settings['dump_path']:
+                atexit.register(_stats.dump, settings['dump_path'])
+        return _stats
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from config import Config
+from db_backend import source_name
+
+
+class ReferenceCache:
+    """Кэш справочных данных (станции, поезда, типы поездов) с временем жизни записей.
+
+    Записи можно сохранять на диск: при следующем запуске они доступны через peek()
+    сразу, еще до ответа базы, а get() считает их устаревшими по тому же TTL.
+    """
+
+    def __init__(self, ttl: float = 300, path: Optional[str] = None, source: str = ''):
+        self.ttl = ttl
+        self.path = path
+        # База, для которой собран кэш: записи другой базы с диска не загружаются
+        self.source = source
+        # Ключ -> (значение, время записи по часам системы)
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._load()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Значение, если оно есть и не устарело"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Значение без учета срока жизни (для мгновенного заполнения интерфейса)"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def put(self, key: str, value: Any):
+        """Сохранение значения"""
+        with self._lock:
+            self._entries[key] = (value, time.time())
+        self._save()
+
+    def invalidate(self, *keys: str):
+        """Сброс записей после изменения данных в базе"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        self._save()
+
+    def _load(self):
+        """Загрузка записей с диска"""
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get('source') != self.source:
+            return
+
+        self._entries = {key: (entry['value'], entry['saved_at'])
+                         for key, entry in data.get('entries', {}).items()}
+
+    def _save(self):
+        """Запись на диск через временный файл, чтобы не оставить файл недописанным"""
+        if not self.path:
+            return
+
+        with self._lock:
+            data = {'source': self.source,
+                    'entries': {key: {'value': value, 'saved_at': saved_at}
+                                for key, (value, saved_at) in self._entries.items()}}
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Ошибка сохранения кэша справочников: {e}")
+
+
+_cache: Optional[ReferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_reference_cache() -> ReferenceCache:
+    """Получение общего кэша справочников (создается при первом обращении)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReferenceCache(Config.REFERENCE_CACHE['ttl'], Config.REFERENCE_CACHE['path'], source_name())
+        return _cache
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Tuple
+from config import Config
+import queries
+
+
+def routes_key(filters: Optional[Dict], today: Optional[date] = None) -> Tuple:
+    """Ключ выдачи get_all_available_routes: станции и вычисленные границы отправления"""
+    filters = filters or {}
+    start, end = queries.departure_bounds(filters, today)
+    return ('routes', filters.get('departure_station') or None, filters.get('arrival_station') or None, start, end)
+
+
+def trains_key(from_station: str, to_station: str, date_text: str) -> Tuple:
+    """Ключ выдачи search_trains (строки как есть: регистр в LIKE зависит от хранилища)"""
+    start, end = queries.day_bounds(date_text)
+    return ('trains', from_station, to_station, start, end)
+
+
+def key_matches(key: Tuple, route: Dict) -> bool:
+    """Попадает ли рейс (станции и время отправления) в выдачу с ключом key"""
+    kind, departure, arrival, start, end = key
+    if kind == 'routes':
+        if departure and route['departure_station'] != departure:
+            return False
+        if arrival and route['arrival_station'] != arrival:
+            return False
+    elif (departure.casefold() not in route['departure_station'].casefold()
+          or arrival.casefold() not in route['arrival_station'].casefold()):
+        # Подстрока без учета регистра - с запасом для любого хранилища
+        return False
+
+    departure_time = route['departure_time']
+    if isinstance(departure_time, str):
+        try:
+            departure_time = datetime.fromisoformat(departure_time)
+        except ValueError:
+            # Неразобранное время - считаем, что рейс может попасть в выдачу
+            return True
+    return (start is None or departure_time >= start) and (end is None or departure_time < end)
+
+
+class RouteSearchCache:
+    """Кэш выдачи поиска рейсов (LRU) со сбросом по рейсам.
+
+    Запись выдачи сбрасывается, когда в кассе меняются места рейса из нее (продажа,
+    отмена) или появляется подходящий рейс (отмена на заполненном рейсе, новый рейс).
+    Изменения других касс видны по истечении короткого времени жизни записей.
+    """
+
+    def __init__(self, size: int = 128, ttl: float = 15):
+        self.size = size
+        self.ttl = ttl
+        # Ключ -> (рейсы, время записи по монотонным часам)
+        self._entries: 'OrderedDict[Tuple, tuple]' = OrderedDict()
+        # id рейса -> ключи выдач, где он есть
+        self._by_route: Dict[int, Set[Tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        """Выдача, если она есть и не устарела (копия списка)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] >= self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key: Tuple, routes: List[Dict]):
+        """Сохранение выдачи; самая давно запрошенная вытесняется при переполнении"""
+        if self.size <= 0:
+            return
+
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (list(routes), time.monotonic())
+            for route in routes:
+                self._by_route.setdefault(route['route_id'], set()).add(key)
+            while len(self._entries) > self.size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_route(self, route_id: int, route: Optional[Dict] = None):
+        """Сброс выдач с рейсом route_id, а если задан route - и выдач, куда рейс может попасть"""
+        with self._lock:
+            keys = set(self._by_route.get(route_id, ()))
+            if route is not None:
+                keys.update(key for key in self._entries if key_matches(key, route))
+            for key in keys:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_route.clear()
+
+    def _drop(self, key: Tuple):
+        """Удаление записи вместе с обратным индексом (под блокировкой)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for route in entry[0]:
+            keys = self._by_route.get(route['route_id'])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_route[route['route_id']]
+
+
+_cache: Optional[RouteSearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_route_cache() -> RouteSearchCache:
+    """Получение общего кэша поиска рейсов (создается при первом обращении)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RouteSearchCache(Config.ROUTE_CACHE['size'], Config.ROUTE_CACHE['ttl'])
+        return _cache
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Tuple
+from seat_map import SeatMap
+
+
+def _runs(mask: int, count: int) -> int:
+    """Биты, с которых начинается count свободных мест подряд"""
+    # Удвоение длины серии: после шага бит i означает, что свободны места i..i+length-1
+    run, length = mask, 1
+    while length < count and run:
+        step = min(length, count - length)
+        run &= run >> step
+        length += step
+    return run
+
+
+def _bits(mask: int) -> List[int]:
+    """Номера установленных битов по возрастанию"""
+    numbers = []
+    while mask:
+        lowest = mask & -mask
+        numbers.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return numbers
+
+
+class SeatAllocator:
+    """Подбор мест для группы по схеме занятости рейса (SeatMap).
+
+    Занятость каждого вагона хранится одним целым числом: бит n установлен,
+    если место n свободно. Поиск k мест подряд - несколько сдвигов и AND.
+    """
+
+    def __init__(self, seat_map: SeatMap):
+        self._seat_map = seat_map
+        # (вагон, тип места или None) -> маска свободных мест
+        self._masks: Dict[Tuple[int, Optional[str]], int] = seat_map.carriage_masks()
+        self.carriages = sorted({carriage for carriage, _ in self._masks})
+        # Номера свободных мест по возрастанию - для запасных вариантов подбора
+        self._numbers: Dict[Tuple[int, Optional[str]], List[int]] = {
+            key: _bits(mask) for key, mask in self._masks.items()}
+
+    def free_count(self, carriage: int, seat_type: Optional[str] = None) -> int:
+        """Число свободных мест в вагоне"""
+        return bin(self._masks.get((carriage, seat_type), 0)).count('1')
+
+    def allocate(self, count: int, seat_type: Optional[str] = None) -> List[int]:
+        """id мест для группы из count человек (пустой список, если мест не хватает).
+
+        Сначала ищутся места подряд в одном вагоне, затем самые близкие места
+        одного вагона, затем места в соседних вагонах.
+        """
+        if count <= 0:
+            return []
+
+        return (self._adjacent(count, seat_type)
+                or self._same_carriage(count, seat_type)
+                or self._neighbour_carriages(count, seat_type))
+
+    def _ids(self, carriage: int, numbers: List[int]) -> List[int]:
+        return [self._seat_map.seat_id(carriage, number) for number in numbers]
+
+    def _adjacent(self, count: int, seat_type: Optional[str]) -> List[int]:
+        """Места подряд в одном вагоне (первое подходящее по порядку вагонов)"""
+        for carriage in self.carriages:
+            run = _runs(self._masks.get((carriage, seat_type), 0), count)
+            if run:
+                start = (run & -run).bit_length() - 1
+                return self._ids(carriage, list(range(start, start + count)))
+        return []
+
+    def _same_carriage(self, count: int, seat_type: Optional[str]) -> List[int]:
+        """Места одного вагона с наименьшим разбросом номеров"""
+        best, best_span = None, None
+        for carriage in self.carriages:
+            numbers = self._numbers.get((carriage, seat_type), [])
+            if len(numbers) < count:
+                continue
+
+            spans = [last - first for first, last in zip(numbers, numbers[count - 1:])]
+            span = min(spans)
+            if best_span is None or span < best_span:
+                best, best_span = (carriage, numbers, spans.index(span)), span
+                # Подряд мест нет, поэтому один пропуск - лучший возможный вариант
+                if span == count:
+                    break
+
+        if best is None:
+            return []
+        carriage, numbers, start = best
+        return self._ids(carriage, numbers[start:start + count])
+
+    def _neighbour_carriages(self, count: int, seat_type: Optional[str]) -> List[int]:
+        """Места в вагонах с наименьшим разбросом номеров (затем - в наименьшем числе вагонов)"""
+        free = [self.free_count(carriage, seat_type) for carriage in self.carriages]
+        best, best_key = None, None
+        for first in range(len(self.carriages)):
+            total, last = 0, first
+            while last < len(self.carriages) and total < count:
+                total += free[last]
+                last += 1
+            if total < count:
+                break
+            # Разброс - по номерам вагонов: заполненные вагоны между ними в списке не видны
+            key = (self.carriages[last - 1] - self.carriages[first], last - first)
+            if best_key is None or key < best_key:
+                best, best_key = (first, last), key
+
+        if best is None:
+            return []
+
+        seat_ids = []
+        for carriage in self.carriages[best[0]:best[1]]:
+            numbers = self._numbers.get((carriage, seat_type), [])
+            seat_ids.extend(self._ids(carriage, numbers[:count - len(seat_ids)]))
+        return seat_ids
@@ -0,0 +1,33 @@
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+
+def layout_key(train_type: Optional[str]) -> str:
+    """Ключ схемы вагона в Config.CARRIAGE_LAYOUTS для типа поезда"""
+    key = (train_type or '').strip().lower()
+    return key if key in Config.CARRIAGE_LAYOUTS else 'default'
+
+
+def get_layout(train_type: Optional[str]) -> Dict:
+    """Схема вагона для типа поезда (или схема по умолчанию)"""
+    return Config.CARRIAGE_LAYOUTS[layout_key(train_type)]
+
+
+def seat_class(layout: Dict, seat_number: int) -> str:
+    """Класс места по его номеру в вагоне"""
+    for first, last, seat_type in layout['classes']:
+        if first <= seat_number <= last:
+            return seat_type
+    return 'Стандарт'
+
+
+def generate_seats(num_seats: int, train_type: Optional[str] = None) -> List[Tuple[int, int, str]]:
+    """Раскладка мест по вагонам: (вагон, место, тип места)"""
+    layout = get_layout(train_type)
+    per_carriage = layout['seats_per_carriage']
+
+    # Классы мест одинаковы во всех вагонах - считаем их один раз
+    classes = [seat_class(layout, number) for number in range(1, per_carriage + 1)]
+
+    return [(i // per_carriage + 1, i % per_carriage + 1, classes[i % per_carriage])
+            for i in range(num_seats)]
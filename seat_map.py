@@ -0,0 +1,269 @@
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+from seat_layouts import generate_seats
+
+# Заголовок сериализации: рейс, мест в вагоне, всего позиций, id первого места, число классов
+_HEADER = struct.Struct('<qIIqB')
+
+
+def all_free(size: int) -> bytes:
+    """Битовая карта из size свободных мест"""
+    return ((1 << size) - 1).to_bytes((size + 7) // 8, 'little')
+
+
+def taken_slots(bitmap: bytes, slots: List[int]) -> List[int]:
+    """Позиции из slots, занятые в битовой карте"""
+    return [slot for slot in slots if not bitmap[slot >> 3] >> (slot & 7) & 1]
+
+
+def with_slots(bitmap: bytes, slots: List[int], free: bool) -> bytes:
+    """Копия битовой карты, где позиции slots свободны (free=True) или заняты"""
+    result = bytearray(bitmap)
+    for slot in slots:
+        if free:
+            result[slot >> 3] |= 1 << (slot & 7)
+        else:
+            result[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+    return bytes(result)
+
+
+class SeatMap:
+    """Занятость мест рейса в битовых массивах.
+
+    Место n вагона c - бит (c - 1) * width + n - 1. Свободные места - один
+    изменяемый массив, классы мест - по неизменяемой маске на класс. Если id мест
+    идут подряд в порядке позиций (места вставляются одним INSERT), хранится
+    только id первого места; иначе - массив id по позициям.
+    """
+
+    __slots__ = ('route_id', 'width', 'size', 'classes', '_free', '_class_masks', '_first_id', '_ids', '_slots')
+
+    def __init__(self, route_id: Optional[int], width: int, size: int, classes: List[str],
+                 class_masks: List[bytes], free: bytearray, first_id: Optional[int] = None,
+                 ids: Optional[array] = None):
+        self.route_id = route_id
+        self.width = width
+        self.size = size
+        self.classes = classes
+        self._class_masks = class_masks
+        self._free = free
+        self._first_id = first_id
+        self._ids = ids
+        # Позиции по id мест - только для несплошных id, строятся при первом обращении
+        self._slots = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict], route_id: Optional[int] = None) -> 'SeatMap':
+        """Схема по строкам мест (seat_id, carriage_number, seat_number, seat_type, status)"""
+        width = max((row['seat_number'] for row in rows), default=0)
+        size = max(((row['carriage_number'] - 1) * width + row['seat_number'] for row in rows), default=0)
+        length = (size + 7) // 8
+
+        free = bytearray(length)
+        masks: Dict[str, bytearray] = {}
+        ids = {}
+        for row in rows:
+            slot = (row['carriage_number'] - 1) * width + row['seat_number'] - 1
+            ids[slot] = row['seat_id']
+            mask = masks.get(row['seat_type'])
+            if mask is None:
+                mask = masks[row['seat_type']] = bytearray(length)
+            mask[slot >> 3] |= 1 << (slot & 7)
+            if row.get('status', 'свободно') == 'свободно':
+                free[slot >> 3] |= 1 << (slot & 7)
+
+        classes = list(masks)
+        masks = list(masks.values())
+        first_id = ids.get(0)
+        if len(ids) == size and all(ids[slot] == first_id + slot for slot in range(size)):
+            return cls(route_id, width, size, classes, [bytes(mask) for mask in masks], free, first_id)
+
+        slot_ids = array('q', bytes(8 * size))
+        for slot, seat_id in ids.items():
+            slot_ids[slot] = seat_id
+        return cls(route_id, width, size, classes, [bytes(mask) for mask in masks], free, ids=slot_ids)
+
+    @classmethod
+    def from_layout(cls, route_id: Optional[int], num_seats: int, train_type: Optional[str],
+                    first_id: Optional[int] = None, free: Optional[bytes] = None) -> 'SeatMap':
+        """Схема по раскладке мест поезда (все места свободны, если free не задан)"""
+        seats = generate_seats(num_seats, train_type)
+        width = max((number for _, number, _ in seats), default=0)
+        length = (num_seats + 7) // 8
+
+        classes, masks = [], []
+        for slot, (_, _, seat_type) in enumerate(seats):
+            if seat_type not in classes:
+                classes.append(seat_type)
+                masks.append(bytearray(length))
+            masks[classes.index(seat_type)][slot >> 3] |= 1 << (slot & 7)
+
+        if free is None:
+            free = all_free(num_seats)
+        return cls(route_id, width, num_seats, classes, [bytes(mask) for mask in masks], bytearray(free), first_id)
+
+    def with_free(self, route_id: Optional[int], free: bytes) -> 'SeatMap':
+        """Схема рейса по общей схеме мест и битовой карте свободных мест рейса"""
+        return SeatMap(route_id, self.width, self.size, self.classes, self._class_masks, bytearray(free),
+                       self._first_id, self._ids)
+
+    # ========== МЕСТА ==========
+
+    def slot(self, seat_id: int) -> Optional[int]:
+        """Позиция места по id (None, если места нет на рейсе)"""
+        if self._ids is None:
+            slot = seat_id - self._first_id if self._first_id is not None else -1
+            return slot if 0 <= slot < self.size else None
+
+        if self._slots is None:
+            self._slots = {value: slot for slot, value in enumerate(self._ids) if value}
+        return self._slots.get(seat_id)
+
+    def seat_id(self, carriage: int, number: int) -> Optional[int]:
+        slot = (carriage - 1) * self.width + number - 1
+        if not 0 <= slot < self.size:
+            return None
+        if self._ids is None:
+            return self._first_id + slot if self._first_id is not None else None
+        return self._ids[slot] or None
+
+    def seat_type(self, slot: int) -> Optional[str]:
+        for seat_type, mask in zip(self.classes, self._class_masks):
+            if mask[slot >> 3] >> (slot & 7) & 1:
+                return seat_type
+        return None
+
+    def is_free(self, seat_id: int) -> bool:
+        slot = self.slot(seat_id)
+        return slot is not None and bool(self._free[slot >> 3] >> (slot & 7) & 1)
+
+    def claim(self, seat_id: int) -> bool:
+        """Отметка места занятым; False, если место уже занято или его нет"""
+        if not self.is_free(seat_id):
+            return False
+        slot = self.slot(seat_id)
+        self._free[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+        return True
+
+    def release(self, seat_id: int) -> bool:
+        """Возврат места в продажу; False, если место уже свободно или его нет"""
+        slot = self.slot(seat_id)
+        if slot is None or self.is_free(seat_id) or self.seat_type(slot) is None:
+            return False
+        self._free[slot >> 3] |= 1 << (slot & 7)
+        return True
+
+    # ========== СЧЕТЧИКИ ==========
+
+    def _carriage_bits(self, carriage: int) -> int:
+        """Маска позиций вагона"""
+        return ((1 << self.width) - 1) << (carriage - 1) * self.width
+
+    def free_count(self, seat_type: Optional[str] = None, carriage: Optional[int] = None) -> int:
+        """Число свободных мест (всего, класса и/или вагона)"""
+        free = int.from_bytes(self._free, 'little')
+        if seat_type is not None:
+            if seat_type not in self.classes:
+                return 0
+            free &= int.from_bytes(self._class_masks[self.classes.index(seat_type)], 'little')
+        if carriage is not None:
+            free &= self._carriage_bits(carriage)
+        return bin(free).count('1')
+
+    def free_counts(self) -> Dict[str, int]:
+        """Свободные места по классам"""
+        free = int.from_bytes(self._free, 'little')
+        return {seat_type: bin(free & int.from_bytes(mask, 'little')).count('1')
+                for seat_type, mask in zip(self.classes, self._class_masks)}
+
+    def carriages(self) -> List[int]:
+        return list(range(1, (self.size + self.width - 1) // self.width + 1)) if self.width else []
+
+    def carriage_mask(self, carriage: int, seat_type: Optional[str] = None) -> int:
+        """Свободные места вагона: бит n установлен, если свободно место n"""
+        free = int.from_bytes(self._free, 'little')
+        if seat_type is not None:
+            if seat_type not in self.classes:
+                return 0
+            free &= int.from_bytes(self._class_masks[self.classes.index(seat_type)], 'little')
+        return (free >> (carriage - 1) * self.width & ((1 << self.width) - 1)) << 1
+
+    def carriage_masks(self) -> Dict[Tuple[int, Optional[str]], int]:
+        """Маски свободных мест всех вагонов, где есть свободные места: (вагон, тип или None) -> маска"""
+        free = int.from_bytes(self._free, 'little')
+        typed = [(seat_type, free & int.from_bytes(mask, 'little'))
+                 for seat_type, mask in zip(self.classes, self._class_masks)]
+        row = (1 << self.width) - 1
+
+        masks = {}
+        for carriage in self.carriages():
+            shift = (carriage - 1) * self.width
+            mask = free >> shift & row
+            if not mask:
+                continue
+            masks[(carriage, None)] = mask << 1
+            for seat_type, bits in typed:
+                if bits >> shift & row:
+                    masks[(carriage, seat_type)] = (bits >> shift & row) << 1
+        return masks
+
+    def free_seats(self) -> Iterator[Dict]:
+        """Свободные места в формате get_available_seats (по вагонам и номерам)"""
+        for index, byte in enumerate(self._free):
+            while byte:
+                lowest = byte & -byte
+                byte ^= lowest
+                slot = index * 8 + lowest.bit_length() - 1
+                yield {'seat_id': self._first_id + slot if self._ids is None else self._ids[slot],
+                       'carriage_number': slot // self.width + 1, 'seat_number': slot % self.width + 1,
+                       'seat_type': self.seat_type(slot), 'status': 'свободно'}
+
+    # ========== СЕРИАЛИЗАЦИЯ ==========
+
+    @property
+    def free_bitmap(self) -> bytes:
+        return bytes(self._free)
+
+    @property
+    def nbytes(self) -> int:
+        """Объем данных схемы в байтах (без служебных полей объектов)"""
+        ids = self._ids.itemsize * len(self._ids) if self._ids is not None else 0
+        return len(self._free) + sum(len(mask) for mask in self._class_masks) + ids
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(-1 if self.route_id is None else self.route_id, self.width, self.size,
+                              -1 if self._first_id is None else self._first_id, len(self.classes))]
+        for seat_type in self.classes:
+            name = seat_type.encode('utf-8')
+            parts.append(bytes([len(name)]) + name)
+        parts.append(bytes(self._free))
+        parts.extend(self._class_masks)
+        if self._ids is not None:
+            parts.append(self._ids.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SeatMap':
+        route_id, width, size, first_id, class_count = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        classes = []
+        for _ in range(class_count):
+            length = data[offset]
+            classes.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+            offset += 1 + length
+
+        length = (size + 7) // 8
+        free = bytearray(data[offset:offset + length])
+        offset += length
+        masks = []
+        for _ in classes:
+            masks.append(bytes(data[offset:offset + length]))
+            offset += length
+
+        ids = None
+        if first_id < 0:
+            ids = array('q')
+            ids.frombytes(data[offset:offset + 8 * size])
+        return cls(None if route_id < 0 else route_id, width, size, classes, masks, free,
+                   None if first_id < 0 else first_id, ids)
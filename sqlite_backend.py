@@ -0,0 +1,341 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Tuple
+import queries
+
+# Схема SQLite соответствует схеме MySQL после всех миграций (migrations.MIGRATIONS)
+BOOKINGS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        passenger_id INTEGER NOT NULL REFERENCES passengers(id),
+        seat_id INTEGER REFERENCES seats(id),
+        route_id INTEGER NOT NULL REFERENCES routes(id),
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        status VARCHAR(20) NOT NULL DEFAULT 'забронирован',
+        final_price DECIMAL(10, 2) NOT NULL,
+        confirmed_by_admin BOOLEAN NOT NULL DEFAULT FALSE,
+        booking_date TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+        layout_seat_id INTEGER REFERENCES layout_seats(id)
+    )
+    """
+
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(50) NOT NULL UNIQUE,
+        password_hash CHAR(64) NOT NULL,
+        full_name VARCHAR(100) NOT NULL,
+        role VARCHAR(20) NOT NULL DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trains (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        train_number VARCHAR(20) NOT NULL,
+        train_name VARCHAR(100) NOT NULL,
+        train_type VARCHAR(50)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS routes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        train_id INTEGER NOT NULL REFERENCES trains(id),
+        departure_station VARCHAR(100) NOT NULL,
+        arrival_station VARCHAR(100) NOT NULL,
+        departure_time DATETIME NOT NULL,
+        arrival_time DATETIME NOT NULL,
+        base_price DECIMAL(10, 2) NOT NULL,
+        free_seats INTEGER NOT NULL DEFAULT 0,
+        free_lux INTEGER NOT NULL DEFAULT 0,
+        free_coupe INTEGER NOT NULL DEFAULT 0,
+        free_standard INTEGER NOT NULL DEFAULT 0,
+        seat_layout_id INTEGER REFERENCES seat_layouts(id),
+        seat_bitmap BLOB,
+        seat_version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS seats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        route_id INTEGER NOT NULL REFERENCES routes(id),
+        carriage_number INTEGER NOT NULL,
+        seat_number INTEGER NOT NULL,
+        seat_type VARCHAR(20) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'свободно'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS passengers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        full_name VARCHAR(100) NOT NULL,
+        document_number VARCHAR(50) NOT NULL UNIQUE,
+        phone VARCHAR(20)
+    )
+    """,
+    BOOKINGS_TABLE.format(name='bookings'),
+    """
+    CREATE TABLE IF NOT EXISTS seat_layouts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        layout_key VARCHAR(50) NOT NULL,
+        num_seats INTEGER NOT NULL,
+        UNIQUE (layout_key, num_seats)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS layout_seats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        layout_id INTEGER NOT NULL REFERENCES seat_layouts(id),
+        slot INTEGER NOT NULL,
+        carriage_number INTEGER NOT NULL,
+        seat_number INTEGER NOT NULL,
+        seat_type VARCHAR(20) NOT NULL,
+        UNIQUE (layout_id, slot)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_seats_route_status ON seats (route_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_routes_stations_departure "
+    "ON routes (departure_station, arrival_station, departure_time)",
+    "CREATE INDEX IF NOT EXISTS idx_routes_departure ON routes (departure_time)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_user_date ON bookings (user_id, booking_date)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings (booking_date)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_status_date ON bookings (status, booking_date)",
+    "CREATE INDEX IF NOT EXISTS idx_passengers_name ON passengers (full_name)",
+    # MySQL создает индексы внешних ключей сам, SQLite - нет
+    "CREATE INDEX IF NOT EXISTS idx_routes_train ON routes (train_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_passenger ON bookings (passenger_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_seat ON bookings (seat_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_route ON bookings (route_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_layout_seat ON bookings (layout_seat_id)"
+]
+
+BOOKING_COLUMNS = ('id, passenger_id, seat_id, route_id, user_id, status, final_price, '
+                   'confirmed_by_admin, booking_date')
+
+# Файлы, созданные до битовых карт мест (миграция 7 в MySQL): недостающие колонки
+# добавляются, а bookings пересоздается - SQLite не снимает NOT NULL с колонки
+SQLITE_UPGRADES = [
+    ('routes', 'seat_layout_id', [
+        "ALTER TABLE routes ADD COLUMN seat_layout_id INTEGER REFERENCES seat_layouts(id)",
+        "ALTER TABLE routes ADD COLUMN seat_bitmap BLOB",
+        "ALTER TABLE routes ADD COLUMN seat_version INTEGER NOT NULL DEFAULT 0"
+    ]),
+    ('bookings', 'layout_seat_id', [
+        BOOKINGS_TABLE.format(name='bookings_upgrade'),
+        f"INSERT INTO bookings_upgrade ({BOOKING_COLUMNS}) SELECT {BOOKING_COLUMNS} FROM bookings",
+        "DROP TABLE bookings",
+        "ALTER TABLE bookings_upgrade RENAME TO bookings"
+    ])
+]
+
+# Запросы, которые в SQLite записываются иначе (остальные переводятся автоматически)
+SQLITE_QUERIES = {
+    queries.UPSERT_PASSENGER: """
+    INSERT INTO passengers (full_name, document_number, phone)
+    VALUES (?, ?, ?)
+    ON CONFLICT (document_number) DO UPDATE SET
+        full_name = excluded.full_name,
+        phone = COALESCE(NULLIF(excluded.phone, ''), phone)
+    RETURNING id
+    """,
+    # MySQL считает только реально измененные строки, SQLite - все найденные:
+    # обновляем лишь маршруты, где счетчики расходятся с местами
+    queries.RECONCILE_FREE_SEATS: """
+    UPDATE routes
+    SET free_seats = a.free_seats, free_lux = a.free_lux,
+        free_coupe = a.free_coupe, free_standard = a.free_standard
+    FROM (SELECT r.id AS route_id,
+                 COUNT(s.id) AS free_seats,
+                 COUNT(CASE WHEN s.seat_type = 'Люкс' THEN 1 END) AS free_lux,
+                 COUNT(CASE WHEN s.seat_type = 'Купе' THEN 1 END) AS free_coupe,
+                 COUNT(CASE WHEN s.seat_type NOT IN ('Люкс', 'Купе') THEN 1 END) AS free_standard
+          FROM routes r
+          LEFT JOIN seats s ON s.route_id = r.id AND s.status = 'свободно'
+          GROUP BY r.id) a
+    WHERE a.route_id = routes.id
+      AND (routes.free_seats, routes.free_lux, routes.free_coupe, routes.free_standard)
+          != (a.free_seats, a.free_lux, a.free_coupe, a.free_standard)
+    """
+}
+SQLITE_QUERIES[queries.RECONCILE_ROW_FREE_SEATS] = (SQLITE_QUERIES[queries.RECONCILE_FREE_SEATS]
+                                                    + "  AND routes.seat_layout_id IS NULL\n")
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+sqlite3.register_adapter(datetime, lambda value: value.strftime(DATETIME_FORMAT))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()))
+
+
+def _sha2(value, bits):
+    """SHA2(строка, 256) как в MySQL"""
+    if value is None:
+        return None
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()
+
+
+def _dict_row(cursor, row) -> Dict:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+_translated: Dict[str, Tuple[str, bool]] = {}
+
+
+def translate(query: str) -> Tuple[str, bool]:
+    """Запрос MySQL в синтаксисе SQLite; второй элемент - запрос возвращает id строки"""
+    cached = _translated.get(query)
+    if cached is not None:
+        return cached
+
+    sql = SQLITE_QUERIES.get(query, query)
+    sql = sql.replace('%s', '?')
+    # Комментарии MySQL "# ..." до конца строки
+    sql = re.sub(r"[ \t]+#[^'\n]*$", '', sql, flags=re.M)
+    # В MySQL обратная косая черта экранирует по умолчанию, в SQLite - только с ESCAPE
+    sql = re.sub(r"LIKE \?", r"LIKE ? ESCAPE '\\'", sql)
+    result = (sql, 'RETURNING id' in sql)
+    _translated[query] = result
+    return result
+
+
+class SqliteCursor:
+    """Курсор SQLite с интерфейсом курсора mysql.connector (словари, %s, lastrowid)"""
+
+    def __init__(self, connection: 'SqliteConnection'):
+        self._connection = connection
+        self._cursor = sqlite3.Connection.cursor(connection)
+        self._cursor.row_factory = _dict_row
+        self.lastrowid = None
+        self.rowcount = -1
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, params=None):
+        if query.strip().upper() == 'START TRANSACTION':
+            # Как в MySQL: начало транзакции фиксирует предыдущую; запись блокируется сразу
+            if self._connection.in_transaction:
+                self._connection.commit()
+            self._cursor.execute('BEGIN IMMEDIATE')
+            return
+
+        sql, returns_id = translate(query)
+        self._cursor.execute(sql, tuple(params) if params is not None else ())
+        self.rowcount = self._cursor.rowcount
+        if returns_id:
+            self.lastrowid = self._cursor.fetchone()['id']
+            self.rowcount = 1
+        else:
+            self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, query, seq_params):
+        # Как многострочная вставка MySQL: lastrowid - id первой строки, rowcount - сумма
+        first_id, total = None, 0
+        for params in seq_params:
+            self.execute(query, params)
+            first_id = self.lastrowid if first_id is None else first_id
+            total += max(self.rowcount, 0)
+        self.lastrowid = first_id
+        self.rowcount = total
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection(sqlite3.Connection):
+    """Соединение SQLite с cursor(dictionary=True), как у mysql.connector"""
+
+    def cursor(self, dictionary=True, **kwargs):
+        return SqliteCursor(self)
+
+
+class SqliteBackend:
+    """Локальная база SQLite с интерфейсом пула соединений (acquire/release)"""
+
+    def __init__(self, path: str, timeout: float = 10):
+        self.path = path
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _open(self) -> SqliteConnection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout, factory=SqliteConnection,
+                                     detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        connection.create_function('SHA2', 2, _sha2, deterministic=True)
+        connection.execute('PRAGMA foreign_keys = ON')
+        # WAL: чтение не ждет записи другого соединения
+        connection.execute('PRAGMA journal_mode = WAL')
+
+        with self._lock:
+            ready = self._schema_ready
+        if not ready:
+            self._upgrade(connection)
+            for statement in SQLITE_SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            with self._lock:
+                self._schema_ready = True
+        return connection
+
+    @staticmethod
+    def _upgrade(connection: SqliteConnection):
+        """Добавление колонок, которых нет в базе, созданной прежней версией схемы"""
+        # Пересоздание таблицы - с отключенной проверкой внешних ключей, как советует документация SQLite
+        connection.execute('PRAGMA foreign_keys = OFF')
+        for table, column, statements in SQLITE_UPGRADES:
+            columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+            if columns and column not in columns:
+                for statement in statements:
+                    connection.execute(statement)
+        connection.commit()
+        connection.execute('PRAGMA foreign_keys = ON')
+
+    def acquire(self) -> SqliteConnection:
+        """Выдача соединения (новое открывается, если свободных нет)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def release(self, connection: SqliteConnection):
+        """Возврат соединения с откатом незавершенной транзакции"""
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            connection.close()
+            return
+
+        with self._lock:
+            self._idle.append(connection)
+
+    def last_checkout(self) -> Tuple[float, int]:
+        # Соединения не ограничены числом, ожидания и переподключений нет
+        return 0.0, 0
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
@@ -3,55 +3,144 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
 from config import Config
+from ui.theme import themed
+from ui.db_worker import DbExecutor
+from ui.table_models import Column, RecordTableView
+import queries
 from ui.routes_management_page import RoutesManagementPage
 
 
+# Цвета ячеек статуса бронирования и роли пользователя
+STATUS_CONFIRMED = QColor(220, 255, 220)
+STATUS_PAID = QColor(255, 255, 200)
+STATUS_BOOKED = QColor(255, 245, 200)
+STATUS_CANCELLED = QColor(255, 220, 220)
+ROLE_ADMIN = QColor(255, 220, 220)
+ROLE_USER = QColor(220, 255, 220)
+
+# Написания статусов, которые встречаются в базе
+PAID_STATUSES = ['оплачен', 'paid', 'payment']
+BOOKED_STATUSES = ['забронирован', 'booked', 'reserved']
+CANCELLED_STATUSES = ['отменено', 'canceled', 'cancelled']
+
+
+def normalized_status(booking):
+    """Статус бронирования в нижнем регистре"""
+    return booking['status'].lower() if booking['status'] else ''
+
+
+def status_text(booking):
+    """Текст статуса бронирования для таблицы"""
+    status = normalized_status(booking)
+    if booking['confirmed_by_admin']:
+        return '✅ Подтверждено'
+    if status in PAID_STATUSES:
+        return '💰 Оплачено'
+    if status in BOOKED_STATUSES:
+        return '⏳ Забронировано'
+    if status in CANCELLED_STATUSES:
+        return '❌ Отменено'
+    return booking['status']  # Оставляем оригинальный текст
+
+
+def status_color(booking):
+    """Цвет фона статуса бронирования"""
+    text = status_text(booking) or ''
+    if 'Подтверждено' in text:
+        return STATUS_CONFIRMED
+    if 'Оплачено' in text:
+        return STATUS_PAID
+    if 'Забронировано' in text:
+        return STATUS_BOOKED
+    return STATUS_CANCELLED
+
+
+# Колонки таблицы всех бронирований
+BOOKING_COLUMNS = [
+    Column('ID', 'booking_id'),
+    Column('Пассажир', 'full_name'),
+    Column('Поезд', 'train_name', lambda booking: f"{booking['train_name']} ({booking['train_number']})"),
+    Column('Маршрут', 'departure_station',
+           lambda booking: f"{booking['departure_station']} → {booking['arrival_station']}"),
+    Column('Отправление', 'departure_time', lambda booking: booking['departure_time'].strftime('%d.%m.%Y %H:%M')),
+    Column('Пользователь', 'user_full_name',
+           lambda booking: f"{booking['user_full_name']} ({booking['created_by_user']})"),
+    Column('Статус', 'status', status_text, background=status_color),
+    Column('Цена', 'final_price', lambda booking: f"{booking['final_price']:.2f} ₽"),
+    Column('Подтверждено', 'confirmed_by_admin', lambda booking: '✅ Да' if booking['confirmed_by_admin'] else '❌ Нет')
+]
+
+# Колонки таблицы пользователей
+USER_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Логин', 'username'),
+    Column('ФИО', 'full_name'),
+    Column('Роль', 'role', background=lambda user: ROLE_ADMIN if user['role'] == 'admin' else ROLE_USER),
+    Column('Дата регистрации', 'created_at', lambda user: user['created_at'].strftime('%d.%m.%Y %H:%M'))
+]
+
+
 class AdminPage(QWidget):
     """Страница администратора"""
 
-    def __init__(self, user):
-        super().__init__()
+    # Пункты фильтра бронирований: подпись, условия для Database.get_all_bookings, ключ счетчика
+    BOOKING_FILTERS = [
+        ('Все бронирования', {}, 'total'),
+        ('Оплаченные (ожидают подтверждения)', {'status': 'оплачен', 'confirmed': False}, 'awaiting'),
+        ('Подтвержденные', {'confirmed': True}, 'confirmed'),
+        ('Отмененные', {'status': 'отменено'}, 'cancelled'),
+        ('Забронированные', {'status': 'забронирован'}, 'booked')
+    ]
+
+    def __init__(self, user, parent=None):
+        super().__init__(parent)
         self.user = user
         self.db = Database()
+        self.executor = DbExecutor(self)
+        # Загруженные страницы бронирований
+        self.bookings = []
+        self.has_more_bookings = False
         self.init_ui()
 
     def init_ui(self):
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('ПАНЕЛЬ АДМИНИСТРАТОРА')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["xxlarge"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["dark"]};
-            margin-bottom: 10px;
-        ''')
+        themed(title, role='page-title')
         layout.addWidget(title)
 
         # Вкладки
         self.tab_widget = QTabWidget()
+        layout.addWidget(self.tab_widget)
 
-        # Вкладка управления рейсами
-        self.routes_management_page = RoutesManagementPage(self.user)
-        self.tab_widget.addTab(self.routes_management_page, '🚆 Управление рейсами')
+        # Вкладка управления рейсами: страница строится уже внутри добавленной вкладки
+        routes_tab = QWidget()
+        self.tab_widget.addTab(routes_tab, '🚆 Управление рейсами')
+        routes_layout = QVBoxLayout(routes_tab)
+        routes_layout.setContentsMargins(0, 0, 0, 0)
+        self.routes_management_page = RoutesManagementPage(self.user, routes_tab)
+        routes_layout.addWidget(self.routes_management_page)
 
         # Вкладка бронирований
-        self.bookings_tab = self.create_bookings_tab()
-        self.tab_widget.addTab(self.bookings_tab, '📋 Все бронирования')
+        self.bookings_tab = self.create_bookings_tab('📋 Все бронирования')
 
         # Вкладка пользователей
-        self.users_tab = self.create_users_tab()
-        self.tab_widget.addTab(self.users_tab, '👥 Управление пользователями')
+        self.users_tab = self.create_users_tab('👥 Управление пользователями')
 
-        layout.addWidget(self.tab_widget)
-        self.setLayout(layout)
+        # Вкладки уже запросили данные при создании - показываем, что идет загрузка
+        self.executor.loading_changed.connect(self.show_loading)
+        for key in ('bookings', 'users'):
+            self.show_loading(key, self.executor.is_loading(key))
 
-    def create_bookings_tab(self):
+    def create_bookings_tab(self, title: str):
         """Создание вкладки бронирований"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        # Вкладка добавляется до заполнения: виджеты сразу попадают к своему родителю
+        self.tab_widget.addTab(widget, title)
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
@@ -60,34 +149,14 @@ class AdminPage(QWidget):
 
         refresh_btn = QPushButton('🔄 Обновить')
         refresh_btn.setMinimumHeight(40)
-        refresh_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(refresh_btn, variant='secondary')
         refresh_btn.clicked.connect(self.load_all_bookings)
 
         self.filter_combo = QComboBox()
-        self.filter_combo.addItems(
-            ['Все бронирования', 'Оплаченные (ожидают подтверждения)', 'Подтвержденные', 'Отмененные',
-             'Забронированные'])
+        self.filter_combo.addItems([label for label, _, _ in self.BOOKING_FILTERS])
         self.filter_combo.setMinimumHeight(40)
-        self.filter_combo.setStyleSheet(f'''
-            QComboBox {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 5px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-        ''')
-        self.filter_combo.currentTextChanged.connect(self.load_all_bookings)
+        # Подписи пунктов меняются вместе со счетчиками, поэтому следим за индексом, а не текстом
+        self.filter_combo.currentIndexChanged.connect(self.load_all_bookings)
 
         control_layout.addWidget(refresh_btn)
         control_layout.addWidget(QLabel('Фильтр:'))
@@ -97,29 +166,33 @@ class AdminPage(QWidget):
         layout.addLayout(control_layout)
 
         # Таблица бронирований
-        self.bookings_table = QTableWidget()
-        self.bookings_table.setColumnCount(10)
-        self.bookings_table.setHorizontalHeaderLabels([
-            'ID', 'Пассажир', 'Поезд', 'Маршрут', 'Отправление',
-            'Пользователь', 'Статус', 'Цена', 'Подтверждено', 'Действия'
-        ])
-        self.bookings_table.horizontalHeader().setStretchLastSection(True)
-        self.bookings_table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.bookings_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.bookings_table = RecordTableView(BOOKING_COLUMNS)
+        control_layout.addWidget(self.bookings_table.create_search_edit())
 
-        layout.addWidget(self.bookings_table)
+        # Действия с бронированием - в контекстном меню, детали - по двойному клику
+        self.bookings_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.bookings_table.customContextMenuRequested.connect(self.show_booking_menu)
+        self.bookings_table.doubleClicked.connect(
+            lambda index: self.view_booking_details(self.bookings_table.record_at(index)['booking_id']))
+
+        # Следующая страница догружается при прокрутке к концу таблицы
+        self.bookings_table.verticalScrollBar().valueChanged.connect(self.load_more_bookings)
+        # Скрытая таблица не догружается - проверка повторяется, когда ее покажут
+        self.bookings_table.shown.connect(self.load_more_bookings)
 
-        widget.setLayout(layout)
+        layout.addWidget(self.bookings_table)
 
         # Загружаем данные
         self.load_all_bookings()
 
         return widget
 
-    def create_users_tab(self):
+    def create_users_tab(self, title: str):
         """Создание вкладки пользователей"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        # Вкладка добавляется до заполнения: виджеты сразу попадают к своему родителю
+        self.tab_widget.addTab(widget, title)
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
@@ -128,18 +201,7 @@ class AdminPage(QWidget):
 
         refresh_btn = QPushButton('🔄 Обновить')
         refresh_btn.setMinimumHeight(40)
-        refresh_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(refresh_btn, variant='secondary')
         refresh_btn.clicked.connect(self.load_all_users)
 
         control_layout.addWidget(refresh_btn)
@@ -148,18 +210,14 @@ class AdminPage(QWidget):
         layout.addLayout(control_layout)
 
         # Таблица пользователей
-        self.users_table = QTableWidget()
-        self.users_table.setColumnCount(6)
-        self.users_table.setHorizontalHeaderLabels([
-            'ID', 'Логин', 'ФИО', 'Роль', 'Дата регистрации', 'Действия'
-        ])
-        self.users_table.horizontalHeader().setStretchLastSection(True)
-        self.users_table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.users_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.users_table = RecordTableView(USER_COLUMNS)
+        control_layout.addWidget(self.users_table.create_search_edit())
 
-        layout.addWidget(self.users_table)
+        # Смена роли - в контекстном меню
+        self.users_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.users_table.customContextMenuRequested.connect(self.show_user_menu)
 
-        widget.setLayout(layout)
+        layout.addWidget(self.users_table)
 
         # Загружаем данные
         self.load_all_users()
@@ -167,216 +225,104 @@ class AdminPage(QWidget):
         return widget
 
     def load_all_bookings(self):
-        """Загрузка всех бронирований"""
-        if not self.db.connect():
-            QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
+        """Загрузка всех бронирований с первой страницы вместе со счетчиками"""
+        self.bookings = []
+        self.has_more_bookings = False
+        self.bookings_table.set_rows([])
+
+        self.executor.submit('bookings', Database.get_all_bookings_with_counts, self.current_booking_filters(),
+                             on_result=self.show_first_page, on_error=self.show_load_error)
+
+    def current_booking_filters(self):
+        """Условия выбранного пункта фильтра бронирований"""
+        return self.BOOKING_FILTERS[max(self.filter_combo.currentIndex(), 0)][1]
+
+    def load_more_bookings(self):
+        """Догрузка следующей страницы, если таблица видна и прокручена до конца"""
+        # У скрытой таблицы maximum() == 0: без проверки видимости она выкачала бы все страницы
+        scroll_bar = self.bookings_table.verticalScrollBar()
+        if (self.has_more_bookings and not self.executor.is_loading('bookings')
+                and self.bookings_table.isVisible() and scroll_bar.value() >= scroll_bar.maximum()):
+            self.executor.submit('bookings', Database.get_all_bookings, self.current_booking_filters(),
+                                 queries.page_cursor(self.bookings),
+                                 on_result=self.append_bookings, on_error=self.show_load_error)
+
+    def show_first_page(self, result):
+        """Первая страница: счетчики в подписях фильтра, строки в таблицу"""
+        bookings, counts = result
+        for index, (label, _, key) in enumerate(self.BOOKING_FILTERS):
+            self.filter_combo.setItemText(index, f'{label} ({counts.get(key, 0)})')
+
+        self.append_bookings(bookings)
+
+    def show_load_error(self, message):
+        """Показать ошибку загрузки"""
+        QMessageBox.critical(self, 'Ошибка', message)
+
+    def show_loading(self, key, loading):
+        """Индикация фоновой загрузки в заголовках вкладок"""
+        tabs = {'bookings': (self.bookings_tab, '📋 Все бронирования'),
+                'users': (self.users_tab, '👥 Управление пользователями')}
+        if key not in tabs:
             return
 
-        all_bookings = self.db.get_all_bookings()
-        self.db.disconnect()
+        tab, text = tabs[key]
+        self.tab_widget.setTabText(self.tab_widget.indexOf(tab), f'⏳ {text}' if loading else text)
 
-        if not all_bookings:
-            self.bookings_table.setRowCount(0)
-            return
+    def append_bookings(self, bookings):
+        """Добавление страницы бронирований в конец таблицы"""
+        self.bookings.extend(bookings)
+        self.has_more_bookings = len(bookings) == Config.BOOKINGS_PAGE_SIZE
 
-        # Фильтруем бронирования
-        filter_text = self.filter_combo.currentText()
-        if filter_text == 'Оплаченные (ожидают подтверждения)':
-            bookings = [b for b in all_bookings if
-                        (b['status'] == 'оплачен' or b['status'] == 'paid') and  # Добавлено 'paid'
-                        not b['confirmed_by_admin']]
-        elif filter_text == 'Подтвержденные':
-            bookings = [b for b in all_bookings if b['confirmed_by_admin']]
-        elif filter_text == 'Отмененные':
-            bookings = [b for b in all_bookings if b['status'] in ['отменено', 'canceled']]  # Добавлено 'canceled'
-        elif filter_text == 'Забронированные':
-            bookings = [b for b in all_bookings if b['status'] in ['забронирован', 'booked']]  # Добавлено 'booked'
-        else:
-            bookings = all_bookings
-
-        # Заполняем таблицу
-        self.bookings_table.setRowCount(len(bookings))
-
-        for row, booking in enumerate(bookings):
-            self.bookings_table.setItem(row, 0, QTableWidgetItem(str(booking['booking_id'])))
-            self.bookings_table.setItem(row, 1, QTableWidgetItem(booking['full_name']))
-            self.bookings_table.setItem(row, 2,
-                                        QTableWidgetItem(f"{booking['train_name']} ({booking['train_number']})"))
-
-            route = f"{booking['departure_station']} → {booking['arrival_station']}"
-            self.bookings_table.setItem(row, 3, QTableWidgetItem(route))
-
-            departure = booking['departure_time'].strftime('%d.%m.%Y %H:%M')
-            self.bookings_table.setItem(row, 4, QTableWidgetItem(departure))
-
-            self.bookings_table.setItem(row, 5,
-                                        QTableWidgetItem(f"{booking['user_full_name']} ({booking['created_by_user']})"))
-
-            # Статус - нормализуем строки статуса
-            status = booking['status'].lower() if booking['status'] else ''
-            confirmed = booking['confirmed_by_admin']
-
-            if confirmed:
-                status_text = '✅ Подтверждено'
-            elif status in ['оплачен', 'paid', 'payment']:
-                status_text = '💰 Оплачено'
-            elif status in ['забронирован', 'booked', 'reserved']:
-                status_text = '⏳ Забронировано'
-            elif status in ['отменено', 'canceled', 'cancelled']:
-                status_text = '❌ Отменено'
-            else:
-                status_text = booking['status']  # Оставляем оригинальный текст
-
-            status_item = QTableWidgetItem(status_text)
-            if 'Подтверждено' in status_text:
-                status_item.setBackground(QColor(220, 255, 220))
-            elif 'Оплачено' in status_text:
-                status_item.setBackground(QColor(255, 255, 200))
-            elif 'Забронировано' in status_text:
-                status_item.setBackground(QColor(255, 245, 200))
-            else:
-                status_item.setBackground(QColor(255, 220, 220))
-
-            self.bookings_table.setItem(row, 6, status_item)
-
-            self.bookings_table.setItem(row, 7, QTableWidgetItem(f"{booking['final_price']:.2f} ₽"))
-
-            # Подтверждено админом
-            confirmed_item = QTableWidgetItem('✅ Да' if confirmed else '❌ Нет')
-            self.bookings_table.setItem(row, 8, confirmed_item)
-
-            # Действия
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout()
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-
-            # Кнопка отправки email
-            email_btn = QPushButton('📧 Email')
-            email_btn.setStyleSheet(f'''
-                QPushButton {{
-                    background-color: {Config.COLORS["secondary"]};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 5px;
-                    font-size: {Config.FONT_SIZES["small"]}px;
-                }}
-                QPushButton:hover {{
-                    background-color: #1976D2;
-                }}
-            ''')
-            email_btn.clicked.connect(lambda checked, bid=booking['booking_id']: self.send_ticket_email(bid))
-            actions_layout.addWidget(email_btn)
-
-            # Показываем кнопку подтверждения для всех НЕ подтвержденных бронирований,
-            # кроме отмененных
-            if not confirmed and status not in ['отменено', 'canceled', 'cancelled']:
-                confirm_btn = QPushButton('✅ Подтвердить')
-                confirm_btn.setStyleSheet(f'''
-                    QPushButton {{
-                        background-color: {Config.COLORS["success"]};
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 5px;
-                        font-size: {Config.FONT_SIZES["small"]}px;
-                    }}
-                    QPushButton:hover {{
-                        background-color: #45a049;
-                    }}
-                ''')
-                confirm_btn.clicked.connect(lambda checked, bid=booking['booking_id']: self.confirm_booking(bid))
-                actions_layout.addWidget(confirm_btn)
-
-            view_btn = QPushButton('👁 Просмотр')
-            view_btn.setStyleSheet(f'''
-                QPushButton {{
-                    background-color: {Config.COLORS["warning"]};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 5px;
-                    font-size: {Config.FONT_SIZES["small"]}px;
-                }}
-                QPushButton:hover {{
-                    background-color: #FF5722;
-                }}
-            ''')
-            view_btn.clicked.connect(lambda checked, bid=booking['booking_id']: self.view_booking_details(bid))
-            actions_layout.addWidget(view_btn)
-
-            if status in ['забронирован', 'booked', 'reserved', 'оплачен', 'paid']:
-                cancel_btn = QPushButton('❌ Отменить')
-                cancel_btn.setStyleSheet(f'''
-                    QPushButton {{
-                        background-color: {Config.COLORS["danger"]};
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 5px;
-                        font-size: {Config.FONT_SIZES["small"]}px;
-                    }}
-                    QPushButton:hover {{
-                        background-color: #d32f2f;
-                    }}
-                ''')
-                cancel_btn.clicked.connect(lambda checked, bid=booking['booking_id']: self.cancel_booking(bid))
-                actions_layout.addWidget(cancel_btn)
-
-            actions_layout.addStretch()
-            actions_widget.setLayout(actions_layout)
-            self.bookings_table.setCellWidget(row, 9, actions_widget)
+        self.bookings_table.append_rows(bookings)
+
+        # Если строк не хватило для прокрутки, сразу догружаем следующую страницу
+        QTimer.singleShot(0, self.load_more_bookings)
 
     def load_all_users(self):
         """Загрузка всех пользователей"""
-        if not self.db.connect():
-            QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
-            return
+        self.executor.submit('users', Database.get_all_users,
+                             on_result=self.fill_users_table, on_error=self.show_load_error)
 
-        users = self.db.get_all_users()
-        self.db.disconnect()
+    def fill_users_table(self, users):
+        """Заполнение таблицы пользователей"""
+        self.users_table.set_rows(users or [])
 
-        if not users:
-            self.users_table.setRowCount(0)
+    def show_booking_menu(self, position):
+        """Контекстное меню бронирования: действия зависят от статуса"""
+        booking = self.bookings_table.record_at(self.bookings_table.indexAt(position))
+        if not booking:
             return
 
-        # Заполняем таблицу
-        self.users_table.setRowCount(len(users))
+        booking_id = booking['booking_id']
+        status = normalized_status(booking)
+        menu = QMenu(self)
 
-        for row, user in enumerate(users):
-            self.users_table.setItem(row, 0, QTableWidgetItem(str(user['id'])))
-            self.users_table.setItem(row, 1, QTableWidgetItem(user['username']))
-            self.users_table.setItem(row, 2, QTableWidgetItem(user['full_name']))
+        menu.addAction('👁 Просмотр', lambda: self.view_booking_details(booking_id))
+        menu.addAction('📧 Отправить билет на email', lambda: self.send_ticket_email(booking_id))
 
-            # Роль
-            role_item = QTableWidgetItem(user['role'])
-            if user['role'] == 'admin':
-                role_item.setBackground(QColor(255, 220, 220))
-            else:
-                role_item.setBackground(QColor(220, 255, 220))
-            self.users_table.setItem(row, 3, role_item)
+        # Подтверждение - для всех НЕ подтвержденных бронирований, кроме отмененных
+        confirm_action = menu.addAction('✅ Подтвердить', lambda: self.confirm_booking(booking_id))
+        confirm_action.setEnabled(not booking['confirmed_by_admin'] and status not in CANCELLED_STATUSES)
 
-            # Дата регистрации
-            date = user['created_at'].strftime('%d.%m.%Y %H:%M')
-            self.users_table.setItem(row, 4, QTableWidgetItem(date))
+        cancel_action = menu.addAction('❌ Отменить', lambda: self.cancel_booking(booking_id))
+        cancel_action.setEnabled(status in BOOKED_STATUSES + ['оплачен', 'paid'])
 
-            # Действия
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout()
-            actions_layout.setContentsMargins(0, 0, 0, 0)
+        menu.exec_(self.bookings_table.viewport().mapToGlobal(position))
 
-            if user['id'] != self.user.id:  # Нельзя менять свою роль
-                role_combo = QComboBox()
-                role_combo.addItems(['user', 'admin'])
-                role_combo.setCurrentText(user['role'])
-                role_combo.setProperty('user_id', user['id'])
-                role_combo.currentTextChanged.connect(self.change_user_role)
+    def show_user_menu(self, position):
+        """Контекстное меню пользователя: смена роли"""
+        user = self.users_table.record_at(self.users_table.indexAt(position))
+        if not user or user['id'] == self.user.id:  # Нельзя менять свою роль
+            return
 
-                actions_layout.addWidget(role_combo)
+        menu = QMenu(self)
+        for role in ('user', 'admin'):
+            action = menu.addAction(f'Роль: {role}',
+                                    lambda checked=False, role=role: self.change_user_role(user['id'], role))
+            action.setEnabled(role != user['role'])
 
-            actions_layout.addStretch()
-            actions_widget.setLayout(actions_layout)
-            self.users_table.setCellWidget(row, 5, actions_widget)
+        menu.exec_(self.users_table.viewport().mapToGlobal(position))
 
     def confirm_booking(self, booking_id):
         """Подтверждение бронирования администратором"""
@@ -415,32 +361,21 @@ class AdminPage(QWidget):
         dialog.setWindowTitle(f'Детали бронирования №{details["booking_id"]}')
         dialog.setFixedSize(500, 700)  # Увеличили высоту
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(dialog)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel(f'БРОНИРОВАНИЕ №{details["booking_id"]}')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["large"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='dialog-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
         # Информация
         info_frame = QFrame()
-        info_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f9f9f9;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                padding: 20px;
-            }
-        ''')
-
-        info_layout = QFormLayout()
+        themed(info_frame, role='panel')
+
+        info_layout = QFormLayout(info_frame)
         info_layout.setSpacing(10)
 
         # Пассажир
@@ -487,8 +422,6 @@ class AdminPage(QWidget):
         info_layout.addRow('Создано пользователем:', QLabel(details['created_by_user']))
         info_layout.addRow('Дата бронирования:', QLabel(details['booking_date'].strftime('%d.%m.%Y %H:%M')))
         info_layout.addRow('Стоимость:', QLabel(f"{details['final_price']:.2f} ₽"))
-
-        info_frame.setLayout(info_layout)
         layout.addWidget(info_frame)
 
         # Кнопки
@@ -497,81 +430,31 @@ class AdminPage(QWidget):
         # Кнопка отправки email
         email_btn = QPushButton('📧 Отправить билет')
         email_btn.setMinimumHeight(40)
-        email_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #1976D2;
-            }}
-        ''')
+        themed(email_btn, variant='secondary')
         email_btn.clicked.connect(lambda: self.send_ticket_email(details['booking_id']))
         buttons_layout.addWidget(email_btn)
 
         if not confirmed and status not in ['отменено', 'canceled', 'cancelled']:
             confirm_btn = QPushButton('✅ Подтвердить бронирование')
             confirm_btn.setMinimumHeight(40)
-            confirm_btn.setStyleSheet(f'''
-                QPushButton {{
-                    background-color: {Config.COLORS["success"]};
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: {Config.FONT_SIZES["normal"]}px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{
-                    background-color: #45a049;
-                }}
-            ''')
+            themed(confirm_btn, variant='success')
             confirm_btn.clicked.connect(lambda: self.confirm_and_close(details['booking_id'], dialog))
             buttons_layout.addWidget(confirm_btn)
 
         if status in ['забронирован', 'booked', 'reserved', 'оплачен', 'paid']:
             cancel_btn = QPushButton('❌ Отменить бронирование')
             cancel_btn.setMinimumHeight(40)
-            cancel_btn.setStyleSheet(f'''
-                QPushButton {{
-                    background-color: {Config.COLORS["danger"]};
-                    color: white;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: {Config.FONT_SIZES["normal"]}px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{
-                    background-color: #d32f2f;
-                }}
-            ''')
+            themed(cancel_btn, variant='danger')
             cancel_btn.clicked.connect(lambda: self.cancel_and_close(details['booking_id'], dialog))
             buttons_layout.addWidget(cancel_btn)
 
         close_btn = QPushButton('Закрыть')
         close_btn.setMinimumHeight(40)
-        close_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["primary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(close_btn, variant='primary')
         close_btn.clicked.connect(dialog.accept)
         buttons_layout.addWidget(close_btn)
 
         layout.addLayout(buttons_layout)
-
-        dialog.setLayout(layout)
         dialog.exec_()
 
     def confirm_and_close(self, booking_id, dialog):
@@ -603,11 +486,8 @@ class AdminPage(QWidget):
 
             self.db.disconnect()
 
-    def change_user_role(self, new_role):
+    def change_user_role(self, user_id, new_role):
         """Изменение роли пользователя"""
-        combo = self.sender()
-        user_id = combo.property('user_id')
-
         reply = QMessageBox.question(self, 'Изменение роли',
                                      f'Изменить роль пользователя на "{new_role}"?',
                                      QMessageBox.Yes | QMessageBox.No)
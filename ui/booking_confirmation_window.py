@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
-from config import Config
+from ui.theme import themed
 
 
 class BookingConfirmationWindow(QDialog):
@@ -15,38 +15,29 @@ class BookingConfirmationWindow(QDialog):
         self.passenger_data = passenger_data
         self.user_id = user_id
         self.db = Database()
+        # Место заняли в другой кассе, пока окно было открыто
+        self.seat_taken = False
         self.init_ui()
 
     def init_ui(self):
         self.setWindowTitle('Подтверждение бронирования')
         self.setFixedSize(800, 900)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(50)
 
         # Заголовок
         title = QLabel('ПОДТВЕРЖДЕНИЕ БРОНИРОВАНИЯ')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["large"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='dialog-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
         # Информация о бронировании
         info_frame = QFrame()
-        info_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f9f9f9;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                padding: 20px;
-            }
-        ''')
-
-        info_layout = QFormLayout()
+        themed(info_frame, role='panel')
+
+        info_layout = QFormLayout(info_frame)
         info_layout.setSpacing(10)
         info_layout.setLabelAlignment(Qt.AlignRight)
 
@@ -62,16 +53,17 @@ class BookingConfirmationWindow(QDialog):
                 r.base_price,
                 t.train_name,
                 t.train_number,
-                s.seat_number,
-                s.carriage_number,
-                s.seat_type
+                COALESCE(s.seat_number, ls.seat_number) as seat_number,
+                COALESCE(s.carriage_number, ls.carriage_number) as carriage_number,
+                COALESCE(s.seat_type, ls.seat_type) as seat_type
             FROM routes r
             JOIN trains t ON r.train_id = t.id
-            JOIN seats s ON s.id = %s
+            LEFT JOIN seats s ON s.id = %s AND s.route_id = r.id
+            LEFT JOIN layout_seats ls ON ls.id = %s AND ls.layout_id = r.seat_layout_id
             WHERE r.id = %s
             """
 
-            self.db.cursor.execute(query, (self.seat_id, self.route_id))
+            self.db.cursor.execute(query, (self.seat_id, self.seat_id, self.route_id))
             route_info = self.db.cursor.fetchone()
             self.db.disconnect()
 
@@ -95,27 +87,12 @@ class BookingConfirmationWindow(QDialog):
             info_layout.addRow('Цена:', QLabel(f"{route_info['base_price']:.2f} ₽"))
         else:
             info_layout.addRow('Ошибка:', QLabel('Не удалось загрузить информацию'))
-
-        info_frame.setLayout(info_layout)
         layout.addWidget(info_frame)
 
         # Оплата
         payment_group = QGroupBox('Способ оплаты')
-        payment_group.setStyleSheet(f'''
-            QGroupBox {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-                border: 1px solid #ddd;
-                border-radius: 6px;
-                padding-top: 15px;
-            }}
-            QGroupBox::title {{
-                color: {Config.COLORS["dark"]};
-                padding: 0 10px;
-            }}
-        ''')
-
-        payment_layout = QVBoxLayout()
+
+        payment_layout = QVBoxLayout(payment_group)
 
         self.cash_radio = QRadioButton('Наличные (оплата при получении)')
         self.card_radio = QRadioButton('Банковская карта (оплата сейчас)')
@@ -123,34 +100,19 @@ class BookingConfirmationWindow(QDialog):
 
         payment_layout.addWidget(self.cash_radio)
         payment_layout.addWidget(self.card_radio)
-        payment_group.setLayout(payment_layout)
 
         layout.addWidget(payment_group)
 
         # Блок для отправки email
         email_frame = QFrame()
-        email_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f0f8ff;
-                border: 1px solid #b0d0ff;
-                border-radius: 6px;
-                padding: 15px;
-                margin-top: 10px;
-            }
-        ''')
-
-        email_layout = QVBoxLayout()
+        themed(email_frame, role='note-panel')
+
+        email_layout = QVBoxLayout(email_frame)
 
         # Чекбокс для отправки на email
         self.send_email_checkbox = QCheckBox('📧 Отправить электронный билет на email')
         self.send_email_checkbox.setChecked(True)
-        self.send_email_checkbox.setStyleSheet(f'''
-            QCheckBox {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-                color: {Config.COLORS["primary"]};
-            }}
-        ''')
+        themed(self.send_email_checkbox, role='accent')
 
         # Поле для email
         email_field_layout = QHBoxLayout()
@@ -159,18 +121,6 @@ class BookingConfirmationWindow(QDialog):
         self.email_input = QLineEdit()
         self.email_input.setPlaceholderText('example@mail.ru')
         self.email_input.setMinimumHeight(35)
-        self.email_input.setStyleSheet(f'''
-            QLineEdit {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 5px;
-                border: 1px solid #ccc;
-                border-radius: 4px;
-                background-color: white;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {Config.COLORS["primary"]};
-            }}
-        ''')
         # Устанавливаем тестовый email
         self.email_input.setText('passenger@example.com')
 
@@ -179,14 +129,12 @@ class BookingConfirmationWindow(QDialog):
 
         email_layout.addWidget(self.send_email_checkbox)
         email_layout.addLayout(email_field_layout)
-        email_frame.setLayout(email_layout)
 
         layout.addWidget(email_frame)
 
         # Примечание
         note = QLabel('* При оплате картой необходимо дополнительное подтверждение администратора')
-        note.setStyleSheet(
-            f'color: {Config.COLORS["dark"]}; font-size: {Config.FONT_SIZES["small"]}px; font-style: italic;')
+        themed(note, role='note')
         layout.addWidget(note)
 
         # Кнопки
@@ -194,43 +142,18 @@ class BookingConfirmationWindow(QDialog):
 
         confirm_btn = QPushButton('✅ Подтвердить бронирование')
         confirm_btn.setMinimumHeight(50)
-        confirm_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-        ''')
+        themed(confirm_btn, variant='success')
         confirm_btn.clicked.connect(self.confirm_booking)
 
         cancel_btn = QPushButton('Отмена')
         cancel_btn.setMinimumHeight(50)
-        cancel_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["danger"]};
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #d32f2f;
-            }}
-        ''')
+        themed(cancel_btn, variant='danger')
         cancel_btn.clicked.connect(self.reject)
 
         buttons_layout.addWidget(confirm_btn)
         buttons_layout.addWidget(cancel_btn)
 
         layout.addLayout(buttons_layout)
-        self.setLayout(layout)
 
     def confirm_booking(self):
         """Подтверждение бронирования"""
@@ -245,10 +168,12 @@ class BookingConfirmationWindow(QDialog):
                     return
 
             if self.db.connect():
-                booking_id = self.db.create_booking(self.passenger_data, self.seat_id, self.route_id, self.user_id)
+                result = self.db.create_booking(self.passenger_data, self.seat_id, self.route_id, self.user_id)
                 self.db.disconnect()
 
-                if booking_id:
+                if result.success:
+                    booking_id = result.booking_id
+
                     # Определяем способ оплаты
                     payment_method = "наличные" if self.cash_radio.isChecked() else "карта"
 
@@ -277,8 +202,14 @@ class BookingConfirmationWindow(QDialog):
 
                     QMessageBox.information(self, 'Успех', success_message)
                     self.accept()
+                elif result.seat_taken:
+                    self.seat_taken = True
+                    QMessageBox.warning(self, 'Место занято',
+                                        'Это место только что забронировано в другой кассе.\n'
+                                        'Выберите другое место.')
+                    self.reject()
                 else:
-                    QMessageBox.critical(self, 'Ошибка', 'Не удалось создать бронирование. Возможно, место уже занято.')
+                    QMessageBox.critical(self, 'Ошибка', 'Не удалось создать бронирование')
             else:
                 QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
 
@@ -301,14 +232,14 @@ class BookingConfirmationWindow(QDialog):
         dialog.setWindowTitle('Билет отправлен!')
         dialog.setFixedSize(400, 250)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(dialog)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Иконка успеха
         icon_label = QLabel('📧')
         icon_label.setAlignment(Qt.AlignCenter)
-        icon_label.setStyleSheet('font-size: 60px;')
+        themed(icon_label, role='icon')
         layout.addWidget(icon_label)
 
         # Текст сообщения
@@ -316,42 +247,20 @@ class BookingConfirmationWindow(QDialog):
                                f'успешно отправлен на адрес:\n'
                                f'<b>{email}</b>')
         message_label.setAlignment(Qt.AlignCenter)
-        message_label.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["normal"]}px;
-            color: {Config.COLORS["dark"]};
-            padding: 10px;
-        ''')
+        themed(message_label, role='message')
         layout.addWidget(message_label)
 
         # Дополнительная информация
         info_label = QLabel('Проверьте папку "Входящие" или "Спам"\n'
                             'Письмо должно прийти в течение 5 минут')
         info_label.setAlignment(Qt.AlignCenter)
-        info_label.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["small"]}px;
-            color: #666;
-            font-style: italic;
-        ''')
+        themed(info_label, role='hint')
         layout.addWidget(info_label)
 
         # Кнопка OK
         ok_btn = QPushButton('OK')
         ok_btn.setMinimumHeight(40)
-        ok_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-        ''')
+        themed(ok_btn, variant='success')
         ok_btn.clicked.connect(dialog.accept)
         layout.addWidget(ok_btn)
-
-        dialog.setLayout(layout)
         dialog.exec_()
\ No newline at end of file
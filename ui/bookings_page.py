@@ -3,30 +3,90 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
 from config import Config
+from ui.theme import themed
+from ui.db_worker import DbExecutor
+from ui.table_models import Column, RecordTableView
+import queries
+
+
+# Цвета ячейки статуса
+STATUS_CONFIRMED = QColor(220, 255, 220)  # светло-зеленый
+STATUS_PAID = QColor(255, 255, 200)  # светло-желтый
+STATUS_BOOKED = QColor(255, 245, 200)  # светло-оранжевый
+STATUS_CANCELLED = QColor(255, 220, 220)  # светло-красный
+
+
+def status_text(booking):
+    """Текст статуса бронирования для таблицы"""
+    status = booking['status']
+    if booking.get('confirmed_by_admin'):
+        return '✅ Подтверждено'
+    if status == 'оплачен':
+        return '💰 Оплачено'
+    if status == 'забронирован':
+        return '⏳ Забронировано'
+    if status == 'подтвержден':
+        return '✅ Подтверждено'
+    return '❌ Отменено'
+
+
+def status_color(booking):
+    """Цвет фона статуса бронирования"""
+    text = status_text(booking)
+    if 'Подтверждено' in text:
+        return STATUS_CONFIRMED
+    if 'Оплачено' in text:
+        return STATUS_PAID
+    if 'Забронировано' in text:
+        return STATUS_BOOKED
+    return STATUS_CANCELLED
+
+
+# Колонки таблицы бронирований
+BOOKING_COLUMNS = [
+    Column('ID', 'booking_id'),
+    Column('Пассажир', 'full_name'),
+    Column('Поезд', 'train_name'),
+    Column('Маршрут', 'departure_station',
+           lambda booking: f"{booking['departure_station']} → {booking['arrival_station']}"),
+    Column('Дата', 'booking_date', lambda booking: booking['booking_date'].strftime('%d.%m.%Y %H:%M')),
+    Column('Статус', 'status', status_text, background=status_color),
+    Column('Цена', 'final_price', lambda booking: f"{booking['final_price']:.2f} ₽"),
+    Column('Подтверждено', 'confirmed_by_admin',
+           lambda booking: '✅ Да' if booking.get('confirmed_by_admin') else '❌ Нет')
+]
 
 
 class BookingsPage(QWidget):
     """Страница бронирований"""
 
-    def __init__(self, user):
-        super().__init__()
+    # Пункты фильтра: подпись, условия для Database.get_user_bookings, ключ счетчика
+    FILTERS = [
+        ('Все бронирования', {}, 'total'),
+        ('Забронированные', {'status': 'забронирован'}, 'booked'),
+        ('Оплаченные', {'status': 'оплачен'}, 'paid'),
+        ('Подтвержденные', {'confirmed': True}, 'confirmed'),
+        ('Отмененные', {'status': 'отменено'}, 'cancelled')
+    ]
+
+    def __init__(self, user, parent=None):
+        super().__init__(parent)
         self.user = user
         self.db = Database()
+        self.executor = DbExecutor(self)
+        # Загруженные страницы бронирований
+        self.bookings = []
+        self.has_more_bookings = False
         self.init_ui()
 
     def init_ui(self):
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('МОИ БРОНИРОВАНИЯ')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["xxlarge"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["dark"]};
-            margin-bottom: 10px;
-        ''')
+        themed(title, role='page-title')
         layout.addWidget(title)
 
         # Панель управления
@@ -34,33 +94,14 @@ class BookingsPage(QWidget):
 
         refresh_btn = QPushButton('🔄 Обновить список')
         refresh_btn.setMinimumHeight(40)
-        refresh_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(refresh_btn, variant='secondary')
         refresh_btn.clicked.connect(self.load_bookings)
 
         self.filter_combo = QComboBox()
-        self.filter_combo.addItems(
-            ['Все бронирования', 'Забронированные', 'Оплаченные', 'Подтвержденные', 'Отмененные'])
+        self.filter_combo.addItems([label for label, _, _ in self.FILTERS])
         self.filter_combo.setMinimumHeight(40)
-        self.filter_combo.setStyleSheet(f'''
-            QComboBox {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 5px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-        ''')
-        self.filter_combo.currentTextChanged.connect(self.load_bookings)
+        # Подписи пунктов меняются вместе со счетчиками, поэтому следим за индексом, а не текстом
+        self.filter_combo.currentIndexChanged.connect(self.load_bookings)
 
         control_layout.addWidget(refresh_btn)
         control_layout.addWidget(QLabel('Фильтр:'))
@@ -70,36 +111,29 @@ class BookingsPage(QWidget):
         layout.addLayout(control_layout)
 
         # Таблица бронирований
-        self.bookings_table = QTableWidget()
-        self.bookings_table.setColumnCount(8)
-        self.bookings_table.setHorizontalHeaderLabels(
-            ['ID', 'Пассажир', 'Поезд', 'Маршрут', 'Дата', 'Статус', 'Цена', 'Подтверждено'])
-        self.bookings_table.horizontalHeader().setStretchLastSection(True)
-        self.bookings_table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.bookings_table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.bookings_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.bookings_table = RecordTableView(BOOKING_COLUMNS)
+
+        # Поиск по загруженным бронированиям
+        control_layout.addWidget(self.bookings_table.create_search_edit())
 
         # Устанавливаем контекстное меню
         self.bookings_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.bookings_table.customContextMenuRequested.connect(self.show_context_menu)
 
+        # Следующая страница догружается при прокрутке к концу таблицы
+        self.bookings_table.verticalScrollBar().valueChanged.connect(self.load_more_bookings)
+        # Скрытая таблица не догружается - проверка повторяется, когда ее покажут
+        self.bookings_table.shown.connect(self.load_more_bookings)
+
         layout.addWidget(self.bookings_table)
 
         # Статистика
         self.stats_label = QLabel('')
-        self.stats_label.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["normal"]}px;
-            color: {Config.COLORS["dark"]};
-            padding: 10px;
-            background-color: #f9f9f9;
-            border-radius: 6px;
-        ''')
+        themed(self.stats_label, role='stats')
         layout.addWidget(self.stats_label)
 
         layout.addStretch()
 
-        self.setLayout(layout)
-
         # Загружаем данные при создании
         self.load_bookings()
 
@@ -126,134 +160,91 @@ class BookingsPage(QWidget):
 
     def show_context_menu(self, position):
         """Показать контекстное меню"""
-        index = self.bookings_table.indexAt(position)
-        if index.isValid():
+        booking = self.bookings_table.record_at(self.bookings_table.indexAt(position))
+        if booking:
             # Проверяем статус выбранного бронирования
-            row = index.row()
-            status_item = self.bookings_table.item(row, 5)
-            if status_item:
-                status_text = status_item.text()
+            text = status_text(booking)
 
-                # Включаем/отключаем действия в зависимости от статуса
-                self.cancel_action.setEnabled('Забронировано' in status_text or 'Оплачено' in status_text)
-                self.pay_action.setEnabled('Забронировано' in status_text)
-                self.email_action.setEnabled(True)  # Всегда доступна для отправки email
+            # Включаем/отключаем действия в зависимости от статуса
+            self.cancel_action.setEnabled('Забронировано' in text or 'Оплачено' in text)
+            self.pay_action.setEnabled('Забронировано' in text)
+            self.email_action.setEnabled(True)  # Всегда доступна для отправки email
 
-                self.context_menu.exec_(self.bookings_table.viewport().mapToGlobal(position))
+            self.context_menu.exec_(self.bookings_table.viewport().mapToGlobal(position))
 
     def load_bookings(self):
-        """Загрузка списка бронирований"""
-        if not self.db.connect():
-            QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
-            return
-
-        # Получаем бронирования пользователя
-        all_bookings = self.db.get_user_bookings(self.user.id)
-        self.db.disconnect()
-
-        if not all_bookings:
-            self.bookings_table.setRowCount(0)
+        """Загрузка списка бронирований с первой страницы вместе со счетчиками"""
+        self.bookings = []
+        self.has_more_bookings = False
+        self.bookings_table.set_rows([])
+        self.stats_label.setText('⏳ Загрузка бронирований...')
+
+        self.executor.submit('bookings', Database.get_user_bookings_with_counts, self.user.id, self.current_filters(),
+                             on_result=self.show_first_page, on_error=self.show_load_error)
+
+    def current_filters(self):
+        """Условия выбранного пункта фильтра"""
+        return self.FILTERS[max(self.filter_combo.currentIndex(), 0)][1]
+
+    def load_more_bookings(self):
+        """Догрузка следующей страницы, если таблица видна и прокручена до конца"""
+        # У скрытой таблицы maximum() == 0: без проверки видимости она выкачала бы все страницы
+        scroll_bar = self.bookings_table.verticalScrollBar()
+        if (self.has_more_bookings and not self.executor.is_loading('bookings')
+                and self.bookings_table.isVisible() and scroll_bar.value() >= scroll_bar.maximum()):
+            self.executor.submit('bookings', Database.get_user_bookings, self.user.id, self.current_filters(),
+                                 queries.page_cursor(self.bookings),
+                                 on_result=self.append_bookings, on_error=self.show_load_error)
+
+    def show_load_error(self, message):
+        """Показать ошибку загрузки"""
+        self.stats_label.setText('Не удалось загрузить бронирования')
+        QMessageBox.critical(self, 'Ошибка', message)
+
+    def show_first_page(self, result):
+        """Первая страница: счетчики в подписях фильтра и статистике, строки в таблицу"""
+        bookings, counts = result
+        self.show_counts(counts)
+        self.append_bookings(bookings)
+
+    def show_counts(self, counts):
+        """Обновление подписей фильтра и статистики по счетчикам с сервера"""
+        for index, (label, _, key) in enumerate(self.FILTERS):
+            self.filter_combo.setItemText(index, f'{label} ({counts.get(key, 0)})')
+
+        if not counts.get('total'):
             self.stats_label.setText('Нет активных бронирований')
             return
 
-        # Фильтруем бронирования
-        filter_text = self.filter_combo.currentText()
-        if filter_text == 'Забронированные':
-            bookings = [b for b in all_bookings if b['status'] == 'забронирован']
-        elif filter_text == 'Оплаченные':
-            bookings = [b for b in all_bookings if b['status'] == 'оплачен']
-        elif filter_text == 'Подтвержденные':
-            bookings = [b for b in all_bookings if
-                        b.get('confirmed_by_admin') == 1 or b.get('confirmed_by_admin') == True]
-        elif filter_text == 'Отмененные':
-            bookings = [b for b in all_bookings if b['status'] == 'отменено']
-        else:
-            bookings = all_bookings
-
-        # Заполняем таблицу
-        self.bookings_table.setRowCount(len(bookings))
-
-        total_amount = 0
-        status_counts = {'забронировано': 0, 'оплачено': 0, 'подтверждено': 0, 'отменено': 0}
-
-        for row, booking in enumerate(bookings):
-            self.bookings_table.setItem(row, 0, QTableWidgetItem(str(booking['booking_id'])))
-            self.bookings_table.setItem(row, 1, QTableWidgetItem(booking['full_name']))
-            self.bookings_table.setItem(row, 2, QTableWidgetItem(booking['train_name']))
-
-            route = f"{booking['departure_station']} → {booking['arrival_station']}"
-            self.bookings_table.setItem(row, 3, QTableWidgetItem(route))
-
-            date = booking['booking_date'].strftime('%d.%m.%Y %H:%M')
-            self.bookings_table.setItem(row, 4, QTableWidgetItem(date))
-
-            # Определяем цвет и текст статуса
-            status = booking['status']
-            confirmed = booking.get('confirmed_by_admin', False)
-
-            if confirmed:
-                status_text = '✅ Подтверждено'
-                status_counts['подтверждено'] += 1
-                total_amount += booking['final_price']
-            elif status == 'оплачен':
-                status_text = '💰 Оплачено'
-                status_counts['оплачено'] += 1
-                total_amount += booking['final_price']
-            elif status == 'забронирован':
-                status_text = '⏳ Забронировано'
-                status_counts['забронировано'] += 1
-            elif status == 'подтвержден':
-                status_text = '✅ Подтверждено'
-                status_counts['подтверждено'] += 1
-                total_amount += booking['final_price']
-            else:
-                status_text = '❌ Отменено'
-                status_counts['отменено'] += 1
-
-            status_item = QTableWidgetItem(status_text)
-
-            # Устанавливаем цвет фона для статуса
-            if 'Подтверждено' in status_text:
-                status_item.setBackground(QColor(220, 255, 220))  # светло-зеленый
-            elif 'Оплачено' in status_text:
-                status_item.setBackground(QColor(255, 255, 200))  # светло-желтый
-            elif 'Забронировано' in status_text:
-                status_item.setBackground(QColor(255, 245, 200))  # светло-оранжевый
-            else:
-                status_item.setBackground(QColor(255, 220, 220))  # светло-красный
-
-            self.bookings_table.setItem(row, 5, status_item)
-
-            # Цена
-            price_item = QTableWidgetItem(f"{booking['final_price']:.2f} ₽")
-            self.bookings_table.setItem(row, 6, price_item)
-
-            # Подтверждено
-            confirmed_item = QTableWidgetItem('✅ Да' if confirmed else '❌ Нет')
-            self.bookings_table.setItem(row, 7, confirmed_item)
-
-        # Обновляем статистику
         stats_text = f'''
-        Всего бронирований: {len(all_bookings)} | 
-        Забронировано: {status_counts['забронировано']} | 
-        Оплачено: {status_counts['оплачено']} | 
-        Подтверждено: {status_counts['подтверждено']} |
-        Отменено: {status_counts['отменено']} |
-        Общая сумма: {total_amount:.2f} ₽
+        Всего бронирований: {counts['total']} | 
+        Забронировано: {counts['booked']} | 
+        Оплачено: {counts['paid']} | 
+        Подтверждено: {counts['confirmed']} |
+        Отменено: {counts['cancelled']} |
+        Общая сумма: {counts['paid_amount']:.2f} ₽
         '''
         self.stats_label.setText(stats_text)
 
+    def append_bookings(self, bookings):
+        """Добавление страницы бронирований в конец таблицы"""
+        self.bookings.extend(bookings)
+        self.has_more_bookings = len(bookings) == Config.BOOKINGS_PAGE_SIZE
+
+        self.bookings_table.append_rows(bookings)
+
+        # Если строк не хватило для прокрутки, сразу догружаем следующую страницу
+        QTimer.singleShot(0, self.load_more_bookings)
+
     def view_booking_details(self):
         """Просмотр деталей бронирования"""
-        current_row = self.bookings_table.currentRow()
-        if current_row >= 0:
-            booking_id = self.bookings_table.item(current_row, 0).text()
-
+        booking = self.bookings_table.current_record()
+        if booking:
             if not self.db.connect():
                 QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
                 return
 
-            details = self.db.get_booking_details(int(booking_id))
+            details = self.db.get_booking_details(booking['booking_id'])
             self.db.disconnect()
 
             if details:
@@ -265,32 +256,21 @@ class BookingsPage(QWidget):
         dialog.setWindowTitle(f'Детали бронирования №{details["booking_id"]}')
         dialog.setFixedSize(500, 600)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(dialog)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel(f'БРОНИРОВАНИЕ №{details["booking_id"]}')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["large"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='dialog-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
         # Информация
         info_frame = QFrame()
-        info_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f9f9f9;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                padding: 20px;
-            }
-        ''')
-
-        info_layout = QFormLayout()
+        themed(info_frame, role='panel')
+
+        info_layout = QFormLayout(info_frame)
         info_layout.setSpacing(10)
 
         # Пассажир
@@ -337,59 +317,30 @@ class BookingsPage(QWidget):
         info_layout.addRow('Создано пользователем:', QLabel(details['created_by_user']))
         info_layout.addRow('Дата бронирования:', QLabel(details['booking_date'].strftime('%d.%m.%Y %H:%M')))
         info_layout.addRow('Стоимость:', QLabel(f"{details['final_price']:.2f} ₽"))
-
-        info_frame.setLayout(info_layout)
         layout.addWidget(info_frame)
 
         # Кнопка отправки email
         email_btn = QPushButton('📧 Отправить билет на email')
         email_btn.setMinimumHeight(40)
-        email_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #1976D2;
-            }}
-        ''')
+        themed(email_btn, variant='secondary')
         email_btn.clicked.connect(lambda: self.send_ticket_by_email_dialog(details['booking_id']))
         layout.addWidget(email_btn)
 
         # Кнопка закрытия
         close_btn = QPushButton('Закрыть')
         close_btn.setMinimumHeight(40)
-        close_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["primary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(close_btn, variant='primary')
         close_btn.clicked.connect(dialog.accept)
         layout.addWidget(close_btn)
-
-        dialog.setLayout(layout)
         dialog.exec_()
 
     def cancel_selected_booking(self):
         """Отмена выбранного бронирования"""
-        current_row = self.bookings_table.currentRow()
-        if current_row >= 0:
-            booking_id = self.bookings_table.item(current_row, 0).text()
-            status_item = self.bookings_table.item(current_row, 5)
+        booking = self.bookings_table.current_record()
+        if booking:
+            booking_id = booking['booking_id']
 
-            if status_item and ('Подтверждено' in status_item.text()):
+            if 'Подтверждено' in status_text(booking):
                 QMessageBox.warning(self, 'Ошибка', 'Нельзя отменить подтвержденное бронирование')
                 return
 
@@ -402,7 +353,7 @@ class BookingsPage(QWidget):
                     QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
                     return
 
-                if self.db.cancel_booking(int(booking_id)):
+                if self.db.cancel_booking(booking_id):
                     QMessageBox.information(self, 'Успех', 'Бронирование успешно отменено')
                     self.load_bookings()
                 else:
@@ -412,13 +363,12 @@ class BookingsPage(QWidget):
 
     def pay_selected_booking(self):
         """Оплата выбранного бронирования"""
-        current_row = self.bookings_table.currentRow()
-        if current_row >= 0:
-            booking_id = self.bookings_table.item(current_row, 0).text()
-            price_item = self.bookings_table.item(current_row, 6)
+        booking = self.bookings_table.current_record()
+        if booking:
+            booking_id = booking['booking_id']
 
-            if price_item:
-                price = price_item.text().replace(' ₽', '')
+            if booking['final_price'] is not None:
+                price = f"{booking['final_price']:.2f}"
 
                 reply = QMessageBox.question(self, 'Оплата бронирования',
                                              f'Оплатить бронирование №{booking_id} на сумму {price} ₽?',
@@ -449,10 +399,9 @@ class BookingsPage(QWidget):
 
     def send_ticket_by_email(self):
         """Отправка билета на email (заглушка)"""
-        current_row = self.bookings_table.currentRow()
-        if current_row >= 0:
-            booking_id = self.bookings_table.item(current_row, 0).text()
-            self.send_ticket_by_email_dialog(booking_id)
+        booking = self.bookings_table.current_record()
+        if booking:
+            self.send_ticket_by_email_dialog(booking['booking_id'])
 
     def send_ticket_by_email_dialog(self, booking_id):
         """Диалог отправки билета на email"""
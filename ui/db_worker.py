@@ -0,0 +1,123 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from database import Database
+from config import Config
+
+_thread_pool = None
+
+
+def get_thread_pool() -> QThreadPool:
+    """Пул потоков для запросов к БД (не больше, чем соединений в пуле)"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(Config.DB_POOL['size'])
+    return _thread_pool
+
+
+class DbTaskSignals(QObject):
+    """Сигналы фоновой задачи"""
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class DbTask(QRunnable):
+    """Фоновая задача: вызов func(db, *args) на отдельном соединении вне GUI-потока"""
+
+    def __init__(self, key, generation, func, args):
+        super().__init__()
+        # Временем жизни задачи управляет DbExecutor
+        self.setAutoDelete(False)
+        self.key = key
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.signals = DbTaskSignals()
+
+    def run(self):
+        db = Database()
+        if not db.connect():
+            self.signals.failed.emit(self.key, self.generation, 'Не удалось подключиться к базе данных')
+            return
+
+        try:
+            result = self.func(db, *self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, str(e))
+            return
+        finally:
+            db.disconnect()
+
+        self.signals.finished.emit(self.key, self.generation, result)
+
+
+class DbExecutor(QObject):
+    """Запуск запросов к БД в фоне с доставкой результата в GUI-поток.
+
+    Задачи группируются по ключу: новая задача с тем же ключом отменяет
+    еще не начатую предыдущую, а результат уже выполняющейся отбрасывается.
+    """
+
+    loading_changed = pyqtSignal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generations = {}
+        self._tasks = {}
+        self._callbacks = {}
+
+    def submit(self, key, func, *args, on_result=None, on_error=None):
+        """Поставить задачу в очередь, заменив предыдущую с тем же ключом"""
+        self.cancel(key)
+
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        task = DbTask(key, generation, func, args)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+
+        self._tasks[(key, generation)] = task
+        self._callbacks[key] = (on_result, on_error)
+        self.loading_changed.emit(key, True)
+        get_thread_pool().start(task)
+
+    def cancel(self, key):
+        """Отменить ожидающую задачу с указанным ключом"""
+        generation = self._generations.get(key)
+        if generation is None:
+            return
+
+        # Уже выполняющуюся задачу прервать нельзя - ее результат будет отброшен
+        self._generations[key] = generation + 1
+        task = self._tasks.get((key, generation))
+        if task is not None and get_thread_pool().tryTake(task):
+            del self._tasks[(key, generation)]
+
+        if self._callbacks.pop(key, None) is not None:
+            self.loading_changed.emit(key, False)
+
+    def is_loading(self, key) -> bool:
+        """Есть ли актуальная невыполненная задача с этим ключом"""
+        return key in self._callbacks
+
+    def _take_callbacks(self, key, generation):
+        """Снять задачу с учета; вернуть обработчики, если результат актуален"""
+        self._tasks.pop((key, generation), None)
+        if self._generations.get(key) != generation:
+            return None
+
+        callbacks = self._callbacks.pop(key, None)
+        self.loading_changed.emit(key, False)
+        return callbacks
+
+    def _on_finished(self, key, generation, result):
+        callbacks = self._take_callbacks(key, generation)
+        if callbacks and callbacks[0]:
+            callbacks[0](result)
+
+    def _on_failed(self, key, generation, message):
+        callbacks = self._take_callbacks(key, generation)
+        if callbacks and callbacks[1]:
+            callbacks[1](message)
+        elif callbacks is not None:
+            print(f"Ошибка фонового запроса '{key}': {message}")
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from config import Config
+from ui.theme import themed
 from ui.routes_page import RoutesPage  # Изменено с routes_page.py
 from ui.bookings_page import BookingsPage
 from ui.admin_page import AdminPage
@@ -26,10 +27,9 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # Основной layout
-        main_layout = QVBoxLayout()
+        main_layout = QVBoxLayout(central_widget)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
-        central_widget.setLayout(main_layout)
 
         # Шапка
         self.create_header(main_layout)
@@ -45,8 +45,9 @@ class MainWindow(QMainWindow):
         # Создаем страницы
         if not self.user.is_admin():
             # Для обычных пользователей
-            self.routes_page = RoutesPage(self.user)  # Изменено с search_page
-            self.bookings_page = BookingsPage(self.user)
+            # Страницы создаются сразу внутри стека: без переноса готовых страниц к новому родителю
+            self.routes_page = RoutesPage(self.user, self.content_stack)  # Изменено с search_page
+            self.bookings_page = BookingsPage(self.user, self.content_stack)
 
             self.content_stack.addWidget(self.routes_page)
             self.content_stack.addWidget(self.bookings_page)
@@ -56,7 +57,7 @@ class MainWindow(QMainWindow):
             self.setWindowTitle(f'{Config.APP_NAME} - Доступные рейсы')
         else:
             # Для администратора
-            self.admin_page = AdminPage(self.user)
+            self.admin_page = AdminPage(self.user, self.content_stack)
             self.content_stack.addWidget(self.admin_page)
 
             # Показываем панель администратора
@@ -67,9 +68,9 @@ class MainWindow(QMainWindow):
         """Создание шапки"""
         header = QFrame()
         header.setFixedHeight(70)
-        header.setStyleSheet(f'background-color: {Config.COLORS["primary"]};')
+        themed(header, 'header')
 
-        header_layout = QHBoxLayout()
+        header_layout = QHBoxLayout(header)
         header_layout.setContentsMargins(20, 0, 20, 0)
 
         # Логотип и название
@@ -77,14 +78,10 @@ class MainWindow(QMainWindow):
         logo_layout.setSpacing(10)
 
         logo = QLabel('🚆')
-        logo.setStyleSheet('font-size: 30px; color: white;')
+        themed(logo, 'headerLogo')
 
         title = QLabel(Config.APP_NAME)
-        title.setStyleSheet(f'''
-            color: white;
-            font-size: {Config.FONT_SIZES["xlarge"]}px;
-            font-weight: bold;
-        ''')
+        themed(title, 'headerTitle')
 
         logo_layout.addWidget(logo)
         logo_layout.addWidget(title)
@@ -95,25 +92,11 @@ class MainWindow(QMainWindow):
 
         role_text = 'Администратор' if self.user.is_admin() else 'Пользователь'
         user_info = QLabel(f'{self.user.full_name}\n{role_text}')
-        user_info.setStyleSheet(f'''
-            color: white;
-            font-size: {Config.FONT_SIZES["small"]}px;
-            text-align: right;
-        ''')
+        themed(user_info, 'headerUser')
 
         logout_btn = QPushButton('Выйти')
         logout_btn.setFixedSize(80, 35)
-        logout_btn.setStyleSheet('''
-            QPushButton {
-                background-color: rgba(255, 255, 255, 0.2);
-                color: white;
-                border: 1px solid white;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.3);
-            }
-        ''')
+        themed(logout_btn, 'logoutButton')
         logout_btn.clicked.connect(self.close)
 
         user_layout.addWidget(user_info)
@@ -122,17 +105,15 @@ class MainWindow(QMainWindow):
         header_layout.addLayout(logo_layout)
         header_layout.addStretch()
         header_layout.addLayout(user_layout)
-
-        header.setLayout(header_layout)
         layout.addWidget(header)
 
     def create_navigation(self, layout):
         """Создание навигации"""
         nav = QFrame()
         nav.setFixedHeight(50)
-        nav.setStyleSheet(f'background-color: {Config.COLORS["light"]}; border-bottom: 1px solid #ddd;')
+        themed(nav, 'navigation')
 
-        nav_layout = QHBoxLayout()
+        nav_layout = QHBoxLayout(nav)
         nav_layout.setContentsMargins(20, 0, 20, 0)
         nav_layout.setSpacing(10)
 
@@ -145,23 +126,11 @@ class MainWindow(QMainWindow):
         for text, handler in buttons:
             btn = QPushButton(text)
             btn.setMinimumHeight(35)
-            btn.setStyleSheet(f'''
-                QPushButton {{
-                    background-color: {Config.COLORS["secondary"]};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    font-size: {Config.FONT_SIZES["normal"]}px;
-                }}
-                QPushButton:hover {{
-                    opacity: 0.9;
-                }}
-            ''')
+            themed(btn, variant='secondary')
             btn.clicked.connect(handler)
             nav_layout.addWidget(btn)
 
         nav_layout.addStretch()
-        nav.setLayout(nav_layout)
         layout.addWidget(nav)
 
     def show_routes(self):
@@ -1,31 +1,41 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from config import Config
+from database import Database
+from ui.theme import themed
+from ui.db_worker import DbExecutor
 
 
 class PassengerInfoWindow(QDialog):
     """Окно ввода данных пассажира"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, number=1, total=1):
         super().__init__(parent)
+        # Номер пассажира при групповом бронировании
+        self.number = number
+        self.total = total
+        self.executor = DbExecutor(self)
+        # Текст подсказки -> найденный пассажир
+        self.suggestions = {}
         self.init_ui()
 
     def init_ui(self):
-        self.setWindowTitle('Данные пассажира')
-        self.setFixedSize(500, 400)
+        if self.total > 1:
+            self.setWindowTitle(f'Данные пассажира {self.number} из {self.total}')
+        else:
+            self.setWindowTitle('Данные пассажира')
+        self.setFixedSize(500, 450)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(15)
 
         # Заголовок
-        title = QLabel('ВВЕДИТЕ ДАННЫЕ ПАССАЖИРА')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["large"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        if self.total > 1:
+            title = QLabel(f'ПАССАЖИР {self.number} ИЗ {self.total}')
+        else:
+            title = QLabel('ВВЕДИТЕ ДАННЫЕ ПАССАЖИРА')
+        themed(title, role='dialog-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
@@ -42,9 +52,22 @@ class PassengerInfoWindow(QDialog):
         form_layout.addRow('Номер документа:', self.document_input)
         form_layout.addRow('Телефон:', self.phone_input)
 
+        # Постоянные пассажиры: подсказки по началу ФИО и поиск по документу
+        self.name_model = QStringListModel(self)
+        name_completer = QCompleter(self.name_model, self)
+        name_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.name_input.setCompleter(name_completer)
+        self.name_input.textEdited.connect(self.search_names)
+        name_completer.activated[str].connect(self.suggestion_selected)
+        self.document_input.editingFinished.connect(self.find_by_document)
+
+        self.found_label = QLabel('')
+        themed(self.found_label, role='success')
+        form_layout.addRow('', self.found_label)
+
         # Подсказка
         hint = QLabel('* Обязательные поля')
-        hint.setStyleSheet(f'color: {Config.COLORS["danger"]}; font-size: {Config.FONT_SIZES["small"]}px;')
+        themed(hint, role='error')
         form_layout.addRow('', hint)
 
         layout.addLayout(form_layout)
@@ -55,62 +78,65 @@ class PassengerInfoWindow(QDialog):
 
         save_btn = QPushButton('Сохранить')
         save_btn.setMinimumHeight(45)
-        save_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-        ''')
+        themed(save_btn, variant='success')
         save_btn.clicked.connect(self.validate_and_accept)
 
         cancel_btn = QPushButton('Отмена')
         cancel_btn.setMinimumHeight(45)
-        cancel_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["danger"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #d32f2f;
-            }}
-        ''')
+        themed(cancel_btn, variant='danger')
         cancel_btn.clicked.connect(self.reject)
 
         buttons_layout.addWidget(save_btn)
         buttons_layout.addWidget(cancel_btn)
 
         layout.addLayout(buttons_layout)
-        self.setLayout(layout)
 
     def create_input_field(self, placeholder):
         """Создание поля ввода"""
         field = QLineEdit()
         field.setPlaceholderText(placeholder)
         field.setMinimumHeight(40)
-        field.setStyleSheet(f'''
-            QLineEdit {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 10px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {Config.COLORS["primary"]};
-            }}
-        ''')
         return field
 
+    def search_names(self, text):
+        """Подсказки по началу ФИО (с трех символов)"""
+        text = text.strip()
+        if len(text) < 3:
+            return
+        self.executor.submit('names', Database.search_passengers, text, on_result=self.show_suggestions)
+
+    def show_suggestions(self, passengers):
+        """Обновление списка подсказок"""
+        self.suggestions = {f"{passenger['full_name']} ({passenger['document_number']})": passenger
+                            for passenger in passengers}
+        self.name_model.setStringList(list(self.suggestions))
+
+    def suggestion_selected(self, text):
+        """Выбор постоянного пассажира из подсказок"""
+        passenger = self.suggestions.get(text)
+        if passenger:
+            self.fill_passenger(passenger, overwrite=True)
+
+    def find_by_document(self):
+        """Поиск пассажира по номеру документа после ввода"""
+        document_number = self.document_input.text().strip()
+        if document_number:
+            self.executor.submit('document', Database.find_passenger_by_document, document_number,
+                                 on_result=self.fill_passenger)
+
+    def fill_passenger(self, passenger, overwrite=False):
+        """Автозаполнение полей данными найденного пассажира (заполненные поля не затираются)"""
+        if not passenger:
+            return
+
+        fields = [(self.name_input, passenger['full_name']),
+                  (self.document_input, passenger['document_number']),
+                  (self.phone_input, passenger['phone'] or '')]
+        for field, value in fields:
+            if overwrite or not field.text().strip():
+                field.setText(value)
+        self.found_label.setText('Пассажир найден в базе')
+
     def validate_and_accept(self):
         """Валидация и закрытие окна"""
         if not self.name_input.text().strip():
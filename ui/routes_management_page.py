@@ -3,105 +3,113 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from datetime import datetime, timedelta
 from database import Database
-from config import Config
+from ui.theme import themed
+from ui.db_worker import DbExecutor
+from ui.table_models import Column, RecordTableView
+
+
+# Цвета ячейки свободных мест
+FREE_MANY = QColor(220, 255, 220)
+FREE_FEW = QColor(255, 255, 200)
+FREE_LAST = QColor(255, 200, 200)
+FREE_NONE = QColor(255, 150, 150)
+
+
+def free_seats_color(route):
+    """Цветовая индикация свободных мест"""
+    if route['free_seats'] > 20:
+        return FREE_MANY
+    if route['free_seats'] > 10:
+        return FREE_FEW
+    if route['free_seats'] > 0:
+        return FREE_LAST
+    return FREE_NONE
+
+
+# Колонки таблицы поездов
+TRAIN_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Номер поезда', 'train_number'),
+    Column('Название', 'train_name'),
+    Column('Тип', 'train_type')
+]
+
+# Колонки таблицы рейсов
+ROUTE_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Поезд', 'train_name', lambda route: f"{route['train_name']} ({route['train_number']})"),
+    Column('Откуда', 'departure_station'),
+    Column('Куда', 'arrival_station'),
+    Column('Отправление', 'departure_time', lambda route: route['departure_time'].strftime('%d.%m.%Y %H:%M')),
+    Column('Прибытие', 'arrival_time', lambda route: route['arrival_time'].strftime('%d.%m.%Y %H:%M')),
+    Column('Цена', 'base_price', lambda route: f"{route['base_price']:.2f} ₽"),
+    Column('Свободных мест', 'free_seats', background=free_seats_color)
+]
 
 
 class RoutesManagementPage(QWidget):
     """Страница управления рейсами (для админа)"""
 
-    def __init__(self, user):
-        super().__init__()
+    def __init__(self, user, parent=None):
+        super().__init__(parent)
         self.user = user
         self.db = Database()
+        self.executor = DbExecutor(self)
+        self.train_types = {}
         self.init_ui()
 
     def init_ui(self):
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('УПРАВЛЕНИЕ РЕЙСАМИ')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["xxlarge"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["dark"]};
-            margin-bottom: 10px;
-        ''')
+        themed(title, role='page-title')
         layout.addWidget(title)
 
         # Вкладки
         self.tab_widget = QTabWidget()
+        layout.addWidget(self.tab_widget)
 
         # Вкладка добавления рейса
-        self.add_route_tab = self.create_add_route_tab()
-        self.tab_widget.addTab(self.add_route_tab, '➕ Добавить рейс')
+        self.add_route_tab = self.create_add_route_tab('➕ Добавить рейс')
 
         # Вкладка управления поездами
-        self.trains_tab = self.create_trains_tab()
-        self.tab_widget.addTab(self.trains_tab, '🚆 Управление поездами')
+        self.trains_tab = self.create_trains_tab('🚆 Управление поездами')
 
         # Вкладка существующих рейсов
-        self.routes_tab = self.create_routes_tab()
-        self.tab_widget.addTab(self.routes_tab, '📋 Существующие рейсы')
-
-        layout.addWidget(self.tab_widget)
-        self.setLayout(layout)
+        self.routes_tab = self.create_routes_tab('📋 Существующие рейсы')
 
-    def create_add_route_tab(self):
+    def create_add_route_tab(self, title: str):
         """Создание вкладки добавления рейса"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        # Вкладка добавляется до заполнения: виджеты сразу попадают к своему родителю
+        self.tab_widget.addTab(widget, title)
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('ДОБАВЛЕНИЕ НОВОГО РЕЙСА')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["large"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='dialog-title')
         layout.addWidget(title)
 
         # Форма добавления рейса
         form_frame = QFrame()
-        form_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f9f9f9;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                padding: 20px;
-            }
-        ''')
-
-        form_layout = QFormLayout()
+        themed(form_frame, role='panel')
+
+        form_layout = QFormLayout(form_frame)
         form_layout.setSpacing(10)
 
         # Выбор поезда
         self.train_combo = QComboBox()
         self.train_combo.setMinimumHeight(40)
-        self.train_combo.setStyleSheet(f'''
-            QComboBox {{
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                padding: 5px;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-            }}
-        ''')
 
         # Поле для нового поезда
         self.new_train_frame = QFrame()
-        self.new_train_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f0f8ff;
-                border: 1px solid #b0d0ff;
-                border-radius: 6px;
-                padding: 15px;
-                margin-top: 10px;
-            }
-        ''')
-        new_train_layout = QGridLayout()
+        themed(self.new_train_frame, role='note-panel')
+        new_train_layout = QGridLayout(self.new_train_frame)
         new_train_layout.setSpacing(10)
 
         self.new_train_number = QLineEdit()
@@ -122,8 +130,6 @@ class RoutesManagementPage(QWidget):
         new_train_layout.addWidget(self.new_train_name, 1, 1)
         new_train_layout.addWidget(QLabel('Тип поезда:'), 2, 0)
         new_train_layout.addWidget(self.new_train_type, 2, 1)
-
-        self.new_train_frame.setLayout(new_train_layout)
         self.new_train_frame.hide()
 
         # Поля маршрута
@@ -170,40 +176,26 @@ class RoutesManagementPage(QWidget):
         form_layout.addRow('Время прибытия:', self.arrival_time)
         form_layout.addRow('Базовая цена:', self.base_price)
         form_layout.addRow('Количество мест:', self.num_seats)
-
-        form_frame.setLayout(form_layout)
         layout.addWidget(form_frame)
 
         # Кнопка добавления
         add_btn = QPushButton('✅ Добавить рейс')
         add_btn.setMinimumHeight(50)
-        add_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-        ''')
+        themed(add_btn, variant='success')
         add_btn.clicked.connect(self.add_route)
         layout.addWidget(add_btn)
 
-        widget.setLayout(layout)
-
         # Загружаем поезда
         self.load_trains()
 
         return widget
 
-    def create_trains_tab(self):
+    def create_trains_tab(self, title: str):
         """Создание вкладки управления поездами"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        # Вкладка добавляется до заполнения: виджеты сразу попадают к своему родителю
+        self.tab_widget.addTab(widget, title)
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
@@ -212,18 +204,7 @@ class RoutesManagementPage(QWidget):
 
         refresh_btn = QPushButton('🔄 Обновить')
         refresh_btn.setMinimumHeight(40)
-        refresh_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(refresh_btn, variant='secondary')
         refresh_btn.clicked.connect(self.load_trains_list)
 
         control_layout.addWidget(refresh_btn)
@@ -232,26 +213,22 @@ class RoutesManagementPage(QWidget):
         layout.addLayout(control_layout)
 
         # Таблица поездов
-        self.trains_table = QTableWidget()
-        self.trains_table.setColumnCount(4)
-        self.trains_table.setHorizontalHeaderLabels([
-            'ID', 'Номер поезда', 'Название', 'Тип'
-        ])
-        self.trains_table.horizontalHeader().setStretchLastSection(True)
+        self.trains_table = RecordTableView(TRAIN_COLUMNS)
+        control_layout.addWidget(self.trains_table.create_search_edit())
 
         layout.addWidget(self.trains_table)
 
-        widget.setLayout(layout)
-
         # Загружаем данные
         self.load_trains_list()
 
         return widget
 
-    def create_routes_tab(self):
+    def create_routes_tab(self, title: str):
         """Создание вкладки существующих рейсов"""
         widget = QWidget()
-        layout = QVBoxLayout()
+        # Вкладка добавляется до заполнения: виджеты сразу попадают к своему родителю
+        self.tab_widget.addTab(widget, title)
+        layout = QVBoxLayout(widget)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
@@ -260,18 +237,7 @@ class RoutesManagementPage(QWidget):
 
         refresh_btn = QPushButton('🔄 Обновить')
         refresh_btn.setMinimumHeight(40)
-        refresh_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["secondary"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-            }}
-            QPushButton:hover {{
-                opacity: 0.9;
-            }}
-        ''')
+        themed(refresh_btn, variant='secondary')
         refresh_btn.clicked.connect(self.load_routes_list)
 
         control_layout.addWidget(refresh_btn)
@@ -280,17 +246,11 @@ class RoutesManagementPage(QWidget):
         layout.addLayout(control_layout)
 
         # Таблица рейсов
-        self.routes_table = QTableWidget()
-        self.routes_table.setColumnCount(8)
-        self.routes_table.setHorizontalHeaderLabels([
-            'ID', 'Поезд', 'Откуда', 'Куда', 'Отправление', 'Прибытие', 'Цена', 'Свободных мест'
-        ])
-        self.routes_table.horizontalHeader().setStretchLastSection(True)
+        self.routes_table = RecordTableView(ROUTE_COLUMNS)
+        control_layout.addWidget(self.routes_table.create_search_edit())
 
         layout.addWidget(self.routes_table)
 
-        widget.setLayout(layout)
-
         # Загружаем данные
         self.load_routes_list()
 
@@ -302,9 +262,15 @@ class RoutesManagementPage(QWidget):
             return
 
         trains = self.db.get_all_trains()
+        train_types = self.db.get_train_types()
         self.db.disconnect()
 
+        # Подсказки уже известных типов поездов в форме нового поезда
+        self.new_train_type.setCompleter(QCompleter(train_types, self))
+
         self.train_combo.clear()
+        # Тип поезда нужен для выбора схемы вагонов при создании мест
+        self.train_types = {train['id']: train['train_type'] for train in trains}
         if trains:
             for train in trains:
                 self.train_combo.addItem(f"{train['train_name']} ({train['train_number']})", train['id'])
@@ -318,82 +284,21 @@ class RoutesManagementPage(QWidget):
         trains = self.db.get_all_trains()
         self.db.disconnect()
 
-        if not trains:
-            self.trains_table.setRowCount(0)
-            return
-
-        # Заполняем таблицу
-        self.trains_table.setRowCount(len(trains))
-
-        for row, train in enumerate(trains):
-            self.trains_table.setItem(row, 0, QTableWidgetItem(str(train['id'])))
-            self.trains_table.setItem(row, 1, QTableWidgetItem(train['train_number']))
-            self.trains_table.setItem(row, 2, QTableWidgetItem(train['train_name']))
-            self.trains_table.setItem(row, 3, QTableWidgetItem(train['train_type']))
+        self.trains_table.set_rows(trains or [])
 
     def load_routes_list(self):
         """Загрузка списка рейсов"""
-        if not self.db.connect():
-            QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
-            return
+        # Получаем последние рейсы с информацией о свободных местах в фоне
+        self.executor.submit('routes', Database.get_routes_overview, 100,
+                             on_result=self.fill_routes_table, on_error=self.show_load_error)
 
-        # Получаем все рейсы с информацией о свободных местах
-        query = """
-        SELECT 
-            r.id,
-            t.train_name,
-            t.train_number,
-            r.departure_station,
-            r.arrival_station,
-            r.departure_time,
-            r.arrival_time,
-            r.base_price,
-            COUNT(s.id) as free_seats
-        FROM routes r
-        JOIN trains t ON r.train_id = t.id
-        LEFT JOIN seats s ON s.route_id = r.id AND s.status = 'свободно'
-        GROUP BY r.id, t.train_name, t.train_number, r.departure_station, 
-                 r.arrival_station, r.departure_time, r.arrival_time, r.base_price
-        ORDER BY r.departure_time DESC
-        LIMIT 100
-        """
-
-        self.db.cursor.execute(query)
-        routes = self.db.cursor.fetchall()
-        self.db.disconnect()
+    def show_load_error(self, message):
+        """Показать ошибку загрузки"""
+        QMessageBox.critical(self, 'Ошибка', message)
 
-        if not routes:
-            self.routes_table.setRowCount(0)
-            return
-
-        # Заполняем таблицу
-        self.routes_table.setRowCount(len(routes))
-
-        for row, route in enumerate(routes):
-            self.routes_table.setItem(row, 0, QTableWidgetItem(str(route['id'])))
-            self.routes_table.setItem(row, 1, QTableWidgetItem(f"{route['train_name']} ({route['train_number']})"))
-            self.routes_table.setItem(row, 2, QTableWidgetItem(route['departure_station']))
-            self.routes_table.setItem(row, 3, QTableWidgetItem(route['arrival_station']))
-
-            departure = route['departure_time'].strftime('%d.%m.%Y %H:%M')
-            arrival = route['arrival_time'].strftime('%d.%m.%Y %H:%M')
-
-            self.routes_table.setItem(row, 4, QTableWidgetItem(departure))
-            self.routes_table.setItem(row, 5, QTableWidgetItem(arrival))
-            self.routes_table.setItem(row, 6, QTableWidgetItem(f"{route['base_price']:.2f} ₽"))
-
-            # Свободные места с цветовой индикацией
-            free_seats_item = QTableWidgetItem(str(route['free_seats']))
-            if route['free_seats'] > 20:
-                free_seats_item.setBackground(QColor(220, 255, 220))
-            elif route['free_seats'] > 10:
-                free_seats_item.setBackground(QColor(255, 255, 200))
-            elif route['free_seats'] > 0:
-                free_seats_item.setBackground(QColor(255, 200, 200))
-            else:
-                free_seats_item.setBackground(QColor(255, 150, 150))
-
-            self.routes_table.setItem(row, 7, free_seats_item)
+    def fill_routes_table(self, routes):
+        """Заполнение таблицы рейсов"""
+        self.routes_table.set_rows(routes or [])
 
     def toggle_new_train_form(self):
         """Показать/скрыть форму добавления нового поезда"""
@@ -479,32 +384,24 @@ class RoutesManagementPage(QWidget):
             QMessageBox.critical(self, 'Ошибка', 'Не удалось подключиться к базе данных')
             return
 
-        if self.db.add_route(train_id, departure_station, arrival_station,
-                             departure_time, arrival_time, base_price):
-
-            # Получаем ID добавленного маршрута
-            query = "SELECT LAST_INSERT_ID() as route_id"
-            self.db.cursor.execute(query)
-            route_id = self.db.cursor.fetchone()['route_id']
-
-            # Добавляем места
-            if self.db.add_seats_for_route(route_id, num_seats):
-                QMessageBox.information(self, 'Успех',
-                                        f'Рейс успешно добавлен!\n'
-                                        f'Добавлено мест: {num_seats}\n'
-                                        f'ID маршрута: {route_id}')
-
-                # Очищаем форму
-                self.departure_station.clear()
-                self.arrival_station.clear()
-                self.departure_station.setFocus()
-
-                # Обновляем таблицы
-                self.load_routes_list()
-                self.load_trains_list()
-            else:
-                QMessageBox.warning(self, 'Внимание',
-                                    'Маршрут добавлен, но возникла ошибка при добавлении мест')
+        # Маршрут и все его места создаются одной транзакцией
+        route_id = self.db.add_route(train_id, departure_station, arrival_station,
+                                     departure_time, arrival_time, base_price,
+                                     num_seats=num_seats, train_type=self.train_types.get(train_id))
+        if route_id:
+            QMessageBox.information(self, 'Успех',
+                                    f'Рейс успешно добавлен!\n'
+                                    f'Добавлено мест: {num_seats}\n'
+                                    f'ID маршрута: {route_id}')
+
+            # Очищаем форму
+            self.departure_station.clear()
+            self.arrival_station.clear()
+            self.departure_station.setFocus()
+
+            # Обновляем таблицы
+            self.load_routes_list()
+            self.load_trains_list()
         else:
             QMessageBox.critical(self, 'Ошибка', 'Не удалось добавить маршрут')
 
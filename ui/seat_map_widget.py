@@ -0,0 +1,282 @@
+from typing import Dict, List, Optional
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from config import Config
+from seat_map import SeatMap
+from ui import theme
+
+# Геометрия схемы: место, промежуток, мест в ряду, высота заголовка вагона, поля
+CELL = 50
+GAP = 10
+STEP = CELL + GAP
+COLUMNS = 10
+HEADER = 56
+MARGIN = 10
+
+OCCUPIED_COLOR = QColor(theme.OCCUPIED_COLOR)
+OCCUPIED_TEXT = QColor('#9e9e9e')
+HEADER_COLOR = QColor('#f0f8ff')
+
+
+def seat_color(seat_type: Optional[str]) -> QColor:
+    """Цвет места по его классу"""
+    seat_type = seat_type.lower() if seat_type else 'standard'
+    if 'люкс' in seat_type or 'lux' in seat_type:
+        return QColor(Config.COLORS['primary'])
+    if 'купе' in seat_type:
+        return QColor(Config.COLORS['secondary'])
+    return QColor(Config.COLORS['success'])
+
+
+class SeatMapWidget(QWidget):
+    """Схема мест рейса, нарисованная по SeatMap.
+
+    Вагоны рисуются в кэшированные картинки (свободные и занятые места), выбор и
+    место под курсором дорисовываются поверх. Место под точкой находится
+    арифметикой по геометрии схемы, без перебора мест.
+    """
+
+    selection_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.seat_map: Optional[SeatMap] = None
+        # Выбранные места в порядке выбора и их позиции в схеме
+        self._selected: List[int] = []
+        self._selected_slots = set()
+        self._hover = None
+        self._rows = 0
+        self._carriage_height = 0
+        # Картинки вагонов: вагон -> QPixmap
+        self._pixmaps: Dict[int, QPixmap] = {}
+        self._colors: Dict[str, QColor] = {}
+        self.setMouseTracking(True)
+
+    def set_seat_map(self, seat_map: SeatMap):
+        """Новая схема: выбор сбрасывается, картинки вагонов рисуются заново"""
+        self.seat_map = seat_map
+        self._selected = []
+        self._selected_slots = set()
+        self._hover = None
+        self._pixmaps = {}
+        self._colors = {seat_type: seat_color(seat_type) for seat_type in seat_map.classes}
+        self._rows = (seat_map.width + COLUMNS - 1) // COLUMNS
+        self._carriage_height = HEADER + self._rows * STEP
+        self.setMinimumSize(self.sizeHint())
+        self.updateGeometry()
+        self.update()
+
+    def sizeHint(self):
+        if not self.seat_map:
+            return QSize(0, 0)
+        return QSize(2 * MARGIN + COLUMNS * STEP - GAP,
+                     2 * MARGIN + len(self.seat_map.carriages()) * self._carriage_height)
+
+    # ========== ГЕОМЕТРИЯ ==========
+
+    def slot_at(self, pos: QPoint) -> Optional[int]:
+        """Позиция места под точкой (None - не место)"""
+        if not self.seat_map or not self._carriage_height:
+            return None
+        x, y = pos.x() - MARGIN, pos.y() - MARGIN
+        if x < 0 or y < 0:
+            return None
+
+        carriage, y = divmod(y, self._carriage_height)
+        row, dy = divmod(y - HEADER, STEP)
+        column, dx = divmod(x, STEP)
+        if y < HEADER or dx >= CELL or dy >= CELL or column >= COLUMNS:
+            return None
+
+        number = row * COLUMNS + column
+        slot = carriage * self.seat_map.width + number
+        if number >= self.seat_map.width or slot >= self.seat_map.size or self.seat_map.seat_type(slot) is None:
+            return None
+        return slot
+
+    def slot_rect(self, slot: int) -> QRect:
+        """Прямоугольник места в координатах виджета"""
+        carriage, number = divmod(slot, self.seat_map.width)
+        row, column = divmod(number, COLUMNS)
+        return QRect(MARGIN + column * STEP, MARGIN + carriage * self._carriage_height + HEADER + row * STEP,
+                     CELL, CELL)
+
+    def seat_rect(self, seat_id: int) -> QRect:
+        slot = self.seat_map.slot(seat_id) if self.seat_map else None
+        return self.slot_rect(slot) if slot is not None else QRect()
+
+    def _slot_id(self, slot: int) -> Optional[int]:
+        carriage, number = divmod(slot, self.seat_map.width)
+        return self.seat_map.seat_id(carriage + 1, number + 1)
+
+    def _is_free(self, slot: int) -> bool:
+        seat_id = self._slot_id(slot)
+        return seat_id is not None and self.seat_map.is_free(seat_id)
+
+    def seat_label(self, seat_id: int) -> str:
+        slot = self.seat_map.slot(seat_id)
+        carriage, number = divmod(slot, self.seat_map.width)
+        return f'вагон {carriage + 1}, место {number + 1}'
+
+    # ========== ВЫБОР ==========
+
+    def selected_seat_ids(self) -> List[int]:
+        return list(self._selected)
+
+    def set_selected(self, seat_ids: List[int]):
+        """Замена выбора (только свободные места схемы)"""
+        for slot in self._selected_slots:
+            self.update(self.slot_rect(slot))
+        self._selected, self._selected_slots = [], set()
+        for seat_id in seat_ids:
+            slot = self.seat_map.slot(seat_id)
+            if slot is not None and self.seat_map.is_free(seat_id) and slot not in self._selected_slots:
+                self._selected.append(seat_id)
+                self._selected_slots.add(slot)
+                self.update(self.slot_rect(slot))
+        self.selection_changed.emit()
+
+    def toggle(self, slot: int):
+        """Выбор места или снятие выбора при повторном нажатии"""
+        seat_id = self._slot_id(slot)
+        if slot in self._selected_slots:
+            self._selected_slots.discard(slot)
+            self._selected.remove(seat_id)
+        else:
+            self._selected_slots.add(slot)
+            self._selected.append(seat_id)
+        self.update(self.slot_rect(slot))
+        self.selection_changed.emit()
+
+    # ========== СОБЫТИЯ ==========
+
+    def mousePressEvent(self, event):
+        slot = self.slot_at(event.pos()) if event.button() == Qt.LeftButton else None
+        if slot is not None and self._is_free(slot):
+            self.toggle(slot)
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        slot = self.slot_at(event.pos())
+        if slot is not None and not self._is_free(slot):
+            slot = None
+        if slot != self._hover:
+            for old in (self._hover, slot):
+                if old is not None:
+                    self.update(self.slot_rect(old))
+            self._hover = slot
+            self.setCursor(Qt.PointingHandCursor if slot is not None else Qt.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self._hover is not None:
+            self.update(self.slot_rect(self._hover))
+            self._hover = None
+        super().leaveEvent(event)
+
+    def event(self, event):
+        # Подсказка с классом места
+        if event.type() == QEvent.ToolTip:
+            slot = self.slot_at(event.pos())
+            if slot is None:
+                QToolTip.hideText()
+                event.ignore()
+                return True
+            seat_id = self._slot_id(slot)
+            state = 'свободно' if self._is_free(slot) else 'занято'
+            QToolTip.showText(event.globalPos(),
+                              f'{self.seat_label(seat_id)}\n{self.seat_map.seat_type(slot)}, {state}', self)
+            return True
+        return super().event(event)
+
+    # ========== ОТРИСОВКА ==========
+
+    def paintEvent(self, event):
+        if not self.seat_map or not self._carriage_height:
+            return
+
+        painter = QPainter(self)
+        area = event.rect()
+        first = max(0, (area.top() - MARGIN) // self._carriage_height)
+        last = min(len(self.seat_map.carriages()) - 1, (area.bottom() - MARGIN) // self._carriage_height)
+
+        # Вагоны - из кэша, рисуются только попавшие в область перерисовки
+        for index in range(first, last + 1):
+            pixmap = self._pixmaps.get(index + 1)
+            if pixmap is None:
+                pixmap = self._pixmaps[index + 1] = self.render_carriage(index + 1)
+            painter.drawPixmap(MARGIN, MARGIN + index * self._carriage_height, pixmap)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        for slot in self._selected_slots:
+            self.paint_seat(painter, slot, selected=True)
+        if self._hover is not None and self._hover not in self._selected_slots:
+            self.paint_seat(painter, self._hover, selected=False)
+
+    def render_carriage(self, carriage: int) -> QPixmap:
+        """Картинка вагона: заголовок, свободные и занятые места"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int((COLUMNS * STEP - GAP) * ratio), int(self._carriage_height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Заголовок вагона
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(HEADER_COLOR)
+        painter.drawRoundedRect(QRectF(0, 12, COLUMNS * STEP - GAP, HEADER - 22), 4, 4)
+        font = QFont(self.font())
+        font.setPixelSize(Config.FONT_SIZES['large'])
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor(Config.COLORS['primary']))
+        painter.drawText(QRect(8, 12, COLUMNS * STEP - GAP, HEADER - 22), Qt.AlignLeft | Qt.AlignVCenter,
+                         f'Вагон {carriage}')
+
+        # Места: бит n маски - свободно место n
+        free = self.seat_map.carriage_mask(carriage)
+        font.setPixelSize(Config.FONT_SIZES['normal'])
+        painter.setFont(font)
+        first_slot = (carriage - 1) * self.seat_map.width
+        for number in range(1, self.seat_map.width + 1):
+            slot = first_slot + number - 1
+            seat_type = self.seat_map.seat_type(slot) if slot < self.seat_map.size else None
+            if seat_type is None:
+                continue
+
+            row, column = divmod(number - 1, COLUMNS)
+            rect = QRect(column * STEP, HEADER + row * STEP, CELL, CELL)
+            if free >> number & 1:
+                color = self._colors[seat_type]
+                painter.setPen(QPen(color, 2))
+                painter.setBrush(color)
+                text_color = Qt.white
+            else:
+                painter.setPen(QPen(OCCUPIED_COLOR, 2))
+                painter.setBrush(OCCUPIED_COLOR)
+                text_color = OCCUPIED_TEXT
+            painter.drawRoundedRect(QRectF(rect).adjusted(1, 1, -1, -1), 8, 8)
+            painter.setPen(text_color)
+            painter.drawText(rect, Qt.AlignCenter, str(number))
+
+        painter.end()
+        return pixmap
+
+    def paint_seat(self, painter: QPainter, slot: int, selected: bool):
+        """Место под курсором или выбранное: белый фон, цвет класса, рамка выбора"""
+        rect = self.slot_rect(slot)
+        color = self._colors[self.seat_map.seat_type(slot)]
+        painter.setPen(QPen(QColor(Config.COLORS['warning']), 3) if selected else QPen(color, 2))
+        painter.setBrush(Qt.white)
+        painter.drawRoundedRect(QRectF(rect).adjusted(1.5, 1.5, -1.5, -1.5), 8, 8)
+
+        font = QFont(self.font())
+        font.setPixelSize(Config.FONT_SIZES['normal'])
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(rect, Qt.AlignCenter, str(slot % self.seat_map.width + 1))
@@ -2,7 +2,9 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from database import Database
-from config import Config
+from ui.theme import themed
+from seat_allocator import SeatAllocator
+from ui.seat_map_widget import SeatMapWidget
 
 
 class SeatSelectionWindow(QDialog):
@@ -13,133 +15,118 @@ class SeatSelectionWindow(QDialog):
         self.route_id = route_id
         self.user = user
         self.db = Database()
-        self.selected_seat_id = None
+        # Выбранные места в порядке выбора (можно выбрать несколько для группы)
+        self.selected_seat_ids = []
+        self.seat_labels = {}
+        self.allocator = None
+        self.seat_map = None
+        self.base_price = None
         self.init_ui()
 
     def init_ui(self):
         self.setWindowTitle('Выбор места')
         self.setFixedSize(900, 700)
 
-        layout = QVBoxLayout()
+        layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
 
         # Заголовок
         title = QLabel('ВЫБОР МЕСТА')
-        title.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["xlarge"]}px;
-            font-weight: bold;
-            color: {Config.COLORS["primary"]};
-        ''')
+        themed(title, role='window-title')
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
         # Информация о маршруте
         self.route_info_label = QLabel('')
-        self.route_info_label.setStyleSheet(f'''
-            font-size: {Config.FONT_SIZES["normal"]}px;
-            padding: 10px;
-            background-color: #f0f0f0;
-            border-radius: 6px;
-        ''')
+        themed(self.route_info_label, role='stats')
         layout.addWidget(self.route_info_label)
 
         # Легенда
         legend_frame = QFrame()
-        legend_frame.setStyleSheet('''
-            QFrame {
-                background-color: #f9f9f9;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                padding: 10px;
-            }
-        ''')
-
-        legend_layout = QHBoxLayout()
+        themed(legend_frame, role='panel')
+
+        legend_layout = QHBoxLayout(legend_frame)
         legend_layout.setSpacing(15)
 
         legend_items = [
-            ('свободно', Config.COLORS["success"]),
-            ('люкс', Config.COLORS["primary"]),
-            ('купе', Config.COLORS["secondary"]),
-            ('выбрано', Config.COLORS["warning"])
+            ('свободно', 'success'),
+            ('люкс', 'primary'),
+            ('купе', 'secondary'),
+            ('выбрано', 'warning'),
+            ('занято', 'occupied')
         ]
 
         for text, color in legend_items:
             item_layout = QHBoxLayout()
             color_label = QLabel()
             color_label.setFixedSize(20, 20)
-            color_label.setStyleSheet(f'background-color: {color}; border-radius: 4px;')
+            themed(color_label, swatch=color)
             text_label = QLabel(text)
-            text_label.setStyleSheet(f'font-size: {Config.FONT_SIZES["small"]}px;')
+            themed(text_label, role='caption')
 
             item_layout.addWidget(color_label)
             item_layout.addWidget(text_label)
             legend_layout.addLayout(item_layout)
 
         legend_layout.addStretch()
-        legend_frame.setLayout(legend_layout)
         layout.addWidget(legend_frame)
 
-        # Сетка мест
-        self.seats_grid = QGridLayout()
-        self.seats_grid.setSpacing(10)
+        # Подбор соседних мест для группы
+        group_layout = QHBoxLayout()
+        group_label = QLabel('Пассажиров:')
+        themed(group_label, role='text')
+
+        self.group_size_spin = QSpinBox()
+        self.group_size_spin.setRange(1, 20)
+        self.group_size_spin.setValue(2)
+        self.group_size_spin.setMinimumHeight(35)
+
+        group_btn = QPushButton('Подобрать места рядом')
+        group_btn.setMinimumHeight(35)
+        themed(group_btn, variant='primary')
+        group_btn.clicked.connect(self.propose_group_seats)
+
+        group_layout.addWidget(group_label)
+        group_layout.addWidget(self.group_size_spin)
+        group_layout.addWidget(group_btn)
+        group_layout.addStretch()
+
+        # Свободные места по классам (из схемы занятости)
+        self.free_label = QLabel('')
+        themed(self.free_label, role='text')
+        group_layout.addWidget(self.free_label)
+        layout.addLayout(group_layout)
+
+        # Схема мест - один нарисованный виджет на весь поезд
+        self.seat_map_widget = SeatMapWidget()
+        self.seat_map_widget.selection_changed.connect(self.seat_selected)
 
         # Область прокрутки
-        scroll_area = QScrollArea()
-        scroll_widget = QWidget()
-        scroll_widget.setLayout(self.seats_grid)
-        scroll_area.setWidget(scroll_widget)
-        scroll_area.setWidgetResizable(True)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidget(self.seat_map_widget)
+        self.scroll_area.setWidgetResizable(True)
 
-        layout.addWidget(scroll_area)
+        layout.addWidget(self.scroll_area)
 
         # Кнопки
         buttons_layout = QHBoxLayout()
 
         self.select_btn = QPushButton('Выбрать место')
         self.select_btn.setMinimumHeight(45)
-        self.select_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["success"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #45a049;
-            }}
-            QPushButton:disabled {{
-                background-color: #cccccc;
-            }}
-        ''')
+        themed(self.select_btn, variant='success')
         self.select_btn.clicked.connect(self.accept)
         self.select_btn.setEnabled(False)
 
         cancel_btn = QPushButton('Отмена')
         cancel_btn.setMinimumHeight(45)
-        cancel_btn.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {Config.COLORS["danger"]};
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-size: {Config.FONT_SIZES["normal"]}px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: #d32f2f;
-            }}
-        ''')
+        themed(cancel_btn, variant='danger')
         cancel_btn.clicked.connect(self.reject)
 
         buttons_layout.addWidget(self.select_btn)
         buttons_layout.addWidget(cancel_btn)
 
         layout.addLayout(buttons_layout)
-        self.setLayout(layout)
 
         # Загружаем данные
         self.load_route_info()
@@ -169,6 +156,7 @@ class SeatSelectionWindow(QDialog):
         self.db.disconnect()
 
         if route:
+            self.base_price = route['base_price']
             info_text = f'''
             <b>{route['train_name']} ({route['train_number']})</b><br>
             <b>Маршрут:</b> {route['departure_station']} → {route['arrival_station']}<br>
@@ -185,104 +173,51 @@ class SeatSelectionWindow(QDialog):
             self.reject()
             return
 
-        seats = self.db.get_available_seats(self.route_id)
+        self.seat_map = self.db.get_seat_map(self.route_id)
         self.db.disconnect()
 
-        if not seats:
+        if not self.seat_map or not self.seat_map.free_count():
             QMessageBox.information(self, 'Информация', 'Нет свободных мест на этот рейс')
             self.reject()
             return
 
-        # Сортируем по вагонам
-        carriages = {}
-        for seat in seats:
-            carriage_num = seat['carriage_number']
-            if carriage_num not in carriages:
-                carriages[carriage_num] = []
-            carriages[carriage_num].append(seat)
-
-        # Создаем виджеты мест
-        row = 0
-        for carriage_num in sorted(carriages.keys()):
-            # Заголовок вагона
-            carriage_label = QLabel(f'Вагон {carriage_num}')
-            carriage_label.setStyleSheet(f'''
-                font-size: {Config.FONT_SIZES["large"]}px;
-                font-weight: bold;
-                color: {Config.COLORS["primary"]};
-                margin-top: 20px;
-                padding: 5px;
-                background-color: #f0f8ff;
-                border-radius: 4px;
-            ''')
-            self.seats_grid.addWidget(carriage_label, row, 0, 1, 10)
-            row += 1
-
-            # Места в вагоне
-            col = 0
-            for seat in carriages[carriage_num]:
-                seat_btn = QPushButton(str(seat['seat_number']))
-                seat_btn.setFixedSize(50, 50)
-                seat_btn.setProperty('seat_id', seat['seat_id'])
-                seat_btn.setCursor(Qt.PointingHandCursor)
-
-                # Цвет в зависимости от типа места
-                seat_type = seat['seat_type'].lower() if seat['seat_type'] else 'standard'
-                if 'люкс' in seat_type or 'lux' in seat_type:
-                    color = Config.COLORS["primary"]
-                elif 'купе' in seat_type:
-                    color = Config.COLORS["secondary"]
-                else:
-                    color = Config.COLORS["success"]
-
-                seat_btn.setStyleSheet(f'''
-                    QPushButton {{
-                        background-color: {color};
-                        color: white;
-                        border: 2px solid {color};
-                        border-radius: 8px;
-                        font-size: {Config.FONT_SIZES["normal"]}px;
-                        font-weight: bold;
-                    }}
-                    QPushButton:hover {{
-                        background-color: white;
-                        color: {color};
-                    }}
-                    QPushButton:checked {{
-                        background-color: white;
-                        color: {color};
-                        border: 3px solid {Config.COLORS["warning"]};
-                    }}
-                ''')
-
-                seat_btn.setCheckable(True)
-                seat_btn.toggled.connect(lambda checked, btn=seat_btn: self.seat_selected(checked, btn))
-
-                self.seats_grid.addWidget(seat_btn, row, col)
-                col += 1
-                if col >= 10:  # 10 мест в ряд
-                    col = 0
-                    row += 1
-
-            if col != 0:  # Если последний ряд не полный
-                row += 1
-
-    def seat_selected(self, checked, button):
-        """Обработка выбора места"""
-        if checked:
-            # Снимаем выделение с других мест
-            for i in range(self.seats_grid.count()):
-                widget = self.seats_grid.itemAt(i).widget()
-                if isinstance(widget, QPushButton) and widget != button:
-                    widget.setChecked(False)
-
-            self.selected_seat_id = button.property('seat_id')
-            self.select_btn.setEnabled(True)
-        else:
-            if self.selected_seat_id == button.property('seat_id'):
-                self.selected_seat_id = None
-                self.select_btn.setEnabled(False)
+        self.allocator = SeatAllocator(self.seat_map)
+        counts = ', '.join(f'{seat_type}: {count}' for seat_type, count in self.seat_map.free_counts().items()
+                           if count)
+        self.free_label.setText(f'Свободно: {self.seat_map.free_count()} ({counts})')
+        self.group_size_spin.setMaximum(max(1, min(20, self.seat_map.free_count())))
+
+        # Свободные и занятые места рисует схема
+        self.seat_map_widget.set_seat_map(self.seat_map)
+
+    def seat_selected(self):
+        """Обработка выбора места (повторное нажатие снимает выбор)"""
+        self.selected_seat_ids = self.seat_map_widget.selected_seat_ids()
+        self.seat_labels = {seat_id: self.seat_map_widget.seat_label(seat_id) for seat_id in self.selected_seat_ids}
+
+        count = len(self.selected_seat_ids)
+        self.select_btn.setText(f'Выбрать места ({count})' if count > 1 else 'Выбрать место')
+        self.select_btn.setEnabled(count > 0)
+
+    def propose_group_seats(self):
+        """Подбор мест рядом для группы: выбор заменяется предложенными местами"""
+        if not self.allocator:
+            return
+
+        seat_ids = self.allocator.allocate(self.group_size_spin.value())
+        if not seat_ids:
+            QMessageBox.information(self, 'Информация', 'Недостаточно свободных мест для группы')
+            return
+
+        self.seat_map_widget.set_selected(seat_ids)
+
+        rect = self.seat_map_widget.seat_rect(seat_ids[0])
+        self.scroll_area.ensureVisible(rect.center().x(), rect.center().y(), rect.width(), rect.height())
 
     def get_selected_seat(self):
-        """Получить выбранное место"""
-        return self.selected_seat_id
\ No newline at end of file
+        """Получить выбранное место (первое, если выбрано несколько)"""
+        return self.selected_seat_ids[0] if self.selected_seat_ids else None
+
+    def get_selected_seats(self):
+        """Получить все выбранные места в порядке выбора"""
+        return list(self.selected_seat_ids)
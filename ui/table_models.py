@@ -0,0 +1,354 @@
+from array import array
+from typing import Callable, Dict, List, Optional
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+# Роль с исходным значением поля колонки (для сортировки и чтения данных строки)
+ValueRole = Qt.UserRole
+
+
+class Column:
+    """Колонка таблицы: поле записи, текст ячейки, выравнивание, цвет фона и ключ сортировки"""
+
+    __slots__ = ('title', 'field', 'text', 'align', 'background', 'sort_key')
+
+    def __init__(self, title: str, field: str, text: Optional[Callable[[Dict], str]] = None,
+                 align: Optional[int] = None, background: Optional[Callable[[Dict], Optional[QColor]]] = None,
+                 sort_key: Optional[Callable] = None):
+        self.title = title
+        self.field = field
+        self.text = text
+        self.align = int(align) if align is not None else None
+        self.background = background
+        self.sort_key = sort_key
+
+    def display(self, record: Dict) -> str:
+        if self.text is not None:
+            return self.text(record)
+        value = record.get(self.field)
+        return '' if value is None else str(value)
+
+
+def _none_last(value):
+    """Ключ сортировки по умолчанию: пустые значения в конце"""
+    return (value is None, value)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Модель таблицы по строкам запроса, хранимым по колонкам.
+
+    Каждое поле - один список (целые - массив array('q')), повторяющиеся строки
+    хранятся одним объектом. Текст и цвет ячейки вычисляются по запросу
+    представления, то есть только для видимых строк.
+    """
+
+    def __init__(self, columns: List[Column], parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._data: Dict[str, list] = {}
+        self._rows = 0
+        self._strings: Dict[str, str] = {}
+        # Текст строк для фильтра - строится при первом поиске
+        self._search: Optional[List[str]] = None
+        # Последняя собранная запись: представление запрашивает ячейки строки подряд
+        self._record_row = -1
+        self._record = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    # ========== ДАННЫЕ ==========
+
+    def set_rows(self, rows: List[Dict]):
+        """Замена всех строк"""
+        self.beginResetModel()
+        self._data = {}
+        self._rows = 0
+        self._strings = {}
+        self._forget()
+        self._extend(rows)
+        self.endResetModel()
+        self._resort()
+
+    def append_rows(self, rows: List[Dict]):
+        """Добавление строк в конец (следующая страница) без пересортировки загруженных"""
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + len(rows) - 1)
+        self._extend(rows)
+        self.endInsertRows()
+
+    def _extend(self, rows: List[Dict]):
+        fields = list(rows[0]) if rows else []
+        for field in fields:
+            values = [row.get(field) for row in rows]
+            if any(type(value) is str for value in values):
+                values = [self._strings.setdefault(value, value) if type(value) is str else value
+                          for value in values]
+
+            column = self._data.get(field)
+            if column is None:
+                self._data[field] = self._compact([None] * self._rows + values)
+            elif isinstance(column, array) and not all(type(value) is int for value in values):
+                # Целочисленная колонка получила другие значения - один раз переходит в список
+                self._data[field] = list(column) + values
+            else:
+                # Колонка растет на месте: добавление страницы не копирует загруженные строки
+                column.extend(values)
+        # Поля, которых нет в новых строках, дополняются пустыми значениями
+        for field in [field for field in self._data if field not in fields]:
+            if isinstance(self._data[field], array):
+                self._data[field] = list(self._data[field])
+            self._data[field].extend([None] * len(rows))
+        self._rows += len(rows)
+        self._forget()
+
+    @staticmethod
+    def _compact(values: list):
+        """Целочисленную колонку - в массив, остальные - списком"""
+        if values and all(type(value) is int for value in values):
+            try:
+                return array('q', values)
+            except OverflowError:
+                pass
+        return values
+
+    def _forget(self):
+        self._search = None
+        self._record_row = -1
+        self._record = None
+
+    def record(self, row: int) -> Dict:
+        """Запись строки в виде словаря полей"""
+        if row != self._record_row:
+            self._record = {field: column[row] for field, column in self._data.items()}
+            self._record_row = row
+        return self._record
+
+    def value(self, row: int, field: str):
+        column = self._data.get(field)
+        return column[row] if column is not None else None
+
+    def search_text(self, row: int) -> str:
+        """Текст всех ячеек строки в нижнем регистре"""
+        if self._search is None:
+            fields = list(self._data)
+            self._search = ['\n'.join(column.display(record) for column in self.columns).casefold()
+                            for record in (dict(zip(fields, values)) for values in zip(*self._data.values()))]
+        return self._search[row]
+
+    # ========== МОДЕЛЬ ==========
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.columns[section].title
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        column = self.columns[index.column()]
+        if role == Qt.DisplayRole:
+            return column.display(self.record(index.row()))
+        if role == Qt.TextAlignmentRole:
+            return column.align
+        if role == Qt.BackgroundRole and column.background is not None:
+            return column.background(self.record(index.row()))
+        if role == ValueRole:
+            return self.value(index.row(), column.field)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Сортировка перестановкой колонок целиком (без сравнения ячеек через представление)"""
+        self._sort_column = column
+        self._sort_order = order
+        if not 0 <= column < len(self.columns) or self.columns[column].field not in self._data:
+            return
+
+        spec = self.columns[column]
+        keys = list(map(spec.sort_key or _none_last, self._data[spec.field]))
+        order_rows = sorted(range(self._rows), key=keys.__getitem__, reverse=order == Qt.DescendingOrder)
+
+        self.layoutAboutToBeChanged.emit()
+        for field, values in self._data.items():
+            moved = map(values.__getitem__, order_rows)
+            self._data[field] = array(values.typecode, moved) if isinstance(values, array) else list(moved)
+        self._forget()
+
+        # Выделение и текущая строка переезжают вместе со своими строками
+        positions = [0] * self._rows
+        for new_row, old_row in enumerate(order_rows):
+            positions[old_row] = new_row
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [self.index(positions[index.row()], index.column())
+                                                    for index in persistent])
+        self.layoutChanged.emit()
+
+    def _resort(self):
+        """Повторная сортировка новых данных по выбранной колонке"""
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+
+class RecordFilterProxyModel(QSortFilterProxyModel):
+    """Прокси с поиском по тексту строк; сортировку выполняет исходная модель"""
+
+    def __init__(self, model: RecordTableModel, parent=None):
+        super().__init__(parent)
+        self._needle = ''
+        self.setSourceModel(model)
+
+    def set_filter_text(self, text: str):
+        self._needle = text.strip().casefold()
+        # Одно изменение раскладки вместо сигнала на каждый скрытый диапазон строк
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self._needle or self._needle in self.sourceModel().search_text(source_row)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Порядок строк меняет исходная модель, прокси его сохраняет
+        self.sourceModel().sort(column, order)
+
+
+class RecordTableView(QTableView):
+    """Таблица по модели RecordTableModel с сортировкой по заголовкам и поиском"""
+
+    selection_changed = pyqtSignal()
+    # Таблица стала видимой (показана страница или выбрана вкладка)
+    shown = pyqtSignal()
+
+    def __init__(self, columns: List[Column], parent=None):
+        super().__init__(parent)
+        self.records = RecordTableModel(columns, self)
+        self.proxy = RecordFilterProxyModel(self.records, self)
+        self.setModel(self.proxy)
+
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.horizontalHeader().setStretchLastSection(True)
+        # Высота строк фиксирована: представлению не нужно измерять каждую строку
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        # Подсветка нарисованных кнопок под курсором
+        self.setMouseTracking(True)
+
+        # Без индикатора сортировки строки остаются в порядке запроса
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+
+    def set_rows(self, rows: List[Dict]):
+        self.records.set_rows(rows)
+
+    def append_rows(self, rows: List[Dict]):
+        """Следующая страница - в конец; сортировка снимается и повторяется по щелчку на заголовке"""
+        header = self.horizontalHeader()
+        if rows and header.sortIndicatorSection() >= 0:
+            header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.records.append_rows(rows)
+        # Диапазон прокрутки сразу учитывает новые строки (иначе он обновится позже,
+        # и проверка "прокручено до конца" сработает еще раз)
+        if self.isVisible():
+            self.updateGeometries()
+
+    def row_count(self) -> int:
+        """Число строк, видимых с учетом поиска"""
+        return self.proxy.rowCount()
+
+    def record_at(self, index: QModelIndex) -> Optional[Dict]:
+        """Запись строки по индексу представления"""
+        if not index.isValid():
+            return None
+        return dict(self.records.record(self.proxy.mapToSource(index).row()))
+
+    def current_record(self) -> Optional[Dict]:
+        """Запись выбранной строки"""
+        rows = self.selectionModel().selectedRows()
+        return self.record_at(rows[0]) if rows else None
+
+    def create_search_edit(self, placeholder: str = '🔍 Поиск в таблице') -> QLineEdit:
+        """Поле поиска по загруженным строкам"""
+        edit = QLineEdit()
+        edit.setPlaceholderText(placeholder)
+        edit.setClearButtonEnabled(True)
+        edit.setMinimumHeight(40)
+        edit.textChanged.connect(self.proxy.set_filter_text)
+        return edit
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Полосы прокрутки получают размеры после показа - сигнал после обработки событий
+        QTimer.singleShot(0, self.shown.emit)
+
+    def selectionChanged(self, selected, deselected):
+        super().selectionChanged(selected, deselected)
+        self.selection_changed.emit()
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Кнопка, нарисованная в ячейке: без виджета и таблицы стилей на каждую строку.
+
+    Щелчок по кнопке отдается сигналом clicked с индексом ячейки представления.
+    """
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, text: str, color: str, hover_color: str, font_size: int, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.color = QColor(color)
+        self.hover_color = QColor(hover_color)
+        self.font_size = font_size
+        self._pressed = QPersistentModelIndex()
+
+    def button_rect(self, rect: QRect) -> QRect:
+        """Прямоугольник кнопки внутри ячейки"""
+        return rect.adjusted(6, 8, -6, -8)
+
+    def paint(self, painter, option, index):
+        # Фон ячейки (выделение строки) рисует стандартный стиль, без текста
+        cell = QStyleOptionViewItem(option)
+        self.initStyleOption(cell, index)
+        cell.text = ''
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, cell, painter, option.widget)
+
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        font = QFont(option.font)
+        font.setPixelSize(self.font_size)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.hover_color if hovered or self._pressed == index else self.color)
+        painter.drawRoundedRect(QRectF(self.button_rect(option.rect)), 4, 4)
+        painter.setPen(Qt.white)
+        painter.setFont(font)
+        painter.drawText(self.button_rect(option.rect), Qt.AlignCenter, self.text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(140, 40)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        if event.button() != Qt.LeftButton or not self.button_rect(option.rect).contains(event.pos()):
+            self._pressed = QPersistentModelIndex()
+            return False
+
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = QPersistentModelIndex(index)
+        elif event.type() == QEvent.MouseButtonRelease:
+            if self._pressed == index:
+                self.clicked.emit(index)
+            self._pressed = QPersistentModelIndex()
+        # Нажатие на кнопку не меняет выделение строки
+        return True
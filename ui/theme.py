@@ -0,0 +1,188 @@
+from typing import Dict, Optional
+from PyQt5.QtWidgets import QApplication, QWidget
+from config import Config
+
+# Цвет кнопки при наведении для каждого варианта (variant="...")
+HOVER_COLORS = {
+    'primary': '#b71c1c',
+    'secondary': '#1976D2',
+    'success': '#45a049',
+    'warning': '#FF5722',
+    'danger': '#d32f2f'
+}
+
+# Цвет занятого места (легенда и схема мест)
+OCCUPIED_COLOR = '#e0e0e0'
+
+_stylesheet: Optional[str] = None
+
+
+def build_stylesheet(colors: Dict[str, str], fonts: Dict[str, int]) -> str:
+    """Таблица стилей приложения по цветам и размерам шрифтов.
+
+    Виджеты выбирают оформление свойствами: кнопки - variant (и size), надписи и
+    рамки - role, образцы цвета в легендах - swatch; единичные виджеты - по имени объекта.
+    """
+    buttons = ''.join(f'''
+        QPushButton[variant="{variant}"] {{ background-color: {colors[variant]}; }}
+        QPushButton[variant="{variant}"]:hover {{ background-color: {hover}; }}'''
+                      for variant, hover in HOVER_COLORS.items())
+    swatches = ''.join(f'''
+        QLabel[swatch="{name}"] {{ background-color: {color}; border-radius: 4px; }}'''
+                       for name, color in list(colors.items()) + [('occupied', OCCUPIED_COLOR)])
+
+    return f'''
+        /* ========== КНОПКИ ========== */
+        QPushButton[variant] {{
+            color: white;
+            border: none;
+            border-radius: 6px;
+            padding: 0 15px;
+            font-size: {fonts["normal"]}px;
+            font-weight: bold;
+        }}
+        {buttons}
+        QPushButton[size="large"] {{ border-radius: 8px; font-size: {fonts["large"]}px; }}
+        QPushButton[size="xlarge"] {{ border-radius: 8px; font-size: {fonts["xlarge"]}px; }}
+        QPushButton[variant]:disabled {{ background-color: #cccccc; }}
+
+        /* ========== НАДПИСИ ========== */
+        QLabel[role="page-title"] {{
+            font-size: {fonts["xxlarge"]}px;
+            font-weight: bold;
+            color: {colors["dark"]};
+            margin-bottom: 10px;
+        }}
+        QLabel[role="window-title"] {{ font-size: {fonts["xlarge"]}px; font-weight: bold; color: {colors["primary"]}; }}
+        QLabel[role="dialog-title"] {{ font-size: {fonts["large"]}px; font-weight: bold; color: {colors["primary"]}; }}
+        QLabel[role="section"] {{ font-size: {fonts["xlarge"]}px; font-weight: bold; color: {colors["dark"]}; }}
+        QLabel[role="text"] {{ font-size: {fonts["normal"]}px; }}
+        QLabel[role="caption"] {{ font-size: {fonts["small"]}px; }}
+        QLabel[role="field"] {{ font-size: {fonts["normal"]}px; font-weight: bold; }}
+        QLabel[role="error"] {{ font-size: {fonts["small"]}px; color: {colors["danger"]}; }}
+        QLabel[role="success"] {{ font-size: {fonts["small"]}px; color: {colors["success"]}; }}
+        QLabel[role="note"] {{ font-size: {fonts["small"]}px; color: {colors["dark"]}; font-style: italic; }}
+        QLabel[role="hint"] {{ font-size: {fonts["small"]}px; color: #666; font-style: italic; }}
+        QLabel[role="message"] {{ font-size: {fonts["normal"]}px; color: {colors["dark"]}; padding: 10px; }}
+        QLabel[role="icon"] {{ font-size: 60px; }}
+        QLabel[role="stats"] {{
+            font-size: {fonts["normal"]}px;
+            color: {colors["dark"]};
+            padding: 10px;
+            background-color: #f9f9f9;
+            border-radius: 6px;
+        }}
+        QLabel[role="info"] {{
+            font-size: {fonts["normal"]}px;
+            color: {colors["dark"]};
+            padding: 15px;
+            background-color: #f0f8ff;
+            border-radius: 8px;
+            margin-top: 10px;
+        }}
+        QLabel[role="notice"] {{
+            font-size: {fonts["large"]}px;
+            color: {colors["primary"]};
+            padding: 20px;
+            background-color: #f9f9f9;
+            border-radius: 8px;
+        }}
+        {swatches}
+
+        /* ========== РАМКИ ========== */
+        QFrame[role="panel"] {{
+            background-color: #f9f9f9;
+            border: 1px solid #ddd;
+            border-radius: 8px;
+            padding: 15px;
+        }}
+        QFrame[role="note-panel"] {{
+            background-color: #f0f8ff;
+            border: 1px solid #b0d0ff;
+            border-radius: 6px;
+            padding: 15px;
+            margin-top: 10px;
+        }}
+        QGroupBox {{
+            font-size: {fonts["normal"]}px;
+            font-weight: bold;
+            border: 1px solid #ddd;
+            border-radius: 6px;
+            padding-top: 15px;
+        }}
+        QGroupBox::title {{ color: {colors["dark"]}; padding: 0 10px; }}
+
+        /* ========== ПОЛЯ ВВОДА ========== */
+        QLineEdit {{
+            font-size: {fonts["normal"]}px;
+            padding: 10px;
+            border: 1px solid #ccc;
+            border-radius: 6px;
+            background-color: white;
+        }}
+        QLineEdit:focus {{ border: 2px solid {colors["primary"]}; }}
+        /* Поле внутри счетчиков и полей даты оформляет сам счетчик */
+        QLineEdit#qt_spinbox_lineedit {{ padding: 0; border: none; background: transparent; }}
+        QComboBox {{
+            font-size: {fonts["normal"]}px;
+            padding: 5px;
+            border: 1px solid #ccc;
+            border-radius: 6px;
+        }}
+        QComboBox[role="station"] {{ min-width: 200px; }}
+        QCheckBox[role="accent"] {{ font-size: {fonts["normal"]}px; font-weight: bold; color: {colors["primary"]}; }}
+
+        /* ========== ГЛАВНОЕ ОКНО ========== */
+        QFrame#header {{ background-color: {colors["primary"]}; }}
+        QLabel#headerLogo {{ font-size: 30px; color: white; }}
+        QLabel#headerTitle {{ font-size: {fonts["xlarge"]}px; font-weight: bold; color: white; }}
+        QLabel#headerUser {{ font-size: {fonts["small"]}px; color: white; }}
+        QPushButton#logoutButton {{
+            background-color: rgba(255, 255, 255, 0.2);
+            color: white;
+            border: 1px solid white;
+            border-radius: 4px;
+        }}
+        QPushButton#logoutButton:hover {{ background-color: rgba(255, 255, 255, 0.3); }}
+        QFrame#navigation {{ background-color: {colors["light"]}; border-bottom: 1px solid #ddd; }}
+
+        /* ========== ВХОД ========== */
+        QLabel#loginTitle {{ color: {colors["primary"]}; margin-bottom: 30px; }}
+        QLabel#loginInfo {{
+            font-size: {fonts["small"]}px;
+            color: #666;
+            margin-top: 20px;
+            padding: 15px;
+            background-color: #f9f9f9;
+            border-radius: 8px;
+        }}
+        QGroupBox#loginForm {{
+            font-size: {fonts["large"]}px;
+            border: 2px solid {colors["primary"]};
+            border-radius: 8px;
+        }}
+        QGroupBox#loginForm::title {{ color: {colors["primary"]}; }}
+        QLineEdit#loginField {{ padding: 12px; }}
+    '''
+
+
+def stylesheet() -> str:
+    """Таблица стилей по Config (собирается при первом обращении)"""
+    global _stylesheet
+    if _stylesheet is None:
+        _stylesheet = build_stylesheet(Config.COLORS, Config.FONT_SIZES)
+    return _stylesheet
+
+
+def apply_theme(app: QApplication):
+    """Одна таблица стилей на все приложение"""
+    app.setStyleSheet(stylesheet())
+
+
+def themed(widget: QWidget, name: Optional[str] = None, **properties) -> QWidget:
+    """Имя объекта и свойства-варианты для селекторов таблицы стилей"""
+    if name:
+        widget.setObjectName(name)
+    for key, value in properties.items():
+        widget.setProperty(key, value)
+    return widget